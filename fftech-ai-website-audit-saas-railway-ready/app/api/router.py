@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import os
 import time
@@ -15,6 +14,7 @@ from fastapi.responses import StreamingResponse
 from app.audit.crawler import crawl
 from app.audit.psi import fetch_lighthouse
 from app.audit.grader import compute_scores
+from app.services.progress import dumps
 
 logger = logging.getLogger("FFTech_Production")
 logging.basicConfig(level=logging.INFO)
@@ -30,8 +30,8 @@ SSE_STATUS_SECONDS = float(os.getenv("SSE_STATUS_SECONDS", "2.0"))  # status upd
 
 
 def json_dumps(obj: Any) -> str:
-    """Compact JSON for SSE."""
-    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    """Compact JSON for SSE (orjson)."""
+    return dumps(obj)
 
 
 def _job_key(url: str, api_key: str) -> str:
@@ -167,6 +167,9 @@ async def open_audit_progress(
                 # Pull next message (or timeout)
                 try:
                     item = await asyncio.wait_for(queue.get(), timeout=1.0)
+                    # Coalesce: if the client fell behind, only the newest status matters
+                    while not item.get("finished") and not queue.empty():
+                        item = queue.get_nowait()
                     yield f"data: {json_dumps(item)}\n\n"
                     if item.get("finished"):
                         break
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/artifacts.py
+Per-audit page artifacts (in-process, LRU + TTL)
+- The runner stores what it fetched: zlib-compressed HTML, status, headers
+- Keyed by the audited URL and the final (post-redirect) URL
+- PDF enrichment reads the artifact instead of downloading and parsing the page again
+- soup() is the shared parse handle: parsed lazily once per artifact, then reused
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+ARTIFACT_MAX_ITEMS = int(os.getenv("AUDIT_ARTIFACT_MAX_ITEMS", "32"))
+ARTIFACT_TTL_SECONDS = int(os.getenv("AUDIT_ARTIFACT_TTL_SECONDS", os.getenv("AUDIT_CACHE_TTL_SECONDS", "900")))
+
+
+class PageArtifact:
+    __slots__ = ("url", "final_url", "status_code", "headers", "html_z", "raw_bytes", "created_at", "_soup", "_lock")
+
+    def __init__(self, url: str, final_url: str, status_code: int, headers: Dict[str, str], html: str):
+        self.url = url
+        self.final_url = final_url or url
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+        raw = (html or "").encode("utf-8", errors="replace")
+        self.raw_bytes = len(raw)
+        self.html_z = zlib.compress(raw, 1)  # fast level; HTML still shrinks ~4-6x
+        self.created_at = time.time()
+        self._soup: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def html(self) -> str:
+        return zlib.decompress(self.html_z).decode("utf-8", errors="replace")
+
+    def soup(self) -> Optional[Any]:
+        """Parsed tree (app.audit.parsers backend), built on first use."""
+        with self._lock:
+            if self._soup is None:
+                from app.audit.parsers import parse_html
+                self._soup = parse_html(self.html)
+            return self._soup
+
+
+class ArtifactStore:
+    def __init__(self, max_items: int = ARTIFACT_MAX_ITEMS, ttl_seconds: int = ARTIFACT_TTL_SECONDS):
+        self.max_items = max(1, max_items)
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, Tuple[float, PageArtifact]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, artifact: PageArtifact) -> None:
+        now = time.time()
+        with self._lock:
+            for key in {artifact.url, artifact.final_url}:
+                if key:
+                    self._items[key] = (now, artifact)
+                    self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def get(self, url: str) -> Optional[PageArtifact]:
+        with self._lock:
+            item = self._items.get(url or "")
+            if item is None:
+                return None
+            ts, artifact = item
+            if (time.time() - ts) > self.ttl_seconds:
+                self._items.pop(url, None)
+                return None
+            self._items.move_to_end(url)
+            return artifact
+
+
+artifact_store = ArtifactStore()
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/browser_pool.py
+Long-lived async Playwright pool for PDF screenshots + axe-core scans
+- One Chromium per process, PLAYWRIGHT_POOL_SIZE warm contexts, each recycled after PLAYWRIGHT_CONTEXT_MAX_USES pages
+- A slot always goes back to the idle queue: a context that could not be recycled comes back as an empty slot
+  (re-created on next use); a relaunch refills the same queue, so waiters are not stranded, and contexts of
+  the old browser are dropped when released. Waiting for a slot is bounded by PLAYWRIGHT_ACQUIRE_TIMEOUT_SECONDS
+- capture(url, screenshot=True, axe=True): ONE navigation serves both the screenshot and the axe injection
+- axe-core source: AXE_LOCAL_PATH if present, else downloaded once from AXE_CDN_URL and cached (memory + AXE_CACHE_PATH)
+- Playwright objects are bound to the event loop that created them: get_browser_pool() only returns the shared
+  pool on that loop; other loops (sync wrappers) get a short-lived pool they must close
+- Playwright missing / Chromium failing → capture() returns None (enrichment is best-effort)
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PLAYWRIGHT_POOL_SIZE = int(os.getenv("PLAYWRIGHT_POOL_SIZE", "2"))
+PLAYWRIGHT_CONTEXT_MAX_USES = int(os.getenv("PLAYWRIGHT_CONTEXT_MAX_USES", "25"))
+PLAYWRIGHT_NAV_TIMEOUT_MS = int(os.getenv("PLAYWRIGHT_NAV_TIMEOUT_MS", "30000"))
+PLAYWRIGHT_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("PLAYWRIGHT_ACQUIRE_TIMEOUT_SECONDS", "60"))
+AXE_CDN_URL = os.getenv("AXE_CDN_URL", "https://cdnjs.cloudflare.com/ajax/libs/axe-core/4.7.2/axe.min.js")
+AXE_LOCAL_PATH = os.getenv("AXE_LOCAL_PATH", str(Path(__file__).resolve().parent.parent / "assets" / "axe.min.js"))
+AXE_CACHE_PATH = os.getenv("AXE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "fftech_axe.min.js"))
+
+VIEWPORT: Tuple[int, int] = (1366, 768)
+
+_AXE_RUN_JS = """async () => {
+    if (!window.axe) { return null; }
+    const res = await window.axe.run();
+    return {
+        violations: res.violations.map(v => ({
+            id: v.id,
+            impact: v.impact,
+            nodes: v.nodes.length,
+            tags: v.tags || [],
+            help: v.help,
+            helpUrl: v.helpUrl
+        })),
+        passes: (res.passes || []).length
+    };
+}"""
+
+_axe_source: Optional[str] = None
+_axe_lock: Optional[asyncio.Lock] = None
+
+
+async def _load_axe_source() -> Optional[str]:
+    """Local copy first; otherwise fetch the CDN build once and keep it on disk for later processes."""
+    global _axe_source, _axe_lock
+    if _axe_source is not None:
+        return _axe_source
+    if _axe_lock is None:
+        _axe_lock = asyncio.Lock()
+    async with _axe_lock:
+        if _axe_source is not None:
+            return _axe_source
+        for path in (AXE_LOCAL_PATH, AXE_CACHE_PATH):
+            try:
+                if path and os.path.isfile(path):
+                    _axe_source = Path(path).read_text(encoding="utf-8")
+                    return _axe_source
+            except Exception as e:
+                logger.debug(f"axe source read failed ({path}): {e}")
+        try:
+            import httpx
+            async with httpx.AsyncClient(timeout=20.0, follow_redirects=True) as client:
+                r = await client.get(AXE_CDN_URL)
+                r.raise_for_status()
+                _axe_source = r.text
+            try:
+                tmp = AXE_CACHE_PATH + ".tmp"
+                Path(tmp).write_text(_axe_source, encoding="utf-8")
+                os.replace(tmp, AXE_CACHE_PATH)
+            except Exception:
+                pass
+        except Exception as e:
+            logger.debug(f"axe-core download failed: {e}")
+        return _axe_source
+
+
+class BrowserPool:
+    def __init__(self, size: int = PLAYWRIGHT_POOL_SIZE, max_uses: int = PLAYWRIGHT_CONTEXT_MAX_USES):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pw: Any = None
+        self._browser: Any = None
+        self._idle: Optional[asyncio.Queue] = None  # contexts, or None for a slot to (re)create on use
+        self._uses: Dict[int, int] = {}  # id(ctx) → pages served, for contexts of the current browser only
+        self._generation = 0
+        self._start_lock = asyncio.Lock()
+        self._unavailable = False
+
+    # --------------------- lifecycle ---------------------
+    async def _ensure_started(self) -> bool:
+        if self._unavailable:
+            return False
+        if self._browser is not None and self._browser.is_connected():
+            return True
+        async with self._start_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return True
+            await self._close_browser()
+            try:
+                from playwright.async_api import async_playwright
+            except Exception as e:
+                logger.debug(f"Playwright not available: {e}")
+                self._unavailable = True
+                return False
+            try:
+                self.loop = asyncio.get_running_loop()
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                self._browser = await self._pw.chromium.launch(args=["--no-sandbox"], headless=True)
+                self._generation += 1
+                self._uses = {}
+                contexts = [await self._new_context() for _ in range(self.size)]
+                # Same queue across relaunches: captures already waiting on it get the new contexts
+                if self._idle is None:
+                    self._idle = asyncio.Queue()
+                while not self._idle.empty():
+                    self._idle.get_nowait()  # slots of the previous browser
+                for ctx in contexts:
+                    self._idle.put_nowait(ctx)
+                logger.info("Browser pool started: contexts=%s max_uses=%s", self.size, self.max_uses)
+                return True
+            except Exception as e:
+                logger.warning(f"Browser pool start failed: {e}")
+                await self._close_browser()
+                return False
+
+    async def _new_context(self) -> Any:
+        ctx = await self._browser.new_context(
+            viewport={"width": VIEWPORT[0], "height": VIEWPORT[1]},
+            device_scale_factor=1,
+        )
+        ctx.set_default_navigation_timeout(PLAYWRIGHT_NAV_TIMEOUT_MS)
+        ctx.set_default_timeout(PLAYWRIGHT_NAV_TIMEOUT_MS)
+        self._uses[id(ctx)] = 0
+        return ctx
+
+    async def _acquire(self) -> Optional[Any]:
+        """Idle context (an empty slot is filled here); None when none frees up within the acquire timeout."""
+        try:
+            slot = await asyncio.wait_for(self._idle.get(), PLAYWRIGHT_ACQUIRE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"No browser context free after {PLAYWRIGHT_ACQUIRE_TIMEOUT_SECONDS:.0f}s")
+            return None
+        if slot is not None:
+            return slot
+        generation = self._generation
+        try:
+            ctx = await self._new_context()
+        except BaseException:
+            self._idle.put_nowait(None)
+            raise
+        if generation != self._generation:  # relaunched meanwhile: dropped on release
+            self._uses.pop(id(ctx), None)
+        return ctx
+
+    async def _release(self, ctx: Any, broken: bool = False) -> None:
+        if id(ctx) not in self._uses:
+            # Context of a browser that has been relaunched since; the relaunch refilled the slots
+            await self._close_context(ctx)
+            return
+        uses = self._uses.pop(id(ctx)) + 1
+        if not (broken or uses >= self.max_uses or not self._browser or not self._browser.is_connected()):
+            self._uses[id(ctx)] = uses
+            self._idle.put_nowait(ctx)
+            return
+        slot = None
+        try:
+            await self._close_context(ctx)
+            slot = await self._new_context()
+        except Exception as e:
+            logger.debug(f"context recycle failed: {e}")
+        finally:
+            # Even on failure / cancellation the slot goes back (empty: re-created on next use)
+            self._idle.put_nowait(slot)
+
+    @staticmethod
+    async def _close_context(ctx: Any) -> None:
+        try:
+            await ctx.close()
+        except Exception:
+            pass
+
+    async def _close_browser(self) -> None:
+        browser, self._browser = self._browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def close(self) -> None:
+        await self._close_browser()
+        pw, self._pw = self._pw, None
+        if pw is not None:
+            try:
+                await pw.stop()
+            except Exception:
+                pass
+
+    # --------------------- capture ---------------------
+    async def capture(
+        self,
+        url: str,
+        screenshot: bool = True,
+        axe: bool = False,
+        full_page: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """{"screenshot_b64": str | None, "axe": raw axe summary | None} from a single page load."""
+        if not url or not (screenshot or axe) or not await self._ensure_started():
+            return None
+        axe_js = await _load_axe_source() if axe else None
+        try:
+            ctx = await self._acquire()
+        except Exception as e:
+            logger.debug(f"browser context unavailable: {e}")
+            return None
+        if ctx is None:
+            return None
+        broken = False
+        page = None
+        out: Dict[str, Any] = {"screenshot_b64": None, "axe": None}
+        try:
+            page = await ctx.new_page()
+            await page.goto(url, wait_until="networkidle")
+            await page.wait_for_timeout(800)
+            if screenshot:
+                buf = await page.screenshot(full_page=full_page, type="png")
+                out["screenshot_b64"] = base64.b64encode(buf).decode("ascii")
+            if axe_js:
+                await page.add_script_tag(content=axe_js)
+                out["axe"] = await page.evaluate(_AXE_RUN_JS)
+        except Exception as e:
+            logger.debug(f"browser capture failed for {url}: {e}")
+            broken = not (self._browser and self._browser.is_connected())
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    broken = True
+            await self._release(ctx, broken=broken)
+        return out if (out["screenshot_b64"] or out["axe"]) else None
+
+
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    """Shared pool for the running loop (created lazily); None when called from a different loop."""
+    global _pool
+    loop = asyncio.get_running_loop()
+    if _pool is None:
+        _pool = BrowserPool()
+        _pool.loop = loop
+    return _pool if _pool.loop is loop else None
+
+
+async def capture_page(url: str, screenshot: bool = True, axe: bool = False) -> Optional[Dict[str, Any]]:
+    """Pooled capture on the app loop; a one-off pool (closed afterwards) anywhere else."""
+    pool = get_browser_pool()
+    if pool is not None:
+        return await pool.capture(url, screenshot=screenshot, axe=axe)
+    transient = BrowserPool(size=1)
+    try:
+        return await transient.capture(url, screenshot=screenshot, axe=axe)
+    finally:
+        await transient.close()
+
+
+async def shutdown() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        try:
+            if pool.loop is asyncio.get_running_loop():
+                await pool.close()
+        except Exception as e:
+            logger.debug(f"browser pool shutdown failed: {e}")
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/cpu_pool.py
+Shared process pool for the CPU-bound audit stage (parse + features + scoring)
+- run_cpu(fn, *args) -> awaitable result; fn and args must be picklable (top-level functions)
+- AUDIT_CPU_WORKERS: pool size (default: CPU count / WEB_CONCURRENCY); 0 = run in a thread instead
+- Pool is created lazily on first use with the "spawn" start method (safe after gunicorn fork/preload)
+- If the pool breaks (worker killed, pickling error) the call is retried in a thread and the pool is rebuilt next time
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _default_workers() -> int:
+    try:
+        web = max(1, int(os.getenv("WEB_CONCURRENCY", "") or 1))
+    except ValueError:
+        web = 1
+    return max(1, (os.cpu_count() or 1) // web)
+
+
+try:
+    AUDIT_CPU_WORKERS = int(os.getenv("AUDIT_CPU_WORKERS", "") or _default_workers())
+except ValueError:
+    AUDIT_CPU_WORKERS = _default_workers()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if AUDIT_CPU_WORKERS <= 0:
+        return None
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=AUDIT_CPU_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("CPU pool started: workers=%s", AUDIT_CPU_WORKERS)
+        return _pool
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run fn(*args) in the shared process pool (in a thread when disabled or broken)."""
+    pool = _get_pool()
+    if pool is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except (BrokenProcessPool, pickle.PicklingError) as e:
+            logger.warning(f"CPU pool unavailable, running in thread: {e}")
+            _discard_pool(pool)
+        except RuntimeError as e:  # "cannot schedule new futures after shutdown"
+            if "shutdown" not in str(e):
+                raise
+    return await asyncio.to_thread(fn, *args)
+
+
+def shutdown() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
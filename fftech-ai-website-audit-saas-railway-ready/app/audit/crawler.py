@@ -1,4 +1,5 @@
 import asyncio
+import importlib.util
 import random
 from typing import Dict, Set, Optional
 from urllib.parse import urljoin, urlparse, urldefrag
@@ -7,6 +8,9 @@ import httpx
 from bs4 import BeautifulSoup
 from dataclasses import dataclass
 
+# HTTP/2 needs the optional "h2" package (httpx[http2]); fall back to HTTP/1.1 without it
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
 
 @dataclass(frozen=True)
 class CrawlConfig:
@@ -69,7 +73,7 @@ async def crawl_site(
         limits=limits,
         timeout=httpx.Timeout(timeout),
         follow_redirects=True,
-        http2=True,
+        http2=_HTTP2,
         verify=True
     ) as client:
 
@@ -94,6 +98,8 @@ async def crawl_site(
                     return
 
                 html = response.text
+                if len(results) >= max_pages:  # filled by concurrent fetches meanwhile
+                    return
                 results[url] = html
 
                 if len(results) >= max_pages:
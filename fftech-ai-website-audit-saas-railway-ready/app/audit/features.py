@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/features.py
+Single-pass page feature extraction shared by all scorers
+- extract_features(html, soup) walks the parsed document ONCE and fills a PageFeatures record
+- Consumers: WebsiteAuditRunner.run scoring, seo.calculate_seo_score
+- Stdlib regex fallback when no parsed tree is available (bs4 missing / parse failure)
+- PageFeatures uses __slots__ (small, fast attribute access, picklable for process pools)
+- Lookups keep the matching rules of the find() calls they replaced: meta names are stored as written
+  (seo matches name="description" exactly, the runner case-insensitively), the runner's canonical is the
+  first canonical link that has an href; scripts/bench_parsers.py checks parity with those extractors
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_RE_CANONICAL = re.compile(r"canonical", re.I)
+_RE_STYLESHEET = re.compile(r"stylesheet", re.I)
+_RE_DESCRIPTION = re.compile(r"^description$", re.I)
+
+
+class PageFeatures:
+    """Everything the scorers read from one HTML document."""
+
+    __slots__ = (
+        "title",            # first <title>'s .string (None when missing / mixed content)
+        "meta",             # meta name (as written) → content of its first occurrence, in document order
+        "meta_description_present",  # runner rule: first name=description (any case) has non-blank content
+        "canonical_links",  # [(rel, href)] for every <link rel=...canonical...>, href "" when missing
+        "base_href",        # href of the first <base> ("" when absent)
+        "h1",
+        "h2",
+        "h3",
+        "images_total",
+        "images_missing_alt",
+        "anchors",          # [(href, rel lower-cased)] for every <a href>
+        "scripts",
+        "stylesheets",
+    )
+
+    def __init__(self) -> None:
+        self.title: Optional[str] = None
+        self.meta: Dict[str, str] = {}
+        self.meta_description_present = False
+        self.canonical_links: List[Tuple[str, str]] = []
+        self.base_href = ""
+        self.h1 = 0
+        self.h2 = 0
+        self.h3 = 0
+        self.images_total = 0
+        self.images_missing_alt = 0
+        self.anchors: List[Tuple[str, str]] = []
+        self.scripts = 0
+        self.stylesheets = 0
+
+    # Pickle support (no __dict__ with __slots__)
+    def __getstate__(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for k in self.__slots__:
+            setattr(self, k, state.get(k))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, PageFeatures) and self.__getstate__() == other.__getstate__()
+
+    def __repr__(self) -> str:
+        return f"PageFeatures(title={self.title!r}, h1={self.h1}, anchors={len(self.anchors)}, images={self.images_total})"
+
+    @property
+    def meta_description(self) -> str:
+        """Content of the first meta named description in any case (runner / site-mode rule), stripped."""
+        for key, content in self.meta.items():
+            if _RE_DESCRIPTION.search(key):
+                return content.strip()
+        return ""
+
+    @property
+    def canonical_href(self) -> str:
+        """href of the first canonical link that has one (runner rule)."""
+        for _rel, href in self.canonical_links:
+            if href:
+                return href
+        return ""
+
+    @property
+    def seo_canonical_href(self) -> str:
+        """href of the first link whose rel is exactly "canonical" ("" when it has none; seo rule)."""
+        for rel, href in self.canonical_links:
+            if rel == "canonical" or "canonical" in rel.split():
+                return href
+        return ""
+
+
+def _rel_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def _from_soup(soup: Any) -> PageFeatures:
+    f = PageFeatures()
+    title_seen = base_seen = False
+    anchors = f.anchors
+    meta = f.meta
+
+    for el in soup.descendants:
+        name = getattr(el, "name", None)
+        if name is None:  # strings, comments, doctype
+            continue
+        if name == "a":
+            href = el.get("href")
+            if href is not None:
+                anchors.append((href, _rel_text(el.get("rel")).strip().lower()))
+        elif name == "img":
+            f.images_total += 1
+            if not (el.get("alt") or "").strip():
+                f.images_missing_alt += 1
+        elif name == "script":
+            f.scripts += 1
+        elif name == "link":
+            rel = _rel_text(el.get("rel"))
+            if _RE_STYLESHEET.search(rel):
+                f.stylesheets += 1
+            if _RE_CANONICAL.search(rel):
+                f.canonical_links.append((rel, el.get("href") or ""))
+        elif name == "meta":
+            key = el.get("name")
+            if key is not None:
+                key = str(key)
+                if key not in meta:
+                    meta[key] = str(el.get("content") or "")
+        elif name == "h1":
+            f.h1 += 1
+        elif name == "h2":
+            f.h2 += 1
+        elif name == "h3":
+            f.h3 += 1
+        elif name == "title" and not title_seen:
+            title_seen = True
+            f.title = el.string
+        elif name == "base" and not base_seen:
+            base_seen = True
+            f.base_href = el.get("href") or ""
+    f.meta_description_present = bool(f.meta_description)
+    return f
+
+
+def _from_regex(html: str) -> PageFeatures:
+    """Stdlib fallback (same regexes the runner used before bs4 was available)."""
+    html = html or ""
+    f = PageFeatures()
+    m = re.search(r"<title[^>]*>(.*?)</title>", html, flags=re.I | re.S)
+    if m:
+        f.title = re.sub(r"<[^>]+>", "", m.group(1))
+    for tag in re.findall(r"<meta\b[^>]*>", html, flags=re.I):
+        nm = re.search(r'\bname\s*=\s*["\']([^"\']+)["\']', tag, flags=re.I)
+        if not nm:
+            continue
+        key = nm.group(1)
+        if key in f.meta:
+            continue
+        ct = re.search(r'\bcontent\s*=\s*["\']([^"\']*)["\']', tag, flags=re.I)
+        f.meta[key] = ct.group(1) if ct else ""
+    # As before bs4: a description tag with a content attribute counts, even when it is empty
+    f.meta_description_present = bool(
+        re.search(r'<meta[^>]+name=["\']description["\'][^>]*content=', html, flags=re.I)
+    )
+    m = re.search(r'<link[^>]+rel=["\']canonical["\'][^>]+href=["\']([^"\']+)["\']', html, flags=re.I)
+    if m:
+        f.canonical_links.append(("canonical", m.group(1)))
+    m = re.search(r'<base[^>]+href=["\']([^"\']+)["\']', html, flags=re.I)
+    if m:
+        f.base_href = m.group(1)
+    f.h1 = len(re.findall(r"<h1\b", html, flags=re.I))
+    f.h2 = len(re.findall(r"<h2\b", html, flags=re.I))
+    f.h3 = len(re.findall(r"<h3\b", html, flags=re.I))
+    imgs = re.findall(r"<img\b[^>]*>", html, flags=re.I)
+    f.images_total = len(imgs)
+    f.images_missing_alt = sum(1 for tag in imgs if not re.search(r'\balt\s*=\s*["\'].*?["\']', tag, flags=re.I | re.S))
+    f.anchors = [(h, "") for h in re.findall(r'href\s*=\s*["\']([^"\']+)["\']', html, flags=re.I)]
+    f.scripts = len(re.findall(r"<script\b", html, flags=re.I))
+    f.stylesheets = len(re.findall(r'rel\s*=\s*["\']stylesheet["\']', html, flags=re.I))
+    return f
+
+
+def extract_features(html: str = "", soup: Any = None) -> PageFeatures:
+    """One traversal of `soup` (or regex fallback over `html`) → PageFeatures."""
+    if soup is not None:
+        try:
+            return _from_soup(soup)
+        except Exception:
+            pass
+    return _from_regex(html)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/hostinfo.py
+Host facts for the audited site: IP addresses, reverse DNS, TLS certificate / protocol
+- host_facts(url_or_host) -> dict, collected once per audit on the event loop (loop.getaddrinfo / getnameinfo,
+  asyncio TLS handshake) with per-step timeouts — never blocks the loop, never runs inside the PDF renderer
+- TTL cache per scheme/host/port (HOSTINFO_TTL_SECONDS) so repeat audits / PDF enrichment don't resolve again
+- Every step is best-effort: a failed lookup leaves its keys out, the dict is never None
+- Result shape: {"host", "ip", "ips", "reverse_dns", "tls": {"valid", "version", "cipher", "issuer", "subject",
+  "not_after", "days_to_expiry", "san_count"} (or {"valid": False, "error"}), "collected_at"}
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as _dt
+import logging
+import os
+import socket
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+HOSTINFO_DNS_TIMEOUT = float(os.getenv("HOSTINFO_DNS_TIMEOUT", "3"))
+HOSTINFO_TLS_TIMEOUT = float(os.getenv("HOSTINFO_TLS_TIMEOUT", "5"))
+HOSTINFO_TTL_SECONDS = int(os.getenv("HOSTINFO_TTL_SECONDS", "3600"))
+HOSTINFO_CACHE_MAX_ITEMS = int(os.getenv("HOSTINFO_CACHE_MAX_ITEMS", "1024"))
+
+_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _split_host(url_or_host: str) -> Tuple[str, int, bool]:
+    """(hostname, port, tls?) from a URL or a bare host name."""
+    raw = (url_or_host or "").strip()
+    parsed = urlparse(raw if "://" in raw else f"https://{raw}")
+    host = (parsed.hostname or "").lower()
+    tls = parsed.scheme != "http"
+    try:
+        port = parsed.port or (443 if tls else 80)
+    except ValueError:
+        port = 443 if tls else 80
+    return host, port, tls
+
+
+def _tls_context() -> ssl.SSLContext:
+    try:
+        import certifi
+        return ssl.create_default_context(cafile=certifi.where())
+    except Exception:
+        return ssl.create_default_context()
+
+
+def _cert_name(entries: Any, field: str) -> Optional[str]:
+    for rdn in entries or ():
+        for key, value in rdn:
+            if key == field:
+                return value
+    return None
+
+
+async def _resolve(loop: asyncio.AbstractEventLoop, host: str, port: int) -> List[str]:
+    infos = await asyncio.wait_for(
+        loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), timeout=HOSTINFO_DNS_TIMEOUT
+    )
+    # IPv4 first (what the report used to show), then IPv6; de-duplicated, order kept
+    ips = [i[4][0] for i in infos if i[0] == socket.AF_INET] + [i[4][0] for i in infos if i[0] == socket.AF_INET6]
+    return list(dict.fromkeys(ips))
+
+
+async def _reverse(loop: asyncio.AbstractEventLoop, ip: str) -> Optional[str]:
+    name, _ = await asyncio.wait_for(
+        loop.getnameinfo((ip, 0), socket.NI_NAMEREQD), timeout=HOSTINFO_DNS_TIMEOUT
+    )
+    return name or None
+
+
+async def _tls(host: str, port: int) -> Dict[str, Any]:
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=_tls_context(), server_hostname=host),
+            timeout=HOSTINFO_TLS_TIMEOUT,
+        )
+    except ssl.SSLCertVerificationError as e:
+        return {"valid": False, "error": str(e.verify_message or e)[:200]}
+    try:
+        sslobj = writer.get_extra_info("ssl_object")
+        cert = sslobj.getpeercert() if sslobj else None
+        out: Dict[str, Any] = {"valid": True}
+        if sslobj is not None:
+            out["version"] = sslobj.version()
+            cipher = sslobj.cipher()
+            if cipher:
+                out["cipher"] = cipher[0]
+        if cert:
+            out["issuer"] = _cert_name(cert.get("issuer"), "organizationName") or _cert_name(cert.get("issuer"), "commonName")
+            out["subject"] = _cert_name(cert.get("subject"), "commonName")
+            out["san_count"] = len(cert.get("subjectAltName") or ())
+            not_after = cert.get("notAfter")
+            if not_after:
+                expires = _dt.datetime.utcfromtimestamp(ssl.cert_time_to_seconds(not_after))
+                out["not_after"] = expires.strftime("%Y-%m-%d")
+                out["days_to_expiry"] = (expires - _dt.datetime.utcnow()).days
+        return {k: v for k, v in out.items() if v is not None}
+    finally:
+        writer.close()
+        try:
+            await asyncio.wait_for(writer.wait_closed(), timeout=1.0)
+        except Exception:
+            pass
+
+
+async def _collect(host: str, port: int, tls: bool) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    facts: Dict[str, Any] = {"host": host}
+    tls_task = asyncio.create_task(_tls(host, port)) if tls else None
+    try:
+        ips = await _resolve(loop, host, port)
+        if ips:
+            facts["ip"] = ips[0]
+            facts["ips"] = ips[:8]
+            try:
+                rdns = await _reverse(loop, ips[0])
+                if rdns:
+                    facts["reverse_dns"] = rdns
+            except Exception as e:
+                logger.debug(f"reverse DNS failed for {ips[0]}: {e}")
+    except Exception as e:
+        logger.debug(f"DNS lookup failed for {host}: {e}")
+    if tls_task is not None:
+        try:
+            tls_facts = await tls_task
+            if tls_facts:
+                facts["tls"] = tls_facts
+        except Exception as e:
+            logger.debug(f"TLS probe failed for {host}: {e}")
+    facts["collected_at"] = _dt.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    return facts
+
+
+def _cache_key(host: str, port: int, tls: bool) -> str:
+    return f"{'https' if tls else 'http'}://{host}:{port}"
+
+
+def cached_host_facts(url_or_host: str) -> Optional[Dict[str, Any]]:
+    key = _cache_key(*_split_host(url_or_host))
+    with _lock:
+        item = _cache.get(key)
+        if item is None:
+            return None
+        ts, facts = item
+        if (time.time() - ts) > HOSTINFO_TTL_SECONDS:
+            _cache.pop(key, None)
+            return None
+        _cache.move_to_end(key)
+        return facts
+
+
+async def host_facts(url_or_host: str) -> Dict[str, Any]:
+    """Cached host facts; empty dict for unparseable input."""
+    host, port, tls = _split_host(url_or_host)
+    if not host:
+        return {}
+    cached = cached_host_facts(url_or_host)
+    if cached is not None:
+        return dict(cached)
+    facts = await _collect(host, port, tls)
+    if len(facts) > 2:  # something beyond host + collected_at → worth caching
+        key = _cache_key(host, port, tls)
+        with _lock:
+            _cache[key] = (time.time(), facts)
+            _cache.move_to_end(key)
+            while len(_cache) > HOSTINFO_CACHE_MAX_ITEMS:
+                _cache.popitem(last=False)
+    return dict(facts)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/parsers.py
+HTML parser backend selection for the audit pipeline
+- parse_html(html) -> BeautifulSoup tree (or None when bs4 is unavailable / parsing fails)
+- Backend chosen by AUDIT_HTML_PARSER: auto | lxml | html5-parser | html.parser | html5lib
+- auto: lxml (C, libxml2) -> html5-parser (C, if installed) -> html.parser (pure Python)
+- A backend that raises falls back to html.parser for that document, so a bad page never fails the audit
+- selectolax is not offered: it does not build a bs4 tree, and every extractor consumes one
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIT_HTML_PARSER = os.getenv("AUDIT_HTML_PARSER", "auto").strip().lower() or "auto"
+
+FALLBACK_BACKEND = "html.parser"
+AUTO_ORDER = ["lxml", "html5-parser", FALLBACK_BACKEND]
+
+
+# ------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------
+def _bs4(features: str) -> Callable[[str], Any]:
+    def build(html: str) -> Any:
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html or "", features)
+    return build
+
+
+def _html5_parser(html: str) -> Any:
+    from html5_parser import parse
+    return parse(html or "", treebuilder="soup", return_root=False)
+
+
+_BUILDERS: Dict[str, Callable[[str], Any]] = {
+    "lxml": _bs4("lxml"),
+    "html5-parser": _html5_parser,
+    "html.parser": _bs4("html.parser"),
+    "html5lib": _bs4("html5lib"),
+}
+
+
+def _importable(backend: str) -> bool:
+    try:
+        if backend == "html5-parser":
+            import html5_parser  # noqa: F401
+        elif backend == "lxml":
+            import lxml.etree  # noqa: F401
+        elif backend == "html5lib":
+            import html5lib  # noqa: F401
+        import bs4  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def available_backends() -> List[str]:
+    """Installed backends, fastest first."""
+    return [b for b in AUTO_ORDER + ["html5lib"] if _importable(b)]
+
+
+_resolved: Optional[str] = None
+
+
+def resolve_backend(name: str = "") -> Optional[str]:
+    """Concrete backend for `name` (defaults to AUDIT_HTML_PARSER); None when bs4 is missing."""
+    global _resolved
+    requested = (name or AUDIT_HTML_PARSER).strip().lower()
+    if not name and _resolved is not None:
+        return _resolved
+    backend: Optional[str] = None
+    if requested in _BUILDERS and _importable(requested):
+        backend = requested
+    else:
+        if requested not in ("auto", ""):
+            logger.warning("AUDIT_HTML_PARSER=%s is not available; using auto", requested)
+        backend = next((b for b in AUTO_ORDER if _importable(b)), None)
+    if not name:
+        _resolved = backend
+    return backend
+
+
+def parse_html(html: str, backend: str = "") -> Optional[Any]:
+    chosen = resolve_backend(backend)
+    if chosen is None:
+        return None
+    try:
+        return _BUILDERS[chosen](html)
+    except Exception as e:
+        if chosen == FALLBACK_BACKEND:
+            return None
+        logger.debug(f"{chosen} parse failed, falling back to {FALLBACK_BACKEND}: {e}")
+    try:
+        return _BUILDERS[FALLBACK_BACKEND](html)
+    except Exception:
+        return None
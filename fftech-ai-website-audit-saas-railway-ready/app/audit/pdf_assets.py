@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/pdf_assets.py
+Raster asset pipeline for the PDF report (screenshots, logo)
+- fit_image(raw, width_pt, height_pt) -> io.BytesIO sized for where it is drawn: downsampled to
+  PDF_IMAGE_DPI at the display box (never upscaled), then re-encoded as the smaller of a PNG and
+  a JPEG (PDF_IMAGE_JPEG_QUALITY; only for images without transparency)
+- Deterministic output, memoized by (sha1 of the source, target pixels): an image that appears twice is
+  processed once and yields identical bytes, which ReportLab embeds as a single XObject
+- Anything Pillow cannot read is passed through untouched; PDF_IMAGE_OPTIMIZE=0 disables the pipeline
+- Fonts need no step here: reportlab's TTFont (PDF_FONT_PATH) already embeds only the glyphs used
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+PDF_IMAGE_OPTIMIZE = os.getenv("PDF_IMAGE_OPTIMIZE", "1").lower() in {"1", "true", "yes", "on"}
+PDF_IMAGE_DPI = int(os.getenv("PDF_IMAGE_DPI", "150"))
+PDF_IMAGE_JPEG_QUALITY = int(os.getenv("PDF_IMAGE_JPEG_QUALITY", "80"))
+PDF_ASSET_CACHE_MAX_BYTES = int(os.getenv("PDF_ASSET_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+try:
+    from PIL import Image as PILImage
+except Exception:  # pragma: no cover - Pillow is a hard requirement of the PDF path
+    PILImage = None
+
+_cache: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+_cache_bytes = 0
+_lock = threading.Lock()
+_stats: Dict[str, int] = {"images": 0, "hits": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+def _target_pixels(width_pt: float, height_pt: float) -> Tuple[int, int]:
+    scale = PDF_IMAGE_DPI / 72.0
+    return max(1, int(round(width_pt * scale))), max(1, int(round(height_pt * scale)))
+
+
+def _has_alpha(img) -> bool:
+    if img.mode in ("RGBA", "LA"):
+        return img.getchannel("A").getextrema()[0] < 255
+    return img.mode == "P" and "transparency" in img.info
+
+
+def _encode(raw: bytes, target: Tuple[int, int]) -> bytes:
+    with PILImage.open(io.BytesIO(raw)) as src:
+        src.load()
+        img = src
+        # Per-axis clamp: the flowable box fixes the drawn size, so only surplus pixels are dropped
+        size = (min(img.width, target[0]), min(img.height, target[1]))
+        alpha = _has_alpha(img)
+        if img.mode not in ("RGB", "RGBA", "L", "LA"):
+            img = img.convert("RGBA" if alpha else "RGB")
+        elif not alpha and img.mode in ("RGBA", "LA"):
+            img = img.convert(img.mode[:-1])
+        if size != img.size:
+            img = img.resize(size, PILImage.LANCZOS)
+
+        candidates = []
+        # No optimize=True: ReportLab re-deflates PNG pixels itself, the extra pass only costs time
+        png = io.BytesIO()
+        img.save(png, format="PNG")
+        candidates.append(png.getvalue())
+        if not alpha:
+            jpg = io.BytesIO()
+            img.save(jpg, format="JPEG", quality=PDF_IMAGE_JPEG_QUALITY, optimize=True, progressive=False)
+            candidates.append(jpg.getvalue())
+    best = min(candidates, key=len)
+    return best if len(best) < len(raw) else raw
+
+
+def fit_image(raw: bytes, width_pt: float, height_pt: float) -> io.BytesIO:
+    """Image bytes downsampled / recompressed for a width_pt x height_pt box (original on any failure)."""
+    if not raw or not PDF_IMAGE_OPTIMIZE or PILImage is None:
+        return io.BytesIO(raw)
+    global _cache_bytes
+    target = _target_pixels(width_pt, height_pt)
+    key = (hashlib.sha1(raw).hexdigest(), *target)
+    with _lock:
+        out = _cache.get(key)
+        if out is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return io.BytesIO(out)
+    try:
+        out = _encode(raw, target)
+    except Exception as e:
+        logger.debug(f"image optimisation skipped: {e}")
+        return io.BytesIO(raw)
+    with _lock:
+        _stats["images"] += 1
+        _stats["bytes_in"] += len(raw)
+        _stats["bytes_out"] += len(out)
+        if key not in _cache and len(out) <= PDF_ASSET_CACHE_MAX_BYTES:
+            _cache[key] = out
+            _cache_bytes += len(out)
+            while _cache_bytes > PDF_ASSET_CACHE_MAX_BYTES:
+                _, dropped = _cache.popitem(last=False)
+                _cache_bytes -= len(dropped)
+    return io.BytesIO(out)
+
+
+def fit_image_file(path: str, width_pt: float, height_pt: float) -> io.BytesIO:
+    with open(path, "rb") as f:
+        return fit_image(f.read(), width_pt, height_pt)
+
+
+def stats() -> Dict[str, int]:
+    """Counters for this process (images processed, cache hits, source / embedded bytes)."""
+    with _lock:
+        return dict(_stats, cached_items=len(_cache), cached_bytes=_cache_bytes)
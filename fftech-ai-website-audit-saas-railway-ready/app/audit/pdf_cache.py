@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/pdf_cache.py
+Content-addressed, disk-backed cache of rendered PDF reports
+- Key: integrity hash (pdf_report._hash_integrity) of the runner result + PDF_TEMPLATE_VERSION + render options
+  (title, logo, ...); the same audit rendered with the same template is served from disk instead of re-rendered
+- Files live in PDF_CACHE_DIR as <key>.pdf (atomic write, shared by all workers on the host)
+- LRU by atime (set explicitly on every hit), bounded by PDF_CACHE_MAX_BYTES; mtime stays the render time and
+  entries older than PDF_CACHE_TTL_SECONDS are misses (the report carries enrichment data that goes stale)
+- Also removes orphaned audit_pdf_* temp directories left behind by earlier versions / crashed renders
+- PDF_CACHE_MAX_BYTES=0 disables the cache
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PDF_TEMPLATE_VERSION = os.getenv("PDF_TEMPLATE_VERSION", "2026.10-assets")
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "fftech_pdf_cache")))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PDF_CACHE_TTL_SECONDS = int(os.getenv("PDF_CACHE_TTL_SECONDS", "86400"))
+PDF_ORPHAN_MAX_AGE_SECONDS = int(os.getenv("PDF_ORPHAN_MAX_AGE_SECONDS", "3600"))
+ORPHAN_PREFIX = "audit_pdf_"
+_ORPHAN_SWEEP_INTERVAL = 600.0
+
+_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def enabled() -> bool:
+    return PDF_CACHE_MAX_BYTES > 0
+
+
+def cache_key(runner_result: Dict[str, Any], **options: Any) -> str:
+    """Integrity hash of the audit + template version + options that change the rendered document."""
+    from app.audit.pdf_report import _hash_integrity
+    return _hash_integrity({
+        "audit": runner_result,
+        "template": PDF_TEMPLATE_VERSION,
+        "options": {k: v for k, v in options.items() if v is not None},
+    })[:40]
+
+
+def _path(key: str) -> Path:
+    return PDF_CACHE_DIR / f"{key}.pdf"
+
+
+def get(key: str) -> Optional[Path]:
+    """Path of the cached PDF (and mark it recently used), or None."""
+    if not enabled():
+        return None
+    path = _path(key)
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    now = time.time()
+    if PDF_CACHE_TTL_SECONDS and (now - st.st_mtime) > PDF_CACHE_TTL_SECONDS:
+        _unlink(path)
+        return None
+    try:
+        os.utime(path, (now, st.st_mtime))
+    except OSError:
+        pass
+    return path
+
+
+def put_bytes(key: str, data: bytes) -> Optional[Path]:
+    if not enabled() or not data:
+        return None
+    tmp: Optional[Path] = None
+    try:
+        PDF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".part")
+        tmp = Path(name)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return _commit(key, tmp)
+    except OSError as e:
+        logger.debug(f"pdf cache write failed: {e}")
+        if tmp is not None:
+            _unlink(tmp)  # e.g. ENOSPC: don't leave the partial file on the full disk
+        return None
+
+
+def _commit(key: str, tmp: Path) -> Path:
+    path = _path(key)
+    os.replace(tmp, path)
+    _evict()
+    sweep_orphans()
+    return path
+
+
+def _evict() -> None:
+    with _lock:
+        entries = []
+        total = 0
+        for p in PDF_CACHE_DIR.glob("*.pdf"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_atime, st.st_size, p))
+            total += st.st_size
+        if total <= PDF_CACHE_MAX_BYTES:
+            return
+        for _, size, p in sorted(entries):
+            _unlink(p)
+            total -= size
+            if total <= PDF_CACHE_MAX_BYTES:
+                break
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def sweep_orphans(force: bool = False) -> int:
+    """Delete audit_pdf_* temp dirs older than PDF_ORPHAN_MAX_AGE_SECONDS (at most every 10 minutes)."""
+    global _last_sweep
+    now = time.time()
+    with _lock:
+        if not force and (now - _last_sweep) < _ORPHAN_SWEEP_INTERVAL:
+            return 0
+        _last_sweep = now
+    removed = 0
+    try:
+        for p in Path(tempfile.gettempdir()).glob(f"{ORPHAN_PREFIX}*"):
+            try:
+                if p.is_dir() and (now - p.stat().st_mtime) > PDF_ORPHAN_MAX_AGE_SECONDS:
+                    shutil.rmtree(p, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                continue
+    except OSError as e:
+        logger.debug(f"orphan sweep failed: {e}")
+    if removed:
+        logger.info("Removed %s orphaned PDF temp dirs", removed)
+    return removed
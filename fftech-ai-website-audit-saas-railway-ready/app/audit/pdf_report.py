@@ -5,7 +5,10 @@ Enterprise PDF generator (ReportLab) for WebsiteAuditRunner results.
 - Consumes dict produced by runner_result_to_audit_data(...) in app/audit/runner.py
 - Returns raw PDF bytes (runner writes to disk)
 - No network calls; safe for Railway
-- Charts rendered via matplotlib (Agg)
+- Charts drawn as native ReportLab vector graphics (reportlab.graphics Drawing)
+- Screenshots / logo downsampled to their display box and recompressed before embedding (app.audit.pdf_assets)
+- Images are prepared concurrently before layout; PDF_PROFILE=1 logs per-section story / layout timings
+  (python -m scripts.pdf_profile for a local breakdown)
 
 UPGRADES (backward-compatible; optional-data aware):
   • Phase 1: First-page clarity — larger fonts, stronger contrast, wider paddings, divider, softer watermark
@@ -19,31 +22,42 @@ UPGRADES (backward-compatible; optional-data aware):
 from __future__ import annotations
 import io
 import os
+import bisect
+import math
 import json
-import socket
 import hashlib
+import logging
+import time
 import datetime as dt
-from typing import Any, Dict, List, Optional, Tuple, Iterable
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Iterable
 from urllib.parse import urlparse
 from html import escape
 
 # ReportLab
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image, KeepTogether, HRFlowable
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image, KeepTogether, HRFlowable, Flowable
 )
 from reportlab.pdfgen.canvas import Canvas
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase.pdfmetrics import stringWidth
 
-# Charts
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import numpy as np
+# Charts (vector)
+from reportlab.graphics.shapes import Drawing, Circle, Group, Line, Polygon, PolyLine, Rect, String, Wedge
+
+from app.audit.pdf_assets import fit_image, fit_image_file
+
+# Write image / page streams as binary: the ASCII85 text wrapper only makes them 25% larger
+rl_config.useA85 = 0
+
+logger = logging.getLogger(__name__)
 
 # ------------------------------------------------------------
 # BRANDING / COLORS / ENV
@@ -52,6 +66,15 @@ PDF_BRAND_NAME = os.getenv("PDF_BRAND_NAME", "FF Tech")
 PDF_LOGO_PATH = os.getenv("PDF_LOGO_PATH", "")
 SAAS_NAME = os.getenv("PDF_REPORT_TITLE", "Website Audit Report")
 
+# PDF_PROFILE=1 logs per-section story / layout timings of every render (PDFReport.profile holds the numbers)
+PDF_PROFILE = os.getenv("PDF_PROFILE", "0").lower() in {"1", "true", "yes", "on"}
+PDF_PREP_WORKERS = int(os.getenv("PDF_PREP_WORKERS", "4"))
+
+# Display boxes of the raster images (also the targets pdf_assets sizes them for)
+LOGO_BOX = (1.8 * inch, 1.8 * inch)
+SCREENSHOT_BOX = (5.8 * inch, 3.35 * inch)
+ISSUE_SHOT_BOX = (5.8 * inch, 3.3 * inch)
+
 PRIMARY_DARK   = colors.HexColor("#1A2B3C")
 PRIMARY        = colors.HexColor("#2C3E50")
 ACCENT_BLUE    = colors.HexColor("#3498DB")
@@ -86,11 +109,13 @@ def _hostname(url: str) -> str:
         return ""
 
 
-def _get_ip(host: str) -> Optional[str]:
-    try:
-        return socket.gethostbyname(host)
-    except Exception:
+def _cert_expiry(tls: Dict[str, Any]) -> Optional[str]:
+    if tls.get("valid") is False:
+        return f"Invalid certificate ({tls.get('error') or 'verification failed'})"
+    if not tls.get("not_after"):
         return None
+    days = tls.get("days_to_expiry")
+    return f"{tls['not_after']} ({days} days left)" if days is not None else tls["not_after"]
 
 
 def _kb(n: Any) -> Optional[str]:
@@ -223,7 +248,7 @@ def _recalc_overall_score(scores: Dict[str, Any], weights: Optional[Dict[str, fl
     return int(round(total))
 
 
-# ---- Assets (homepage + issue screenshots)
+# ---- Assets (homepage + issue screenshots; sized / recompressed by app.audit.pdf_assets at the draw site)
 def _load_image_from_assets_path_or_b64(path: Optional[str], b64: Optional[str]) -> Optional[io.BytesIO]:
     if b64:
         try:
@@ -409,74 +434,172 @@ def derive_critical_issues(audit: Dict[str, Any]) -> List[Dict[str, str]]:
 
 
 # ------------------------------------------------------------
-# CHARTS
+# CHARTS (native ReportLab vector drawings — no raster step, no matplotlib)
 # ------------------------------------------------------------
-def _radar_chart(scores: Dict[str, Any]) -> io.BytesIO:
-    order = ["seo", "performance", "security", "accessibility", "ux", "links"]
+CHART_TEXT = colors.HexColor("#2C3E50")
+CHART_GRID = colors.HexColor("#D5DBE1")
+CHART_FONT = "Helvetica"
+CHART_FONT_BOLD = "Helvetica-Bold"
+CHART_CATEGORIES = ["seo", "performance", "security", "accessibility", "ux", "links"]
+
+
+def _chart_scores(scores: Dict[str, Any]) -> Tuple[List[str], List[int]]:
     labels, values = [], []
-    for k in order:
+    for k in CHART_CATEGORIES:
         if k in scores:
             labels.append(k.upper())
-            try:
-                values.append(int(scores[k]))
-            except Exception:
-                values.append(0)
+            values.append(max(0, min(100, _int_or(scores.get(k), 0))))
+    return labels, values
+
+
+CHART_SHORT_LABELS = {"PERFORMANCE": "PERF", "ACCESSIBILITY": "A11Y", "SECURITY": "SEC"}
+
+
+def _fit_label(text: str, max_width: float, font_size: float, min_size: float = 4.5) -> Tuple[str, float]:
+    """Shrink to fit max_width; below min_size fall back to the short label."""
+    width = stringWidth(text, CHART_FONT, font_size)
+    if width <= max_width:
+        return text, font_size
+    fitted = font_size * max_width / width
+    if fitted >= min_size:
+        return text, fitted
+    short = CHART_SHORT_LABELS.get(text, text)
+    return short, min(font_size, max(min_size, font_size * max_width / max(1.0, stringWidth(short, CHART_FONT, font_size))))
+
+
+def _radar_chart(scores: Dict[str, Any], size: float = 2.8 * inch) -> Drawing:
+    labels, values = _chart_scores(scores)
     if not labels:
-        labels, values = ["SCORE"], [int(scores.get("overall", 0))]
-    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-    values += values[:1]
-    angles += angles[:1]
-    fig, ax = plt.subplots(figsize=(4.8, 4.8), subplot_kw=dict(polar=True))
-    ax.fill(angles, values, color='#3498DB', alpha=0.28)
-    ax.plot(angles, values, color='#2980B9', linewidth=2.2)
-    ax.set_yticklabels([])
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(labels, fontsize=9, fontweight='bold', color='#2C3E50')
-    fig.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', transparent=True, dpi=160)
-    plt.close(fig)
-    buf.seek(0)
-    return buf
-
-
-def _bar_chart(scores: Dict[str, Any]) -> io.BytesIO:
-    cats = [k for k in ["seo", "performance", "security", "accessibility", "ux", "links"] if k in scores]
-    vals = [int(scores.get(c, 0)) for c in cats] or [int(scores.get("overall", 0))]
-    names = [c.upper() for c in cats] or ["OVERALL"]
-    palette = PALETTE[:len(names)]
-    fig, ax = plt.subplots(figsize=(6.0, 3.0))
-    bars = ax.bar(names, vals, color=palette, edgecolor='#2C3E50')
-    ax.set_ylim(0, 100)
-    ax.set_ylabel('Score', color='#2C3E50')
-    ax.set_title('Category Scores', color='#2C3E50', fontsize=10, pad=6)
-    for b, v in zip(bars, vals):
-        ax.text(b.get_x() + b.get_width() / 2, v + 1, f"{v}", ha='center', fontsize=8, color='#2C3E50')
-    ax.spines[['top', 'right']].set_visible(False)
-    fig.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', transparent=True, dpi=160)
-    plt.close(fig)
-    buf.seek(0)
-    return buf
-
-
-def _donut_overall(overall: int, title: str = 'Overall Health') -> io.BytesIO:
+        labels, values = ["SCORE"], [max(0, min(100, _int_or(scores.get("overall"), 0)))]
+    d = Drawing(size, size)
+    cx = cy = size / 2.0
+    radius = size / 2.0 - 24  # room for the axis labels
+    n = len(labels)
+    angles = [2 * math.pi * i / n for i in range(n)]  # first axis at 3 o'clock, counter-clockwise
+
+    for ring in (20, 40, 60, 80, 100):
+        d.add(Circle(cx, cy, radius * ring / 100.0, fillColor=None, strokeColor=CHART_GRID, strokeWidth=0.5))
+    for a in angles:
+        d.add(Line(cx, cy, cx + radius * math.cos(a), cy + radius * math.sin(a), strokeColor=CHART_GRID, strokeWidth=0.5))
+
+    points: List[float] = []
+    for a, v in zip(angles, values):
+        points += [cx + radius * v / 100.0 * math.cos(a), cy + radius * v / 100.0 * math.sin(a)]
+    if n >= 3:
+        d.add(Polygon(points, fillColor=colors.HexColor("#3498DB"), fillOpacity=0.28,
+                      strokeColor=colors.HexColor("#2980B9"), strokeWidth=1.6))
+    else:
+        d.add(PolyLine(points + points[:2], strokeColor=colors.HexColor("#2980B9"), strokeWidth=1.6))
+
+    for a, lbl in zip(angles, labels):
+        lx, ly = cx + (radius + 10) * math.cos(a), cy + (radius + 10) * math.sin(a)
+        c = math.cos(a)
+        anchor = "middle" if abs(c) < 0.3 else ("start" if c > 0 else "end")
+        d.add(String(lx, ly - 3, lbl, fontName=CHART_FONT_BOLD, fontSize=7, fillColor=CHART_TEXT, textAnchor=anchor))
+    return d
+
+
+def _bar_chart(scores: Dict[str, Any], width: float = 3.0 * inch, height: float = 2.2 * inch) -> Drawing:
+    names, vals = _chart_scores(scores)
+    if not names:
+        names, vals = ["OVERALL"], [max(0, min(100, _int_or(scores.get("overall"), 0)))]
+    d = Drawing(width, height)
+    left, right, bottom, top = 30.0, 6.0, 20.0, 22.0
+    plot_w, plot_h = width - left - right, height - bottom - top
+
+    d.add(String(left + plot_w / 2.0, height - 11, "Category Scores", fontName=CHART_FONT, fontSize=8,
+                 fillColor=CHART_TEXT, textAnchor="middle"))
+    lbl = String(0, 0, "Score", fontName=CHART_FONT, fontSize=6.5, fillColor=CHART_TEXT, textAnchor="middle")
+    g = Group(lbl)
+    g.rotate(90)
+    g.translate(bottom + plot_h / 2.0, -8)
+    d.add(g)
+    for tick in range(0, 101, 20):
+        y = bottom + plot_h * tick / 100.0
+        d.add(Line(left - 2, y, left, y, strokeColor=CHART_TEXT, strokeWidth=0.5))
+        d.add(String(left - 4, y - 2, str(tick), fontName=CHART_FONT, fontSize=5.5, fillColor=CHART_TEXT, textAnchor="end"))
+    d.add(Line(left, bottom, left, bottom + plot_h, strokeColor=CHART_TEXT, strokeWidth=0.6))
+    d.add(Line(left, bottom, left + plot_w, bottom, strokeColor=CHART_TEXT, strokeWidth=0.6))
+
+    slot = plot_w / len(names)
+    bar_w = slot * 0.8
+    for i, (name, v) in enumerate(zip(names, vals)):
+        x = left + slot * i + (slot - bar_w) / 2.0
+        h = plot_h * v / 100.0
+        d.add(Rect(x, bottom, bar_w, h, fillColor=colors.HexColor(PALETTE[i % len(PALETTE)]),
+                   strokeColor=CHART_TEXT, strokeWidth=0.5))
+        d.add(String(x + bar_w / 2.0, bottom + h + 2, str(v), fontName=CHART_FONT, fontSize=6,
+                     fillColor=CHART_TEXT, textAnchor="middle"))
+        label, fs = _fit_label(name, slot - 2, 6.0)
+        d.add(String(x + bar_w / 2.0, bottom - 8, label, fontName=CHART_FONT, fontSize=fs,
+                     fillColor=CHART_TEXT, textAnchor="middle"))
+    return d
+
+
+def _donut_overall(overall: int, title: str = 'Overall Health', size: float = 2.0 * inch) -> Drawing:
     risk = _risk_from_score(overall)
     color = {'Low': '#27AE60', 'Medium': '#F39C12', 'High': '#E67E22', 'Critical': '#C0392B'}[risk]
-    fig, ax = plt.subplots(figsize=(3.2, 3.2))
-    val = max(min(int(overall), 100), 0)
-    vals = [val, 100 - val]
-    ax.pie(vals, colors=[color, '#ECF0F1'], startangle=90, counterclock=False,
-           wedgeprops={'width': 0.42, 'edgecolor': 'white'})
-    ax.text(0, 0, f"{val}\n/100", ha='center', va='center', fontsize=12, color='#2C3E50')
-    ax.set_title(title, color='#2C3E50', fontsize=10, pad=6)
-    plt.axis('equal')
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', transparent=True, dpi=160)
-    plt.close(fig)
-    buf.seek(0)
-    return buf
+    val = max(min(_int_or(overall, 0), 100), 0)
+    d = Drawing(size, size)
+    title_size = 8 if size >= 1.8 * inch else 7
+    r = (size - title_size - 10) / 2.0
+    cx, cy = size / 2.0, r + 2
+    inner = r * 0.58  # ring width 0.42 of the radius
+
+    # Clockwise from 12 o'clock: value wedge first, then the remainder
+    if val >= 100:
+        d.add(Wedge(cx, cy, r, 0, 359.99, radius1=inner, fillColor=colors.HexColor(color), strokeColor=None))
+    elif val <= 0:
+        d.add(Wedge(cx, cy, r, 0, 359.99, radius1=inner, fillColor=colors.HexColor('#ECF0F1'), strokeColor=None))
+    else:
+        split = 90.0 - 3.6 * val
+        d.add(Wedge(cx, cy, r, split, 90.0, radius1=inner, fillColor=colors.HexColor(color),
+                    strokeColor=colors.white, strokeWidth=1))
+        d.add(Wedge(cx, cy, r, 90.0 - 360.0, split, radius1=inner, fillColor=colors.HexColor('#ECF0F1'),
+                    strokeColor=colors.white, strokeWidth=1))
+
+    num_size = max(8.0, r * 0.34)
+    d.add(String(cx, cy + 1, str(val), fontName=CHART_FONT, fontSize=num_size, fillColor=CHART_TEXT, textAnchor="middle"))
+    d.add(String(cx, cy - num_size * 0.85, "/100", fontName=CHART_FONT, fontSize=num_size * 0.6,
+                 fillColor=CHART_TEXT, textAnchor="middle"))
+    d.add(String(cx, size - title_size - 1, title, fontName=CHART_FONT, fontSize=title_size,
+                 fillColor=CHART_TEXT, textAnchor="middle"))
+    return d
+
+
+def _risk_matrix_chart(points: List[Tuple[int, int, str]], size: float = 3.8 * inch) -> Drawing:
+    """Scatter of (likelihood 1–3, impact 1–4, label) on a dashed grid."""
+    d = Drawing(size, size)
+    left, right, bottom, top = 34.0, 10.0, 30.0, 22.0
+    plot_w, plot_h = size - left - right, size - bottom - top
+
+    def px(x: float) -> float:
+        return left + (x - 0.5) / 3.0 * plot_w
+
+    def py(y: float) -> float:
+        return bottom + (y - 0.5) / 4.0 * plot_h
+
+    d.add(Rect(left, bottom, plot_w, plot_h, fillColor=None, strokeColor=CHART_TEXT, strokeWidth=0.6))
+    for x in (1, 2, 3):
+        d.add(Line(px(x), bottom, px(x), bottom + plot_h, strokeColor=CHART_GRID, strokeWidth=0.5, strokeDashArray=[3, 2]))
+        d.add(String(px(x), bottom - 10, str(x), fontName=CHART_FONT, fontSize=7, fillColor=CHART_TEXT, textAnchor="middle"))
+    for y in (1, 2, 3, 4):
+        d.add(Line(left, py(y), left + plot_w, py(y), strokeColor=CHART_GRID, strokeWidth=0.5, strokeDashArray=[3, 2]))
+        d.add(String(left - 5, py(y) - 2.5, str(y), fontName=CHART_FONT, fontSize=7, fillColor=CHART_TEXT, textAnchor="end"))
+
+    d.add(String(left + plot_w / 2.0, size - 14, "Risk Matrix", fontName=CHART_FONT, fontSize=10,
+                 fillColor=CHART_TEXT, textAnchor="middle"))
+    d.add(String(left + plot_w / 2.0, 6, "Likelihood", fontName=CHART_FONT, fontSize=8,
+                 fillColor=CHART_TEXT, textAnchor="middle"))
+    g = Group(String(0, 0, "Impact", fontName=CHART_FONT, fontSize=8, fillColor=CHART_TEXT, textAnchor="middle"))
+    g.rotate(90)
+    g.translate(bottom + plot_h / 2.0, -12)
+    d.add(g)
+
+    for x, y, lbl in points:
+        d.add(Circle(px(x), py(y), 3.5, fillColor=colors.HexColor('#C0392B'), fillOpacity=0.7, strokeColor=None))
+        d.add(String(px(x) + 5, py(y) + 4, lbl, fontName=CHART_FONT, fontSize=6.5, fillColor=CHART_TEXT))
+    return d
 
 
 # ------------------------------------------------------------
@@ -575,32 +698,137 @@ def _collect_extended_metrics(audit: Dict[str, Any]) -> List[Tuple[str, str]]:
 # ------------------------------------------------------------
 # PDF GENERATOR
 # ------------------------------------------------------------
+# ------------------------------------------------------------
+# FONTS / STYLES (built once per process, shared by every report)
+# Flowables are built per report: layout stores wrap / split state on them (and on table cells),
+# so sharing instances between concurrent renders is unsafe; copying them costs more than building
+# ------------------------------------------------------------
+_memo_lock = threading.RLock()
+_fonts: Dict[str, str] = {}
+_stylesheets: Dict[str, StyleSheet1] = {}
+
+
+def _base_font() -> str:
+    """Register PDF_FONT_PATH once; Helvetica when unset or unreadable."""
+    font_path = os.getenv("PDF_FONT_PATH", "")
+    with _memo_lock:
+        if font_path not in _fonts:
+            try:
+                if font_path and os.path.exists(font_path):
+                    pdfmetrics.registerFont(TTFont("BrandSans", font_path))
+                    _fonts[font_path] = "BrandSans"
+                else:
+                    _fonts[font_path] = "Helvetica"
+            except Exception:
+                _fonts[font_path] = "Helvetica"
+        return _fonts[font_path]
+
+
+def _report_styles(base_font: str) -> StyleSheet1:
+    """Sample stylesheet + report styles; read-only after construction, so one instance is shared."""
+    with _memo_lock:
+        styles = _stylesheets.get(base_font)
+        if styles is None:
+            styles = getSampleStyleSheet()
+            # Phase 1: bigger, crisper, darker
+            styles.add(ParagraphStyle('Muted', fontSize=9, textColor=MUTED_GREY, leading=12, fontName=base_font))
+            styles.add(ParagraphStyle('H2', parent=styles['Heading2'], textColor=PRIMARY_DARK, fontName=base_font))
+            styles.add(ParagraphStyle('H3', parent=styles['Heading3'], textColor=PRIMARY_DARK, fontName=base_font))
+            styles.add(ParagraphStyle('Note', fontSize=9, textColor=MUTED_GREY, leading=12, fontName=base_font))
+            styles.add(ParagraphStyle('Tiny', fontSize=8, textColor=MUTED_GREY, fontName=base_font))
+            styles.add(ParagraphStyle('Brand', fontSize=36, textColor=PRIMARY_DARK, fontName=base_font))
+            styles.add(ParagraphStyle('ReportTitle', fontSize=32, leading=36, textColor=PRIMARY_DARK, fontName=base_font))
+            styles.add(ParagraphStyle('Caption', fontSize=8, textColor=MUTED_GREY, leading=10, fontName=base_font))
+            styles.add(ParagraphStyle('KPI', fontSize=13, textColor=PRIMARY_DARK, leading=15, fontName=base_font))
+            _stylesheets[base_font] = styles
+        return styles
+
+
+# ------------------------------------------------------------
+# BUILD PROFILER / CONCURRENT ASSET PREPARATION
+# ------------------------------------------------------------
+class _Mark(Flowable):
+    """
+    Zero-size flowable that records (name, time, page) when layout reaches it: section timings while
+    profiling, report start pages in a bundle.
+    """
+
+    def __init__(self, name: str, sink: List[Tuple[str, float, int]]):
+        super().__init__()
+        self.name = name
+        self._sink = sink
+        self.width = self.height = 0
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        # No canvas operations at all, so a marked story lays out and draws exactly like an unmarked one
+        self._sink.append((self.name, time.perf_counter(), canvas.getPageNumber()))
+
+
+_prep_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _prep_executor() -> ThreadPoolExecutor:
+    """Shared threads for image decode / resize / encode (Pillow releases the GIL for those)."""
+    global _prep_pool
+    with _memo_lock:
+        if _prep_pool is None:
+            _prep_pool = ThreadPoolExecutor(max_workers=max(1, PDF_PREP_WORKERS), thread_name_prefix="pdf-prep")
+        return _prep_pool
+
+
+def _profile_summary(
+    story_ms: Dict[str, float],
+    marks: List[Tuple[str, float, int]],
+    t_start: float,
+    t_layout: float,
+    t_end: float,
+    prepare_ms: float,
+    pages: int,
+) -> Dict[str, Any]:
+    """Per-section story (flowable construction) and layout (wrap / split / draw) times in ms."""
+    layout_ms: Dict[str, float] = {}
+    for (name, t0, _), (_, t1, _) in zip(marks, marks[1:]):
+        layout_ms[name] = layout_ms.get(name, 0.0) + (t1 - t0) * 1000
+    sections = [
+        {"section": name, "story_ms": round(ms, 1), "layout_ms": round(layout_ms.get(name, 0.0), 1)}
+        for name, ms in story_ms.items()
+    ]
+    last = marks[-1][1] if marks else t_end
+    return {
+        "total_ms": round((t_end - t_start) * 1000, 1),
+        "prepare_ms": round(prepare_ms, 1),
+        "story_ms": round(sum(story_ms.values()), 1),
+        "layout_ms": round((last - t_layout) * 1000, 1),
+        "finalize_ms": round((t_end - last) * 1000, 1),
+        "pages": pages,
+        "sections": sections,
+    }
+
+
+def _log_profile(profile: Dict[str, Any], top: int = 5) -> None:
+    ranked = sorted(profile["sections"], key=lambda r: r["story_ms"] + r["layout_ms"], reverse=True)
+    logger.info(
+        "PDF profile: total %.0fms (prepare %.0f, story %.0f, layout %.0f, finalize %.0f), %s pages; slowest: %s",
+        profile["total_ms"], profile["prepare_ms"], profile["story_ms"], profile["layout_ms"], profile["finalize_ms"],
+        profile["pages"],
+        ", ".join(f"{r['section']} {r['story_ms'] + r['layout_ms']:.0f}ms" for r in ranked[:top]),
+    )
+    for r in ranked:
+        logger.debug("PDF profile section %-32s story %7.1fms  layout %7.1fms", r["section"], r["story_ms"], r["layout_ms"])
+
+
 class PDFReport:
-    def __init__(self, audit: Dict[str, Any]):
+    def __init__(self, audit: Dict[str, Any], profile: Optional[bool] = None):
         self.data = audit
+        self._profiling = PDF_PROFILE if profile is None else bool(profile)
+        self.profile: Optional[Dict[str, Any]] = None
 
-        # Optional custom font (fallback to Helvetica)
-        font_path = os.getenv("PDF_FONT_PATH", "")
-        try:
-            if font_path and os.path.exists(font_path):
-                pdfmetrics.registerFont(TTFont("BrandSans", font_path))
-                base_font = "BrandSans"
-            else:
-                base_font = "Helvetica"
-        except Exception:
-            base_font = "Helvetica"
-
-        self.styles = getSampleStyleSheet()
-        # Phase 1: bigger, crisper, darker
-        self.styles.add(ParagraphStyle('Muted', fontSize=9, textColor=MUTED_GREY, leading=12, fontName=base_font))
-        self.styles.add(ParagraphStyle('H2', parent=self.styles['Heading2'], textColor=PRIMARY_DARK, fontName=base_font))
-        self.styles.add(ParagraphStyle('H3', parent=self.styles['Heading3'], textColor=PRIMARY_DARK, fontName=base_font))
-        self.styles.add(ParagraphStyle('Note', fontSize=9, textColor=MUTED_GREY, leading=12, fontName=base_font))
-        self.styles.add(ParagraphStyle('Tiny', fontSize=8, textColor=MUTED_GREY, fontName=base_font))
-        self.styles.add(ParagraphStyle('Brand', fontSize=36, textColor=PRIMARY_DARK, fontName=base_font))
-        self.styles.add(ParagraphStyle('ReportTitle', fontSize=32, leading=36, textColor=PRIMARY_DARK, fontName=base_font))
-        self.styles.add(ParagraphStyle('Caption', fontSize=8, textColor=MUTED_GREY, leading=10, fontName=base_font))
-        self.styles.add(ParagraphStyle('KPI', fontSize=13, textColor=PRIMARY_DARK, leading=15, fontName=base_font))
+        # Fonts + styles are process-wide (registered / built once)
+        self.base_font = _base_font()
+        self.styles = _report_styles(self.base_font)
 
         # Integrity & IDs
         self.integrity = _hash_integrity(audit)
@@ -634,9 +862,16 @@ class PDFReport:
         # Overview
         host = _hostname(self.url or "")
         perf_extras = _safe_get(self.data, ["breakdown", "performance", "extras"], {})
+        # DNS / TLS facts come from the audit (app.audit.hostinfo) — the renderer makes no network calls
+        facts = audit.get("host") if isinstance(audit.get("host"), dict) else {}
+        tls = facts.get("tls") if isinstance(facts.get("tls"), dict) else {}
         self.overview = {
             "domain": host or None,
-            "ip": _get_ip(host) if host else None,
+            "ip": facts.get("ip"),
+            "reverse_dns": facts.get("reverse_dns"),
+            "tls_version": " ".join(filter(None, [tls.get("version"), f"({tls['cipher']})" if tls.get("cipher") else None])) or None,
+            "cert_issuer": tls.get("issuer"),
+            "cert_expiry": _cert_expiry(tls),
             "hosting_provider": None,
             "server_location": None,
             "cms": None,
@@ -738,7 +973,7 @@ class PDFReport:
 
         if isinstance(PDF_LOGO_PATH, str) and PDF_LOGO_PATH and os.path.exists(PDF_LOGO_PATH):
             try:
-                block.append(Image(PDF_LOGO_PATH, width=1.8 * inch, height=1.8 * inch))
+                block.append(Image(fit_image_file(PDF_LOGO_PATH, *LOGO_BOX), width=LOGO_BOX[0], height=LOGO_BOX[1]))
                 block.append(Spacer(1, 0.25 * inch))
             except Exception:
                 pass
@@ -839,9 +1074,9 @@ class PDFReport:
     def executive_summary(self, elems: List[Any]):
         elems.append(self._section_title("Executive Health Summary"))
 
-        radar = Image(_radar_chart(self.scores), width=2.8 * inch, height=2.8 * inch)
-        bars = Image(_bar_chart(self.scores), width=3.0 * inch, height=2.2 * inch)
-        donut = Image(_donut_overall(self.overall), width=2.0 * inch, height=2.0 * inch)
+        radar = _radar_chart(self.scores, size=2.8 * inch)
+        bars = _bar_chart(self.scores, width=3.0 * inch, height=2.2 * inch)
+        donut = _donut_overall(self.overall, size=2.0 * inch)
         grid = Table([[radar, Table([[bars], [donut]], style=[('ALIGN', (0, 0), (-1, -1), 'CENTER')])]],
                      colWidths=[3.0 * inch, 3.1 * inch])
         grid.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'MIDDLE')]))
@@ -905,13 +1140,13 @@ class PDFReport:
 
     def executive_one_pager(self, elems: List[Any]):
         elems.append(self._section_title("Executive Highlights"))
-        donut_overall = Image(_donut_overall(self.overall), width=2.0 * inch, height=2.0 * inch)
+        donut_overall = _donut_overall(self.overall, size=2.0 * inch)
         cats = ["performance", "seo", "security", "accessibility"]
         smalls = []
         for c in cats:
             if c in self.scores:
                 val = int(self.scores.get(c, 0))
-                img = Image(_donut_overall(val, title=c.upper()), width=1.5 * inch, height=1.5 * inch)
+                img = _donut_overall(val, title=c.upper(), size=1.5 * inch)
                 smalls.append(Table([[Paragraph(c.upper(), self.styles['Tiny'])], [img]],
                                     style=[('ALIGN', (0, 0), (-1, -1), 'CENTER')]))
         grid = Table([[donut_overall, Table([smalls[:2], smalls[2:]], style=[('ALIGN', (0, 0), (-1, -1), 'CENTER')])]],
@@ -1069,7 +1304,7 @@ class PDFReport:
         img_buf = _load_homepage_screenshot(self.assets)
         if img_buf:
             try:
-                elems.append(Image(img_buf, width=5.8 * inch, height=3.35 * inch))
+                elems.append(Image(fit_image(img_buf.getvalue(), *SCREENSHOT_BOX), width=SCREENSHOT_BOX[0], height=SCREENSHOT_BOX[1]))
             except Exception:
                 elems.append(Paragraph("Screenshot could not be rendered.", self.styles['Muted']))
         else:
@@ -1084,7 +1319,11 @@ class PDFReport:
         for label, val in [
             ("Domain Name", self.overview.get("domain")),
             ("IP Address", self.overview.get("ip")),
+            ("Reverse DNS", self.overview.get("reverse_dns")),
             ("SSL Status", self.overview.get("ssl_status")),
+            ("TLS Protocol", self.overview.get("tls_version")),
+            ("Certificate Issuer", self.overview.get("cert_issuer")),
+            ("Certificate Expiry", self.overview.get("cert_expiry")),
             ("Page Load Time", f"{self.overview.get('load_ms')} ms" if self.overview.get('load_ms') else None),
             ("Page Size", self.overview.get("page_size")),
             ("Total Requests (approx)", str(self.overview.get("total_requests_approx")) if self.overview.get("total_requests_approx") else None),
@@ -1491,7 +1730,7 @@ class PDFReport:
         for title, buf in shots[:6]:
             elems.append(Paragraph(escape(title), self.styles['H2']))
             try:
-                elems.append(Image(buf, width=5.8 * inch, height=3.3 * inch))
+                elems.append(Image(fit_image(buf.getvalue(), *ISSUE_SHOT_BOX), width=ISSUE_SHOT_BOX[0], height=ISSUE_SHOT_BOX[1]))
             except Exception:
                 elems.append(Paragraph("Screenshot could not be rendered.", self.styles['Muted']))
             elems.append(Spacer(1, 0.08 * inch))
@@ -1604,6 +1843,7 @@ class PDFReport:
     # --------------------- NEW: 30-60-90 Day Plan ---------------------
     def plan_30_60_90_section(self, elems: List[Any]):
         elems.append(self._section_title("30-60-90 Day Plan"))
+
         rows = [["Phase", "Focus", "Examples"]]
         rows.append(["0–30 Days", "High-impact, low-effort fixes", "Compress hero images, defer non-critical JS, add robots/sitemap if missing, fix top a11y issues."])
         rows.append(["30–60 Days", "Performance tuning", "Code-split JS, preconnect critical origins, reduce INP long tasks, strengthen CSP."])
@@ -1620,8 +1860,10 @@ class PDFReport:
                 w.update({k: float(v) for k, v in self.weights.items() if k in w})
             except Exception:
                 pass
+        order = ["seo", "performance", "security", "accessibility", "ux", "links"]
+
         rows = [["Category", "Weight"]]
-        for k in ["seo", "performance", "security", "accessibility", "ux", "links"]:
+        for k in order:
             rows.append([k.upper(), f"{int(w[k] * 100)}%"])
         elems.append(self._table(rows, colWidths=[3.2 * inch, 3.1 * inch], header_bg=PALE_BLUE))
         if self.runner_overall != self.overall:
@@ -1663,27 +1905,11 @@ class PDFReport:
         def like(cat: str) -> int:
             return {"Security": 3, "Performance": 3, "SEO": 2, "Accessibility": 2}.get(cat, 2)
 
-        xs, ys, labels = [], [], []
-        for i in issues[:12]:
-            xs.append(like(i.get('category', '')))
-            ys.append(map_priority(i.get('priority', '🟢 Low')))
-            labels.append(i.get('category', '')[:3].upper())
-
-        fig, ax = plt.subplots(figsize=(4.0, 4.0))
-        ax.scatter(xs, ys, c='#C0392B', alpha=0.7)
-        for x, y, lbl in zip(xs, ys, labels):
-            ax.text(x + 0.03, y + 0.05, lbl, fontsize=8)
-        ax.set_xlim(0.5, 3.5); ax.set_ylim(0.5, 4.5)
-        ax.set_xticks([1, 2, 3]); ax.set_yticks([1, 2, 3, 4])
-        ax.set_xlabel('Likelihood'); ax.set_ylabel('Impact')
-        ax.set_title('Risk Matrix')
-        ax.grid(True, linestyle='--', alpha=0.3)
-        buf = io.BytesIO()
-        plt.tight_layout()
-        plt.savefig(buf, format='png', dpi=160, transparent=True)
-        plt.close(fig)
-        buf.seek(0)
-        elems.append(Image(buf, width=3.8 * inch, height=3.8 * inch))
+        points = [
+            (like(i.get('category', '')), map_priority(i.get('priority', '🟢 Low')), i.get('category', '')[:3].upper())
+            for i in issues[:12]
+        ]
+        elems.append(_risk_matrix_chart(points, size=3.8 * inch))
         self._section_data_note(elems)
         elems.append(PageBreak())
 
@@ -1766,42 +1992,88 @@ class PDFReport:
             self.styles['Tiny']
         ))
 
+    def _sections(self) -> List[Callable[[List[Any]], None]]:
+        return [
+            self.cover_page,
+            self.toc_page,
+            self.executive_summary,
+            self.executive_one_pager,
+            self.core_web_vitals_section,
+            self.what_we_audited,
+            self.website_overview,
+            self.industry_benchmark_section,
+            self.business_impact_section,
+            self.competitive_analysis_section,
+            self.seo_section,
+            self.performance_section,
+            self.security_section,
+            self.accessibility_section,
+            self.ux_section,
+            self.crawl_summary_section,     # optional
+            self.visual_proof_section,      # optional
+            self.broken_links_section,
+            self.analytics_tracking_section,
+            self.critical_issues_section,
+            self.recommendations_section,
+            self.plan_30_60_90_section,
+            self.scoring_methodology_section,
+            self.maturity_index_section,
+            self.risk_matrix_section,
+            self.extended_metrics_section,  # optional annex, gated by env
+            self.appendix_section,
+            self.conclusion_section,
+        ]
+
+    def _prepare_assets(self) -> None:
+        """
+        Decode / downsample / recompress every raster image concurrently before layout; the sections
+        then pick the results up from the pdf_assets memo instead of processing images one by one.
+        """
+        jobs: List[Tuple[Callable[..., Any], Tuple[Any, ...]]] = []
+        if isinstance(PDF_LOGO_PATH, str) and PDF_LOGO_PATH and os.path.exists(PDF_LOGO_PATH):
+            jobs.append((fit_image_file, (PDF_LOGO_PATH, *LOGO_BOX)))
+        shot = _load_homepage_screenshot(self.assets)
+        if shot:
+            jobs.append((fit_image, (shot.getvalue(), *SCREENSHOT_BOX)))
+        for _, buf in _load_issue_screenshots(self.assets)[:6]:
+            jobs.append((fit_image, (buf.getvalue(), *ISSUE_SHOT_BOX)))
+        if len(jobs) < 2:
+            return  # nothing to overlap; the draw site does the single image itself
+        for fut in [_prep_executor().submit(fn, *args) for fn, args in jobs]:
+            try:
+                fut.result()
+            except Exception as e:  # the draw site falls back / reports it
+                logger.debug(f"asset preparation failed: {e}")
+
     def build_pdf_bytes(self) -> bytes:
+        t_start = time.perf_counter()
+        self._prepare_assets()
+        prepare_ms = (time.perf_counter() - t_start) * 1000
+
         buf = io.BytesIO()
         doc = SimpleDocTemplate(
             buf, pagesize=A4,
             rightMargin=40, leftMargin=40, topMargin=40, bottomMargin=40
         )
         elems: List[Any] = []
-        self.cover_page(elems)
-        self.toc_page(elems)
-        self.executive_summary(elems)
-        self.executive_one_pager(elems)
-        self.core_web_vitals_section(elems)
-        self.what_we_audited(elems)
-        self.website_overview(elems)
-        self.industry_benchmark_section(elems)
-        self.business_impact_section(elems)
-        self.competitive_analysis_section(elems)
-        self.seo_section(elems)
-        self.performance_section(elems)
-        self.security_section(elems)
-        self.accessibility_section(elems)
-        self.ux_section(elems)
-        self.crawl_summary_section(elems)     # optional
-        self.visual_proof_section(elems)      # optional
-        self.broken_links_section(elems)
-        self.analytics_tracking_section(elems)
-        self.critical_issues_section(elems)
-        self.recommendations_section(elems)
-        self.plan_30_60_90_section(elems)
-        self.scoring_methodology_section(elems)
-        self.maturity_index_section(elems)
-        self.risk_matrix_section(elems)
-        self.extended_metrics_section(elems)  # optional annex, gated by env
-        self.appendix_section(elems)
-        self.conclusion_section(elems)
+        marks: List[Tuple[str, float, int]] = []
+        story_ms: Dict[str, float] = {}
+        for section in self._sections():
+            if self._profiling:
+                elems.append(_Mark(section.__name__, marks))
+            t0 = time.perf_counter()
+            section(elems)
+            story_ms[section.__name__] = (time.perf_counter() - t0) * 1000
+        if self._profiling:
+            elems.append(_Mark("_end", marks))
+
+        t_layout = time.perf_counter()
         doc.build(elems, onFirstPage=self._footer, onLaterPages=self._footer)
+        if self._profiling:
+            self.profile = _profile_summary(
+                story_ms, marks, t_start, t_layout, time.perf_counter(), prepare_ms, doc.page
+            )
+            _log_profile(self.profile)
         return buf.getvalue()
 
 
@@ -1822,3 +2094,111 @@ def generate_audit_pdf(audit_data: Dict[str, Any]) -> bytes:
     """
     report = PDFReport(audit_data)
     return report.build_pdf_bytes()
+
+
+# ------------------------------------------------------------
+# AGENCY BUNDLE (several audits, one document)
+# ------------------------------------------------------------
+class AuditBundle:
+    """
+    One PDF for many audits: shared cover + contents (with start pages), then every report in full
+    (its own cover as the divider, without its per-report contents page). Fonts and styles are the
+    process-wide memos; every report still builds its own flowables.
+    Laid out twice: the first pass only finds the page each report starts on.
+    """
+
+    def __init__(self, audits: List[Dict[str, Any]], title: Optional[str] = None, brand: Optional[str] = None):
+        self.reports = [PDFReport(a) for a in audits]
+        self.brand = brand or (self.reports[0].brand if self.reports else PDF_BRAND_NAME)
+        self.title = title or "Website Audit Portfolio"
+        self.base_font = _base_font()
+        self.styles = _report_styles(self.base_font)
+        self.integrity = _hash_integrity({"bundle": [r.integrity for r in self.reports], "title": self.title})
+        self.created = _now_str()
+        self._starts: List[int] = []
+
+    def _cover(self, elems: List[Any]) -> None:
+        scores = [r.overall for r in self.reports]
+        avg = int(round(sum(scores) / len(scores))) if scores else 0
+        elems.append(Spacer(1, 0.55 * inch))
+        elems.append(_chip(self.brand, ACCENT_INDIGO, pad_x=10, pad_y=4, font_size=11))
+        elems.append(Spacer(1, 0.18 * inch))
+        elems.append(Paragraph(escape(self.title), self.styles['ReportTitle']))
+        elems.append(Spacer(1, 0.20 * inch))
+        elems.append(Paragraph(
+            f"{len(self.reports)} websites audited • Generated {escape(self.created)}", self.styles['KPI']
+        ))
+        elems.append(Spacer(1, 0.30 * inch))
+        elems.append(_donut_overall(avg, title="Portfolio Average"))
+        elems.append(PageBreak())
+
+    def _contents(self, elems: List[Any]) -> None:
+        elems.append(Paragraph("Websites in this report", self.styles['Heading1']))
+        rows = [["#", "Website", "Score", "Risk", "Page"]]
+        for i, r in enumerate(self.reports):
+            page = str(self._starts[i]) if i < len(self._starts) else "–"
+            rows.append([str(i + 1), Paragraph(escape(str(r.site_name or r.url or "Website")), self.styles['Normal']),
+                         f"{r.overall}/100", r.risk, page])
+        elems.append(_zebra_table(rows, colWidths=[0.4 * inch, 3.9 * inch, 0.8 * inch, 0.8 * inch, 0.6 * inch]))
+        elems.append(PageBreak())
+
+    def _story(self, marks: List[Tuple[str, float, int]]) -> List[Any]:
+        elems: List[Any] = []
+        self._cover(elems)
+        self._contents(elems)
+        for i, report in enumerate(self.reports):
+            elems.append(_Mark(str(i), marks))
+            for section in report._sections():
+                if section.__name__ != "toc_page":
+                    section(elems)
+            if not isinstance(elems[-1], PageBreak):
+                elems.append(PageBreak())
+        return elems
+
+    def _footer(self, canvas: Canvas, doc) -> None:
+        idx = bisect.bisect_right(self._starts, doc.page) - 1
+        if idx >= 0:
+            self.reports[idx]._footer(canvas, doc)
+            return
+        canvas.saveState()
+        canvas.setFillColor(ACCENT_INDIGO)
+        canvas.rect(0, 0.45 * inch, A4[0], 0.02 * inch, fill=1, stroke=0)
+        canvas.setFont('Helvetica', 8)
+        canvas.setFillColor(PRIMARY_DARK)
+        canvas.drawString(inch, 0.28 * inch, f"{self.brand} | Integrity: {self.integrity[:16]}…")
+        canvas.drawRightString(A4[0] - inch, 0.28 * inch, f"Page {doc.page}")
+        if doc.page == 1:
+            canvas.setTitle(self.title)
+            canvas.setAuthor(self.brand)
+        canvas.restoreState()
+
+    def _build(self) -> Tuple[bytes, List[int]]:
+        buf = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buf, pagesize=A4,
+            rightMargin=40, leftMargin=40, topMargin=40, bottomMargin=40
+        )
+        marks: List[Tuple[str, float, int]] = []
+        doc.build(self._story(marks), onFirstPage=self._footer, onLaterPages=self._footer)
+        return buf.getvalue(), [page for _, _, page in marks]
+
+    def build_pdf_bytes(self) -> bytes:
+        if not self.reports:
+            raise ValueError("AuditBundle needs at least one audit")
+        for r in self.reports:
+            r._prepare_assets()
+        # Pass 1 finds the start pages; the contents table keeps its height, so pass 2 paginates identically
+        _, self._starts = self._build()
+        pdf, starts = self._build()
+        if starts != self._starts:
+            logger.warning("PDF bundle pagination shifted between passes: %s -> %s", self._starts, starts)
+        return pdf
+
+
+def generate_bundle_pdf(
+    audits: List[Dict[str, Any]],
+    title: Optional[str] = None,
+    brand: Optional[str] = None,
+) -> bytes:
+    """Several audit_data dicts (runner_result_to_audit_data format) as one agency PDF."""
+    return AuditBundle(audits, title=title, brand=brand).build_pdf_bytes()
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+app/audit/pdf_service.py
+PDF rendering service (ReportLab layout + charts) off the request event loop
+- render_pdf(audit_data) -> bytes, rendered in a dedicated process pool (PDF_RENDER_WORKERS, spawn)
+- Workers pre-import reportlab (platypus + graphics) and app.audit.pdf_report in their initializer,
+  so the first render in a worker does not pay the import cost
+- Admission control: at most PDF_RENDER_WORKERS + PDF_RENDER_QUEUE_MAX renders in flight, beyond that
+  PDFQueueFull is raised immediately (API → 503 + Retry-After)
+- Per-render timeout PDF_RENDER_TIMEOUT_SECONDS → PDFRenderTimeout (API → 504). A worker cannot be
+  interrupted mid-render, so the slot stays taken until it actually finishes (the queue limit stays honest)
+- PDF_RENDER_WORKERS=0 renders in a thread instead (same limits); a broken pool falls back to a thread too
+- Batch work (nightly schedules, agency bundles) uses BatchRenderer / render_many: its own pool of
+  PDF_BATCH_WORKERS (default: one per core) for the length of the batch, outside the interactive admission
+  control; each worker stays warm across the reports it renders (imports, fonts, styles, image memo)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "") or 1)
+except ValueError:
+    PDF_RENDER_WORKERS = 1
+PDF_RENDER_QUEUE_MAX = int(os.getenv("PDF_RENDER_QUEUE_MAX", "4"))
+PDF_RENDER_TIMEOUT_SECONDS = float(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", "120"))
+PDF_RENDER_RETRY_AFTER_SECONDS = int(os.getenv("PDF_RENDER_RETRY_AFTER_SECONDS", "30"))
+PDF_RENDER_PREWARM = os.getenv("PDF_RENDER_PREWARM", "1").lower() in ("1", "true", "yes")
+try:
+    PDF_BATCH_WORKERS = int(os.getenv("PDF_BATCH_WORKERS", "") or (os.cpu_count() or 1))
+except ValueError:
+    PDF_BATCH_WORKERS = os.cpu_count() or 1
+
+
+class PDFQueueFull(RuntimeError):
+    """Too many renders in flight; the caller should retry later."""
+
+
+class PDFRenderTimeout(RuntimeError):
+    """A render did not finish within PDF_RENDER_TIMEOUT_SECONDS."""
+
+
+# ------------------------------------------------------------
+# Worker side (top-level so they pickle under "spawn")
+# ------------------------------------------------------------
+def _worker_init() -> None:
+    # Spawned workers do not import app.main, so give them the same log format (PDF_PROFILE lines, warnings)
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    try:
+        import reportlab.graphics.shapes  # noqa: F401
+        import reportlab.platypus  # noqa: F401
+        import app.audit.pdf_report  # noqa: F401
+    except Exception as e:  # the render itself reports missing deps
+        logger.debug(f"PDF worker warm-up failed: {e}")
+
+
+def _render(audit_data: Dict[str, Any]) -> bytes:
+    from app.audit.pdf_report import generate_audit_pdf
+    return generate_audit_pdf(audit_data)
+
+
+def _render_bundle(audits: List[Dict[str, Any]], title: Optional[str], brand: Optional[str]) -> bytes:
+    from app.audit.pdf_report import generate_bundle_pdf
+    return generate_bundle_pdf(audits, title=title, brand=brand)
+
+
+# ------------------------------------------------------------
+# Pool + admission control
+# ------------------------------------------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_in_flight = 0
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if PDF_RENDER_WORKERS <= 0:
+        return None
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_init,
+            )
+            logger.info("PDF render pool started: workers=%s queue=%s", PDF_RENDER_WORKERS, PDF_RENDER_QUEUE_MAX)
+        return _pool
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _acquire_slot() -> None:
+    global _in_flight
+    with _lock:
+        if _in_flight >= max(1, PDF_RENDER_WORKERS) + max(0, PDF_RENDER_QUEUE_MAX):
+            raise PDFQueueFull(f"PDF renderer busy ({_in_flight} reports in progress)")
+        _in_flight += 1
+
+
+def _release_slot(_: Any = None) -> None:
+    global _in_flight
+    with _lock:
+        _in_flight = max(0, _in_flight - 1)
+
+
+def queue_depth() -> int:
+    return _in_flight
+
+
+def _submit(audit_data: Dict[str, Any]) -> Future:
+    """Future for the render; the slot is released when the render really ends (not when we stop waiting)."""
+    pool = _get_pool()
+    if pool is not None:
+        try:
+            fut = pool.submit(_render, audit_data)
+            fut.add_done_callback(_release_slot)
+            return fut
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.warning(f"PDF pool unavailable, rendering in thread: {e}")
+            _discard_pool(pool)
+    fut: Future = Future()
+
+    def run() -> None:
+        try:
+            fut.set_result(_render(audit_data))
+        except BaseException as e:
+            fut.set_exception(e)
+
+    fut.add_done_callback(_release_slot)
+    threading.Thread(target=run, name="pdf-render", daemon=True).start()
+    return fut
+
+
+def has_capacity() -> bool:
+    """Cheap pre-check so API callers can refuse before spending time on the audit / enrichment."""
+    return _in_flight < max(1, PDF_RENDER_WORKERS) + max(0, PDF_RENDER_QUEUE_MAX)
+
+
+async def _acquire_slot_waiting() -> None:
+    while True:
+        try:
+            _acquire_slot()
+            return
+        except PDFQueueFull:
+            await asyncio.sleep(0.5)
+
+
+async def render_pdf(audit_data: Dict[str, Any], timeout: Optional[float] = None, wait: bool = False) -> bytes:
+    """
+    PDF bytes for audit_data; raises PDFQueueFull (unless wait=True, used by background jobs)
+    or PDFRenderTimeout.
+    """
+    if wait:
+        await _acquire_slot_waiting()
+    else:
+        _acquire_slot()
+    try:
+        fut = _submit(audit_data)
+    except BaseException:
+        _release_slot()
+        raise
+    limit = PDF_RENDER_TIMEOUT_SECONDS if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), timeout=limit)
+    except asyncio.TimeoutError:
+        raise PDFRenderTimeout(f"PDF rendering exceeded {limit:g}s") from None
+    except (BrokenProcessPool, pickle.PicklingError) as e:
+        # Worker died (OOM kill) or the payload would not pickle: one retry in a thread
+        logger.warning(f"PDF pool render failed, retrying in thread: {e}")
+        pool = _pool
+        if pool is not None:
+            _discard_pool(pool)
+        return await asyncio.wait_for(asyncio.to_thread(_render, audit_data), timeout=limit)
+
+
+# ------------------------------------------------------------
+# Batch rendering
+# ------------------------------------------------------------
+class BatchRenderer:
+    """
+    Process pool for one batch of renders, e.g.:
+
+        async with BatchRenderer() as batch:
+            pdfs = await asyncio.gather(*(batch.render(a) for a in payloads), return_exceptions=True)
+            bundle = await batch.render_bundle(payloads, title="Agency portfolio")
+
+    Renders queue inside the pool (no PDFQueueFull, no per-render timeout) and the workers are shut down
+    with the batch. workers <= 1 or a broken pool renders in threads instead.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = PDF_BATCH_WORKERS if workers is None else workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def __aenter__(self) -> "BatchRenderer":
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_init,
+            )
+            logger.info("PDF batch pool started: workers=%s", self.workers)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
+    async def _run(self, fn: Any, *args: Any) -> bytes:
+        pool = self._pool
+        if pool is not None:
+            try:
+                return await asyncio.wrap_future(pool.submit(fn, *args))
+            except (BrokenProcessPool, pickle.PicklingError) as e:
+                logger.warning(f"PDF batch pool render failed, rendering in thread: {e}")
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+        return await asyncio.to_thread(fn, *args)
+
+    async def render(self, audit_data: Dict[str, Any]) -> bytes:
+        return await self._run(_render, audit_data)
+
+    async def render_bundle(
+        self, audits: Sequence[Dict[str, Any]], title: Optional[str] = None, brand: Optional[str] = None
+    ) -> bytes:
+        return await self._run(_render_bundle, list(audits), title, brand)
+
+
+async def render_many(
+    payloads: Sequence[Dict[str, Any]], workers: Optional[int] = None
+) -> List[Union[bytes, BaseException]]:
+    """PDF bytes per audit_data (same order); a failed render is returned as its exception."""
+    async with BatchRenderer(workers) as batch:
+        return await asyncio.gather(*(batch.render(p) for p in payloads), return_exceptions=True)
+
+
+def warm_up() -> None:
+    """Start the workers ahead of the first request (they run _worker_init immediately)."""
+    if not PDF_RENDER_PREWARM:
+        return
+    pool = _get_pool()
+    if pool is not None:
+        for _ in range(PDF_RENDER_WORKERS):
+            pool.submit(_worker_init)
+
+
+def shutdown() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
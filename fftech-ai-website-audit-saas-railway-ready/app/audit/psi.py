@@ -1,11 +1,438 @@
-import json
+# -*- coding: utf-8 -*-
+"""
+app/audit/psi.py
+Async PageSpeed Insights client (single code path for runner enrichment + API router)
+- httpx.AsyncClient with certificate verification (certifi), pooled connections
+- Token-bucket limiter sized to the PSI quota: PSI_QUOTA_PER_100S (burst/refill) and PSI_QUOTA_PER_DAY (hard cap),
+  divided by WEB_CONCURRENCY because every gunicorn worker keeps its own bucket
+- Jittered exponential backoff on 429 / 5xx / network errors (honours Retry-After)
+- TTL cache keyed by (url, strategy, categories); concurrent identical requests share one API call
+- fetch_many(url, strategies) runs mobile + desktop concurrently
+- One client per process serves every event loop: the pooled connections and in-flight sharing live on the
+  app loop (bind_loop() at startup), other loops (scheduler jobs, sync wrapper threads) use a short-lived
+  connection pool per call; limiter, daily quota and cache are thread-safe and shared by all of them
+- fetch_lighthouse(url, api_key, strategy) keeps its {lcp_ms, fcp_ms, total_page_size_kb} output (now async)
+- Responses (1-3 MB) are read into one bounded buffer (PSI_MAX_RESPONSE_BYTES), parsed once with orjson
+  straight from that buffer and immediately projected down to the fields the report reads (categories
+  scores, metric/diagnostic audits, opportunities, loadingExperience); only the projection is returned
+  and cached. Not an incremental parse: peak memory is the body plus its parsed tree, for one response
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as _dt
+import logging
+import os
+import random
+import threading
 import time
-import urllib.request
-import urllib.parse
-import ssl
-from typing import Dict
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:  # imported on first request (keeps it off the web process import path)
+    import httpx
+
+try:
+    import orjson
+except Exception:  # optional: stdlib json fallback
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+PSI_ENDPOINT = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
+PSI_API_KEY = os.getenv("PSI_API_KEY", "").strip()
+PSI_TIMEOUT_SECONDS = float(os.getenv("PSI_TIMEOUT_SECONDS", "45"))
+PSI_MAX_RETRIES = int(os.getenv("PSI_MAX_RETRIES", "3"))
+PSI_BACKOFF_BASE_SECONDS = float(os.getenv("PSI_BACKOFF_BASE_SECONDS", "1.0"))
+PSI_BACKOFF_MAX_SECONDS = float(os.getenv("PSI_BACKOFF_MAX_SECONDS", "20"))
+PSI_CACHE_TTL_SECONDS = int(os.getenv("PSI_CACHE_TTL_SECONDS", "3600"))
+PSI_CACHE_MAX_ITEMS = int(os.getenv("PSI_CACHE_MAX_ITEMS", "512"))
+PSI_MAX_RESPONSE_BYTES = int(os.getenv("PSI_MAX_RESPONSE_BYTES", str(12 * 1024 * 1024)))
+
+
+def _workers() -> int:
+    try:
+        return max(1, int(os.getenv("WEB_CONCURRENCY", "") or 1))
+    except ValueError:
+        return 1
+
+
+PSI_QUOTA_PER_100S = max(1, int(os.getenv("PSI_QUOTA_PER_100S", "400")) // _workers())
+PSI_QUOTA_PER_DAY = max(1, int(os.getenv("PSI_QUOTA_PER_DAY", "25000")) // _workers())
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PSIQuotaExceeded(RuntimeError):
+    """Daily PSI quota for this process is used up (resets at UTC midnight)."""
+
+
+# ------------------------------------------------------------
+# Projection (keep only what runner / pdf_report read)
+# ------------------------------------------------------------
+METRIC_AUDITS = {
+    "largest-contentful-paint",
+    "first-contentful-paint",
+    "cumulative-layout-shift",
+    "total-blocking-time",
+    "speed-index",
+    "interactive",
+    "experimental-interaction-to-next-paint",
+    "server-response-time",
+    "time-to-first-byte",
+    "total-byte-weight",
+}
+DIAGNOSTIC_AUDITS = {
+    "third-party-summary",
+    "mainthread-work-breakdown",
+    "unsized-images",
+    "render-blocking-resources",
+}
+_AUDIT_FIELDS = ("id", "title", "score", "numericValue", "displayValue")
+_DETAIL_FIELDS = ("type", "overallSavingsMs", "overallSavingsBytes")
+_LOADING_FIELDS = ("id", "overall_category", "metrics")
+
+
+def _pick(obj: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    if not isinstance(obj, dict):
+        return {}
+    return {k: obj[k] for k in fields if k in obj}
+
+
+def project_psi(data: Dict[str, Any]) -> Dict[str, Any]:
+    """PSI runPagespeed JSON → same shape, pruned to the paths the audit consumes."""
+    lr = data.get("lighthouseResult") or {}
+    audits: Dict[str, Any] = {}
+    for aid, audit in (lr.get("audits") or {}).items():
+        if not isinstance(audit, dict):
+            continue
+        details = audit.get("details") or {}
+        is_opportunity = isinstance(details, dict) and details.get("type") == "opportunity"
+        if aid in METRIC_AUDITS or aid in DIAGNOSTIC_AUDITS or is_opportunity:
+            kept = _pick(audit, _AUDIT_FIELDS)
+            if is_opportunity:
+                kept["details"] = _pick(details, _DETAIL_FIELDS)
+            audits[aid] = kept
+    out: Dict[str, Any] = _pick(data, ("id", "analysisUTCTimestamp"))
+    for key in ("loadingExperience", "originLoadingExperience"):
+        if key in data:
+            out[key] = _pick(data[key], _LOADING_FIELDS)
+    out["lighthouseResult"] = {
+        **_pick(lr, ("requestedUrl", "finalUrl", "finalDisplayedUrl", "fetchTime", "lighthouseVersion")),
+        "configSettings": _pick(lr.get("configSettings"), ("formFactor",)),
+        "categories": {k: _pick(v, ("id", "title", "score")) for k, v in (lr.get("categories") or {}).items()},
+        "audits": audits,
+    }
+    return out
+
+
+def _loads(raw: Union[bytes, bytearray]) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    import json
+    return json.loads(raw)
+
+
+async def _read_projected(response: httpx.Response) -> Optional[Dict[str, Any]]:
+    """Body into one bounded buffer, parsed in place (no bytes() copy), pruned before the full tree is dropped."""
+    buf = bytearray()
+    async for chunk in response.aiter_bytes():
+        buf += chunk
+        if len(buf) > PSI_MAX_RESPONSE_BYTES:
+            logger.warning(f"PSI response exceeded {PSI_MAX_RESPONSE_BYTES} bytes; dropped")
+            return None
+    data = _loads(buf)  # orjson / json both accept a bytearray
+    del buf
+    return project_psi(data) if isinstance(data, dict) else None
+
+
+# ------------------------------------------------------------
+# Rate limiting
+# ------------------------------------------------------------
+class TokenBucket:
+    """
+    capacity tokens, refilled continuously at capacity/period per second.
+    Each caller reserves the next token under a thread lock and sleeps until it is due, so waiters are
+    served in arrival order and one bucket holds across event loops (app loop, scheduler / sync threads).
+    """
+
+    def __init__(self, capacity: int, period_seconds: float):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._mutex = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token (the balance may go negative); seconds until it is actually available."""
+        with self._mutex:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def _refund(self) -> None:
+        with self._mutex:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    async def acquire(self) -> None:
+        wait = self._reserve()
+        if wait <= 0:
+            return
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._refund()
+            raise
+
+
+class DailyQuota:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.day = _dt.datetime.utcnow().date()
+        self.used = 0
+        self._mutex = threading.Lock()
+
+    def take(self) -> None:
+        with self._mutex:
+            today = _dt.datetime.utcnow().date()
+            if today != self.day:
+                self.day, self.used = today, 0
+            if self.used >= self.limit:
+                raise PSIQuotaExceeded(f"PSI daily quota reached ({self.limit} calls)")
+            self.used += 1
+
+
+# ------------------------------------------------------------
+# Client
+# ------------------------------------------------------------
+CacheKey = Tuple[str, str, Tuple[str, ...]]
 
-def fetch_lighthouse(
+
+class PSIClient:
+    def __init__(
+        self,
+        api_key: str = PSI_API_KEY,
+        timeout: float = PSI_TIMEOUT_SECONDS,
+        max_retries: int = PSI_MAX_RETRIES,
+        per_100s: int = PSI_QUOTA_PER_100S,
+        per_day: int = PSI_QUOTA_PER_DAY,
+        cache_ttl: int = PSI_CACHE_TTL_SECONDS,
+    ):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.bucket = TokenBucket(per_100s, 100.0)
+        self.daily = DailyQuota(per_day)
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Pooled client + in-flight futures belong to the home loop (the app's); see _on_home_loop
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _new_http(self) -> httpx.AsyncClient:
+        import httpx
+
+        verify: Any = True
+        try:
+            import certifi
+            verify = certifi.where()
+        except Exception:
+            pass
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=10.0),
+            verify=verify,
+            headers={"User-Agent": "FFTechAuditBot/2.0", "Accept": "application/json"},
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+
+    def _on_home_loop(self) -> bool:
+        """Whether the running loop owns the pooled client (the first loop to use it, or its successor once closed)."""
+        loop = asyncio.get_running_loop()
+        if self._client_loop is None or self._client_loop.is_closed():
+            # Previous home loop is gone: its client cannot be awaited any more, only dropped
+            self._client, self._client_loop, self._inflight = None, loop, {}
+        return self._client_loop is loop
+
+    def bind_loop(self) -> None:
+        """Make the running loop the home loop (app startup), before any other loop can claim it."""
+        if self._client_loop is not asyncio.get_running_loop():
+            self._client, self._client_loop, self._inflight = None, asyncio.get_running_loop(), {}
+
+    def _http(self) -> httpx.AsyncClient:
+        """Pooled client of the home loop (call only after _on_home_loop() returned True)."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._new_http()
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+
+    # --------------------- cache ---------------------
+    def _cache_get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            item = self._cache.get(key)
+            if item is None:
+                return None
+            ts, value = item
+            if (time.time() - ts) > self.cache_ttl:
+                self._cache.pop(key, None)
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def _cache_set(self, key: CacheKey, value: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.time(), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > PSI_CACHE_MAX_ITEMS:
+                self._cache.popitem(last=False)
+
+    # --------------------- API ---------------------
+    async def fetch(
+        self,
+        url: str,
+        strategy: str = "mobile",
+        categories: Sequence[str] = ("performance",),
+    ) -> Optional[Dict[str, Any]]:
+        """Projected PSI JSON (cached); None when no key, quota exhausted or the call keeps failing."""
+        if not self.api_key or not url:
+            return None
+        key: CacheKey = (url, strategy, tuple(sorted(categories)))
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        if not self._on_home_loop():
+            # Another loop (scheduler job, sync wrapper thread): a client of its own, closed with the call,
+            # and no in-flight sharing; cache, token bucket and daily quota are still the shared ones
+            try:
+                async with self._new_http() as http:
+                    data = await self._request(http, url, strategy, categories)
+            except Exception as e:
+                logger.debug(f"PSI fetch error ({strategy}): {e}")
+                return None
+            if data is not None:
+                self._cache_set(key, data)
+            return data
+
+        http = self._http()
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            data = await self._request(http, url, strategy, categories)
+            if data is not None:
+                self._cache_set(key, data)
+            fut.set_result(data)
+            return data
+        except BaseException as e:
+            if not fut.done():
+                fut.set_result(None)
+            if isinstance(e, Exception):
+                logger.debug(f"PSI fetch error ({strategy}): {e}")
+                return None
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def fetch_many(
+        self,
+        url: str,
+        strategies: Iterable[str] = ("mobile", "desktop"),
+        categories: Sequence[str] = ("performance",),
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        strategies = list(strategies)
+        results = await asyncio.gather(*(self.fetch(url, s, categories) for s in strategies))
+        return dict(zip(strategies, results))
+
+    async def _request(
+        self,
+        http: httpx.AsyncClient,
+        url: str,
+        strategy: str,
+        categories: Sequence[str],
+    ) -> Optional[Dict[str, Any]]:
+        import httpx
+
+        params: List[Tuple[str, str]] = [("url", url), ("strategy", strategy), ("key", self.api_key)]
+        params += [("category", c) for c in categories]
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.daily.take()
+            except PSIQuotaExceeded as e:
+                logger.warning(str(e))
+                return None
+            await self.bucket.acquire()
+            retry_after: Optional[float] = None
+            try:
+                async with http.stream("GET", PSI_ENDPOINT, params=params) as r:
+                    if r.status_code == 200:
+                        return await _read_projected(r)
+                    if r.status_code not in RETRY_STATUSES:
+                        body = await r.aread()
+                        logger.debug(f"PSI {strategy} HTTP {r.status_code}: {body[:200]!r}")
+                        return None
+                    try:
+                        retry_after = float(r.headers.get("Retry-After", ""))
+                    except ValueError:
+                        retry_after = None
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                logger.debug(f"PSI {strategy} attempt {attempt + 1} failed: {e}")
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+        return None
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None and retry_after >= 0:
+            return min(PSI_BACKOFF_MAX_SECONDS, retry_after)
+        delay = min(PSI_BACKOFF_MAX_SECONDS, PSI_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(delay / 2, delay * 1.5) if delay else 0.0  # full jitter around the step
+
+
+psi_client = PSIClient()
+
+_clients: Dict[str, PSIClient] = {}
+
+
+def _client_for(api_key: str) -> PSIClient:
+    if not api_key or api_key == psi_client.api_key:
+        return psi_client
+    client = _clients.get(api_key)
+    if client is None:
+        client = _clients[api_key] = PSIClient(api_key=api_key)
+    return client
+
+
+# ------------------------------------------------------------
+# Backwards-compatible summary
+# ------------------------------------------------------------
+def _summary(data: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    if not data:
+        return {}
+    audits = data.get('lighthouseResult', {}).get('audits', {})
+    lcp = audits.get('largest-contentful-paint', {}).get('numericValue', 0)
+    fcp = audits.get('first-contentful-paint', {}).get('numericValue', 0)
+    total_bytes = audits.get('total-byte-weight', {}).get('numericValue', 0)
+    return {
+        'lcp_ms': int(lcp) if isinstance(lcp, (int, float)) else 0,
+        'fcp_ms': int(fcp) if isinstance(fcp, (int, float)) else 0,
+        'total_page_size_kb': int(total_bytes / 1024) if isinstance(total_bytes, (int, float)) else 0,
+    }
+
+
+async def fetch_lighthouse(
     url: str,
     api_key: str,
     strategy: str = 'desktop',
@@ -14,33 +441,9 @@ def fetch_lighthouse(
 ) -> Dict[str, int]:
     if not api_key:
         return {}
-
-    encoded_url = urllib.parse.quote(url, safe='')
-    endpoint = f'https://www.googleapis.com/pagespeedonline/v5/runPagespeed?url={encoded_url}&key={api_key}&strategy={strategy}'
-    context = ssl.create_default_context()
-    context.check_hostname = False
-    context.verify_mode = ssl.CERT_NONE
-    req = urllib.request.Request(endpoint, headers={'User-Agent': 'FFTechAuditor/2.0', 'Accept': 'application/json'})
-
-    for attempt in range(retries + 1):
-        try:
-            with urllib.request.urlopen(req, timeout=timeout, context=context) as resp:
-                if resp.getcode() != 200:
-                    return {}
-                raw = resp.read().decode('utf-8', errors='ignore')
-                data = json.loads(raw)
-                audits = data.get('lighthouseResult', {}).get('audits', {})
-                lcp = audits.get('largest-contentful-paint', {}).get('numericValue', 0)
-                fcp = audits.get('first-contentful-paint', {}).get('numericValue', 0)
-                total_bytes = audits.get('total-byte-weight', {}).get('numericValue', 0)
-                return {
-                    'lcp_ms': int(lcp) if isinstance(lcp, (int, float)) else 0,
-                    'fcp_ms': int(fcp) if isinstance(fcp, (int, float)) else 0,
-                    'total_page_size_kb': int(total_bytes / 1024) if isinstance(total_bytes, (int, float)) else 0,
-                }
-        except Exception:
-            if attempt < retries:
-                time.sleep(2)
-                continue
-            return {}
-    return {}
+    client = _client_for(api_key)
+    try:
+        data = await asyncio.wait_for(client.fetch(url, strategy), timeout=timeout * (retries + 1))
+    except asyncio.TimeoutError:
+        return {}
+    return _summary(data)
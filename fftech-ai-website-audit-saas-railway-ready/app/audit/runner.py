@@ -8,6 +8,7 @@ MOST FLEXIBLE & POWERFUL WebsiteAuditRunner
     Input : await WebsiteAuditRunner().run(url, html="", progress_cb=None)
     Output: dict with keys:
         audited_url, overall_score, grade, breakdown, chart_data, dynamic
+- CPU stage (parse + features + scoring) runs in the shared process pool (app.audit.cpu_pool)
 
 PDF integration (SAFE — does NOT change run() IO):
 - Proper logger setup
@@ -23,14 +24,22 @@ import re
 import ssl
 import time
 import json
-import base64
 import logging
 import datetime as _dt
 from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
-from urllib.parse import urlparse, urljoin, quote_plus
+from urllib.parse import urlparse, urljoin
 from urllib.request import Request, urlopen
 
+from app.audit.features import PageFeatures, extract_features
+from app.audit.parsers import parse_html
+from app.audit.cpu_pool import run_cpu
+from app.audit.artifacts import PageArtifact, artifact_store
+from app.audit.browser_pool import capture_page
+from app.audit.hostinfo import host_facts
+from app.audit import pdf_service
+from app.services.psi_batch import get_psi, psi_history
+
 logger = logging.getLogger(__name__)
 
 ProgressCB = Optional[Callable[[str, int, Optional[dict]], Union[None, Any]]]
@@ -50,13 +59,14 @@ PDF_ENABLE_ROBOTS = os.getenv("PDF_ENABLE_ROBOTS", "1").lower() in {"1", "true",
 PDF_ENABLE_SCHEMA = os.getenv("PDF_ENABLE_SCHEMA", "1").lower() in {"1", "true", "yes", "on"}
 PDF_ENABLE_MOBILE_HEUR = os.getenv("PDF_ENABLE_MOBILE_HEUR", "1").lower() in {"1", "true", "yes", "on"}
 PDF_ENABLE_BENCH = os.getenv("PDF_ENABLE_BENCH", "1").lower() in {"1", "true", "yes", "on"}
+# DNS / reverse DNS / TLS facts collected during the audit (app.audit.hostinfo: HOSTINFO_* timeouts, TTL cache)
+AUDIT_HOST_FACTS = os.getenv("AUDIT_HOST_FACTS", "1").lower() in {"1", "true", "yes", "on"}
 
 # PSI (PageSpeed Insights) – key comes from Railway Variables
 PSI_API_KEY = os.getenv("PSI_API_KEY", "").strip()
 PSI_STRATEGIES = [s.strip() for s in os.getenv("PSI_STRATEGIES", "mobile,desktop").split(",") if s.strip()] or ["mobile"]
 
-# Axe-core CDN (used only if PDF_ENABLE_AXE=1 and local axe is not provided)
-AXE_CDN_URL = os.getenv("AXE_CDN_URL", "https://cdnjs.cloudflare.com/ajax/libs/axe-core/4.7.2/axe.min.js")
+# Screenshot / axe-core run in the shared browser pool (app.audit.browser_pool: AXE_LOCAL_PATH, AXE_CDN_URL)
 
 # ============================================================
 # Helpers (unchanged compatibility)
@@ -216,70 +226,18 @@ def _best_fetch(url: str, timeout: float, user_agent: str, max_bytes: int) -> Di
 # Parsing (flexible)
 # ============================================================
 def _try_bs4_parse(html: str) -> Optional[Any]:
-    try:
-        from bs4 import BeautifulSoup
-        return BeautifulSoup(html or "", "html.parser")
-    except Exception:
-        return None
+    # Backend per AUDIT_HTML_PARSER (lxml by default); None when bs4 is unavailable
+    return parse_html(html)
 
-def _extract_title(html: str, soup: Any = None) -> str:
-    if soup is not None:
-        try:
-            t = soup.title.string if soup.title else ""
-            return _truncate((t or "").strip(), 200)
-        except Exception:
-            pass
-    m = re.search(r"<title[^>]*>(.*?)</title>", html or "", flags=re.I | re.S)
-    if not m:
-        return ""
-    title = re.sub(r"<[^>]+>", "", m.group(1)).strip()
-    return _truncate(title, 200)
+def _extract_features(html: str, soup: Any = None) -> PageFeatures:
+    """Single traversal of the document; every scorer reads the returned record."""
+    return extract_features(html, soup)
 
-def _has_meta_description(html: str, soup: Any = None) -> bool:
-    if soup is not None:
-        try:
-            tag = soup.find("meta", attrs={"name": re.compile(r"^description$", re.I)})
-            return bool(tag and (tag.get("content") or "").strip())
-        except Exception:
-            pass
-    return bool(re.search(r'<meta[^>]+name=["\']description["\'][^>]*content=', html or "", flags=re.I))
+def _canonical_url(features: PageFeatures, base_url: str) -> str:
+    href = features.canonical_href
+    return urljoin(base_url, href) if href else ""
 
-def _canonical_url(html: str, base_url: str, soup: Any = None) -> str:
-    if soup is not None:
-        try:
-            link = soup.find("link", rel=re.compile(r"canonical", re.I))
-            if link and link.get("href"):
-                return urljoin(base_url, link.get("href"))
-        except Exception:
-            pass
-    m = re.search(r'<link[^>]+rel=["\']canonical["\'][^>]+href=["\']([^"\']+)["\']', html or "", flags=re.I)
-    if m:
-        return urljoin(base_url, m.group(1))
-    return ""
-
-def _count_h1(html: str, soup: Any = None) -> int:
-    if soup is not None:
-        try:
-            return len(soup.find_all("h1"))
-        except Exception:
-            pass
-    return len(re.findall(r"<h1\b", html or "", flags=re.I))
-
-def _image_alt_stats(html: str, soup: Any = None) -> Tuple[int, int]:
-    if soup is not None:
-        try:
-            imgs = soup.find_all("img")
-            total = len(imgs)
-            missing = sum(1 for im in imgs if not (im.get("alt") or "").strip())
-            return total, missing
-        except Exception:
-            pass
-    imgs = re.findall(r"<img\b[^>]*>", html or "", flags=re.I)
-    total = len(imgs)
-    missing = sum(1 for tag in imgs if not re.search(r'\balt\s*=\s*["\'].*?["\']', tag, flags=re.I | re.S))
-    return total, missing
-
-def _link_counts(html: str, base_url: str, soup: Any = None) -> Dict[str, int]:
+def _link_counts(features: PageFeatures, base_url: str) -> Dict[str, int]:
     base_host = _hostname(base_url)
     def classify(href: str) -> Optional[bool]:
         href = (href or "").strip()
@@ -291,21 +249,8 @@ def _link_counts(html: str, base_url: str, soup: Any = None) -> Dict[str, int]:
             return None
         return host == base_host
     internal = external = 0
-    if soup is not None:
-        try:
-            for a in soup.find_all("a"):
-                ok = classify(a.get("href"))
-                if ok is None:
-                    continue
-                if ok:
-                    internal += 1
-                else:
-                    external += 1
-            return {"internal": internal, "external": external, "total": internal + external}
-        except Exception:
-            pass
-    for m in re.findall(r'href\s*=\s*["\']([^"\']+)["\']', html or "", flags=re.I):
-        ok = classify(m)
+    for href, _rel in features.anchors:
+        ok = classify(href)
         if ok is None:
             continue
         if ok:
@@ -314,19 +259,6 @@ def _link_counts(html: str, base_url: str, soup: Any = None) -> Dict[str, int]:
             external += 1
     return {"internal": internal, "external": external, "total": internal + external}
 
-def _resource_counts(html: str, soup: Any = None) -> Dict[str, int]:
-    scripts = styles = 0
-    if soup is not None:
-        try:
-            scripts = len(soup.find_all("script"))
-            styles = len(soup.find_all("link", rel=re.compile(r"stylesheet", re.I)))
-            return {"scripts": scripts, "styles": styles}
-        except Exception:
-            pass
-    scripts = len(re.findall(r"<script\b", html or "", flags=re.I))
-    styles = len(re.findall(r'rel\s*=\s*["\']stylesheet["\']', html or "", flags=re.I))
-    return {"scripts": scripts, "styles": styles}
-
 # ============================================================
 # PDF ENRICHMENT HELPERS (SAFE — used only in PDF path)
 # ============================================================
@@ -394,10 +326,11 @@ def _fetch_robots_and_sitemap(base_url: str) -> Tuple[Dict[str, Any], Dict[str,
         logger.debug(f"robots/sitemap fetch error: {e}")
     return robots_info, sitemap_info
 
-def _parse_structured_data(html: str) -> Dict[str, Any]:
+def _parse_structured_data(html: str, soup: Any = None) -> Dict[str, Any]:
     result: Dict[str, Any] = {"detected": False, "items": [], "errors": [], "warnings": []}
     try:
-        soup = _try_bs4_parse(html)
+        if soup is None:
+            soup = _try_bs4_parse(html)
         blocks: List[str] = []
         if soup is not None:
             for sc in soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)}):
@@ -477,22 +410,11 @@ def _mobile_heuristics(html: str) -> Dict[str, Any]:
         pass
     return out
 
-def _psi_fetch(url: str, strategy: str = "mobile") -> Optional[Dict[str, Any]]:
-    """Fetch PageSpeed Insights JSON using PSI_API_KEY from Railway variables."""
+async def _psi_fetch(url: str, strategy: str = "mobile", audit_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """PageSpeed Insights JSON: fresh stored result (psi_results) first, else the shared async client."""
     if not PSI_API_KEY:
         return None
-    try:
-        endpoint = (
-            "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
-            f"?url={quote_plus(url)}&strategy={quote_plus(strategy)}&category=performance&key={quote_plus(PSI_API_KEY)}"
-        )
-        status, text, _ = _http_get_text(endpoint, timeout=45.0)
-        if not status or status >= 400 or not text.strip():
-            return None
-        return json.loads(text)
-    except Exception as e:
-        logger.debug(f"PSI fetch error ({strategy}): {e}")
-        return None
+    return await get_psi(url, strategy, audit_id)
 
 def _psi_to_lighthouse_block(psi_json: Dict[str, Any], strategy: str) -> Dict[str, Any]:
     """Normalize PSI JSON to the 'lighthouse' block expected by pdf_report.py"""
@@ -590,85 +512,22 @@ def _psi_field_cwv(psi_json: Dict[str, Any], strategy: str) -> Dict[str, Any]:
         logger.debug(f"PSI field data parse error: {e}")
     return {"mobile" if strategy == "mobile" else "desktop": out}
 
-def _playwright_screenshot_b64(url: str, viewport: Tuple[int, int] = (1366, 768), full_page: bool = False) -> Optional[str]:
-    if not PDF_ENABLE_SCREENSHOT:
-        return None
-    try:
-        from playwright.sync_api import sync_playwright
-    except Exception as e:
-        logger.debug(f"Playwright not available: {e}")
-        return None
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(args=["--no-sandbox"], headless=True)
-            ctx = browser.new_context(viewport={"width": viewport[0], "height": viewport[1]}, device_scale_factor=1)
-            page = ctx.new_page()
-            page.set_default_navigation_timeout(30000)
-            page.set_default_timeout(30000)
-            page.goto(url, wait_until="networkidle")
-            page.wait_for_timeout(800)
-            buf = page.screenshot(full_page=full_page, type="png")
-            b64 = base64.b64encode(buf).decode("ascii")
-            ctx.close()
-            browser.close()
-            return b64
-    except Exception as e:
-        logger.debug(f"screenshot failed: {e}")
-        return None
-
-def _axe_core_scan(url: str) -> Optional[Dict[str, Any]]:
-    """Run axe-core via Playwright; returns counts & top issues. Optional."""
-    if not PDF_ENABLE_AXE:
-        return None
-    try:
-        from playwright.sync_api import sync_playwright
-    except Exception as e:
-        logger.debug(f"Playwright not available for axe: {e}")
-        return None
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(args=["--no-sandbox"], headless=True)
-            ctx = browser.new_context()
-            page = ctx.new_page()
-            page.set_default_navigation_timeout(30000)
-            page.set_default_timeout(30000)
-            page.goto(url, wait_until="networkidle")
-            page.add_script_tag(url=AXE_CDN_URL)
-            page.wait_for_timeout(500)
-            result = page.evaluate("""async () => {
-                if (!window.axe) { return null; }
-                const res = await window.axe.run();
-                return {
-                    violations: res.violations.map(v => ({
-                        id: v.id,
-                        impact: v.impact,
-                        nodes: v.nodes.length,
-                        tags: v.tags || [],
-                        help: v.help,
-                        helpUrl: v.helpUrl
-                    })),
-                    passes: (res.passes || []).length
-                };
-            }""")
-            ctx.close()
-            browser.close()
-            if not result:
-                return None
-            counts = {
-                "violations": len(result.get("violations", [])),
-                "passes": int(result.get("passes", 0))
-            }
-            buckets: Dict[str, int] = {"color-contrast": 0, "aria": 0, "keyboard": 0, "landmarks": 0, "forms": 0}
-            top_issues = []
-            for v in result.get("violations", [])[:10]:
-                vid = v.get("id", "")
-                if vid in buckets:
-                    buckets[vid] = buckets.get(vid, 0) + int(v.get("nodes", 0))
-                top_issues.append({"id": vid, "nodes": str(v.get("nodes", 0)), "examples": [v.get("help","")]})
-            return {"accessibility": {"axe": {"counts": counts, "by_wcag_level": {}, "buckets": buckets, "top_issues": top_issues}}}
-    except Exception as e:
-        logger.debug(f"axe-core scan failed: {e}")
+def _axe_result_to_block(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Raw axe.run() summary (from app.audit.browser_pool) → PDF accessibility block."""
+    if not result:
         return None
+    counts = {
+        "violations": len(result.get("violations", [])),
+        "passes": int(result.get("passes", 0))
+    }
+    buckets: Dict[str, int] = {"color-contrast": 0, "aria": 0, "keyboard": 0, "landmarks": 0, "forms": 0}
+    top_issues = []
+    for v in result.get("violations", [])[:10]:
+        vid = v.get("id", "")
+        if vid in buckets:
+            buckets[vid] = buckets.get(vid, 0) + int(v.get("nodes", 0))
+        top_issues.append({"id": vid, "nodes": str(v.get("nodes", 0)), "examples": [v.get("help","")]})
+    return {"accessibility": {"axe": {"counts": counts, "by_wcag_level": {}, "buckets": buckets, "top_issues": top_issues}}}
 
 def _static_benchmarks() -> Dict[str, Any]:
     """Optional, static industry baseline — can be replaced by real dataset later."""
@@ -724,6 +583,7 @@ def runner_result_to_audit_data(
         "breakdown": breakdown,
         "chart_data": runner_result.get("chart_data", []),
         "dynamic": dynamic,
+        "host": dict(runner_result.get("host") or {}),
         "summary": {
             "risk_level": "Low" if runner_result.get("overall_score", 0) >= 80 else ("Medium" if runner_result.get("overall_score", 0) >= 60 else "High"),
             "traffic_impact": "High impact issues detected" if runner_result.get("overall_score", 0) < 70 else "Good performance detected"
@@ -735,121 +595,236 @@ def runner_result_to_audit_data(
         ]
     }
 
-def _enrich_audit_data_for_pdf(audit_data: Dict[str, Any], runner_result: Dict[str, Any]) -> Dict[str, Any]:
+# ============================================================
+# PDF ENRICHMENT (async DAG)
+# ============================================================
+# Independent steps run concurrently; only structured data / mobile heuristics wait
+# for the page HTML. Each step has its own timeout and the whole enrichment has a
+# deadline — whatever finished by then goes into the PDF, the rest is skipped.
+PDF_ENRICH_DEADLINE_SECONDS = float(os.getenv("PDF_ENRICH_DEADLINE_SECONDS", "60"))
+PDF_ENRICH_STEP_TIMEOUTS: Dict[str, float] = {
+    "psi": float(os.getenv("PDF_ENRICH_PSI_TIMEOUT", "50")),
+    "robots_sitemap": float(os.getenv("PDF_ENRICH_ROBOTS_TIMEOUT", "25")),
+    "page_html": float(os.getenv("PDF_ENRICH_HTML_TIMEOUT", "25")),
+    "structured_data": 10.0,
+    "mobile": 10.0,
+    "history": 10.0,
+    "host": 10.0,
+    "screenshot": float(os.getenv("PDF_ENRICH_SCREENSHOT_TIMEOUT", "45")),
+    "axe": float(os.getenv("PDF_ENRICH_AXE_TIMEOUT", "60")),
+}
+
+def _merge_psi(audit_data: Dict[str, Any], psi_by_strategy: List[Tuple[str, Optional[Dict[str, Any]]]]) -> None:
+    """Merge per-strategy PSI payloads (in PSI_STRATEGIES order) into lighthouse / field_cwv."""
+    field_cwv: Dict[str, Any] = {}
+    lhr_merged: Dict[str, Any] = {"config": {}, "categories": {}, "metrics": {}, "opportunities": [], "diagnostics": []}
+    for strat, psi in psi_by_strategy:
+        if not psi:
+            continue
+        block = _psi_to_lighthouse_block(psi, strat)
+        if not lhr_merged.get("final_url") and block.get("final_url"):
+            lhr_merged["final_url"] = block["final_url"]
+        lhr_merged["config"] = {"device": strat, "form_factor": strat}
+        for k, v in (block.get("categories") or {}).items():
+            if v is not None:
+                lhr_merged.setdefault("categories", {})[k] = v
+        for k, v in (block.get("metrics") or {}).items():
+            if v is not None:
+                lhr_merged.setdefault("metrics", {})[k] = v
+        for op in block.get("opportunities", []):
+            if op not in lhr_merged["opportunities"]:
+                lhr_merged["opportunities"].append(op)
+        for dg in block.get("diagnostics", []):
+            if dg not in lhr_merged["diagnostics"]:
+                lhr_merged["diagnostics"].append(dg)
+        fld = _psi_field_cwv(psi, strat)
+        field_cwv.update(fld or {})
+    if lhr_merged.get("metrics"):
+        audit_data["lighthouse"] = lhr_merged
+    if field_cwv:
+        audit_data["field_cwv"] = field_cwv
+
+def _page_html_for_enrichment(url: str) -> str:
+    status, html_text, _ = _http_get_text(url)
+    return html_text if status and status < 400 else ""
+
+def _artifact_page(url: str) -> Optional[Tuple[str, Any]]:
+    """(html, soup) from the audit's stored artifact — no download, one shared parse."""
+    artifact = artifact_store.get(url)
+    if artifact is None or not artifact.status_code or artifact.status_code >= 400:
+        return None
+    html = artifact.html
+    return (html, artifact.soup()) if html else None
+
+def _env_json(name: str) -> Any:
+    raw = os.getenv(name, "").strip()
+    return json.loads(raw) if raw else None
+
+async def _aenrich_audit_data_for_pdf(
+    audit_data: Dict[str, Any],
+    runner_result: Dict[str, Any],
+    deadline: float = PDF_ENRICH_DEADLINE_SECONDS,
+    audit_id: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Adds optional, best-effort enrichments needed by the PDF without changing run() IO.
-    All network/dep failures are swallowed safely.
+    All network/dep failures are swallowed safely. Per-step timings land in
+    audit_data["enrichment"]["timings"] as {"ms": int, "status": ok|empty|timeout|error|deadline}.
+    audit_id (stored Audit row) links the PSI results used to that audit.
     """
     url = audit_data.get("audited_url") or runner_result.get("audited_url") or ""
-    html = ""
+    timings: Dict[str, Dict[str, Any]] = {}
+    started = time.perf_counter()
 
-    # Benchmarks (static stub)
-    try:
-        bench = _static_benchmarks()
-        if bench:
-            audit_data["benchmarks"] = bench
-    except Exception:
-        pass
-
-    # PSI (per strategy) — uses PSI_API_KEY from Railway Variables
-    field_cwv: Dict[str, Any] = {}
-    lhr_merged: Dict[str, Any] = {"config": {}, "categories": {}, "metrics": {}, "opportunities": [], "diagnostics": []}
-    try:
-        for strat in PSI_STRATEGIES:
-            psi = _psi_fetch(url, strat)
-            if not psi:
-                continue
-            block = _psi_to_lighthouse_block(psi, strat)
-            if not lhr_merged.get("final_url") and block.get("final_url"):
-                lhr_merged["final_url"] = block["final_url"]
-            lhr_merged["config"] = {"device": strat, "form_factor": strat}
-            for k, v in (block.get("categories") or {}).items():
-                if v is not None:
-                    lhr_merged.setdefault("categories", {})[k] = v
-            for k, v in (block.get("metrics") or {}).items():
-                if v is not None:
-                    lhr_merged.setdefault("metrics", {})[k] = v
-            for op in block.get("opportunities", []):
-                if op not in lhr_merged["opportunities"]:
-                    lhr_merged["opportunities"].append(op)
-            for dg in block.get("diagnostics", []):
-                if dg not in lhr_merged["diagnostics"]:
-                    lhr_merged["diagnostics"].append(dg)
-            fld = _psi_field_cwv(psi, strat)
-            field_cwv.update(fld or {})
-        if lhr_merged.get("metrics"):
-            audit_data["lighthouse"] = lhr_merged
-        if field_cwv:
-            audit_data["field_cwv"] = field_cwv
-    except Exception as e:
-        logger.debug(f"PSI enrichment failed: {e}")
-
-    # Robots + Sitemap
-    if PDF_ENABLE_ROBOTS:
+    async def step(name: str, kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+        t0 = time.perf_counter()
+        status = "ok"
+        value = None
         try:
-            robots, sitemap = _fetch_robots_and_sitemap(url)
+            # Blocking helpers run in threads; a timed-out thread finishes in the background, its result is dropped
+            call = fn(*args) if asyncio.iscoroutinefunction(fn) else asyncio.to_thread(fn, *args)
+            value = await asyncio.wait_for(call, timeout=PDF_ENRICH_STEP_TIMEOUTS.get(kind, 30.0))
+            if not value:
+                status = "empty"
+        except asyncio.TimeoutError:
+            status = "timeout"
+        except asyncio.CancelledError:
+            timings[name] = {"ms": int((time.perf_counter() - t0) * 1000), "status": "deadline"}
+            raise
+        except Exception as e:
+            logger.debug(f"{name} enrichment failed: {e}")
+            status = "error"
+        timings[name] = {"ms": int((time.perf_counter() - t0) * 1000), "status": status}
+        return value
+
+    async def psi() -> None:
+        results = await asyncio.gather(*(step(f"psi_{s}", "psi", _psi_fetch, url, s, audit_id) for s in PSI_STRATEGIES))
+        _merge_psi(audit_data, list(zip(PSI_STRATEGIES, results)))
+        # Trend from stored runs when no explicit history was supplied (after the write-back above)
+        if not audit_data.get("history"):
+            history = await step("history", "history", psi_history, url)
+            if history and len(history) >= 2:
+                audit_data["history"] = history
+
+    async def robots_sitemap() -> None:
+        res = await step("robots_sitemap", "robots_sitemap", _fetch_robots_and_sitemap, url)
+        if res:
+            robots, sitemap = res
             if robots:
                 audit_data["robots"] = robots
             if sitemap:
                 audit_data["sitemap"] = sitemap
-        except Exception as e:
-            logger.debug(f"robots/sitemap enrichment failed: {e}")
-
-    # Structured Data + Mobile heuristics (do a light GET)
-    try:
-        status, html_text, _ = _http_get_text(url)
-        if status and status < 400:
-            html = html_text
-    except Exception:
-        html = ""
-
-    if PDF_ENABLE_SCHEMA and html:
-        try:
-            audit_data["structured_data"] = _parse_structured_data(html)
-        except Exception as e:
-            logger.debug(f"structured data enrichment failed: {e}")
 
-    if PDF_ENABLE_MOBILE_HEUR and html:
-        try:
-            audit_data["mobile"] = _mobile_heuristics(html)
-        except Exception as e:
-            logger.debug(f"mobile heuristics enrichment failed: {e}")
-
-    # Screenshot (homepage)
-    try:
-        b64 = _playwright_screenshot_b64(url, viewport=(1366, 768), full_page=False)
-        if b64:
+    async def html_dependents() -> None:
+        # Reuse the page the audit already fetched; download only when no artifact is left
+        page = await step("page_artifact", "page_html", _artifact_page, url)
+        if page:
+            html, soup = page
+        else:
+            html, soup = await step("page_html", "page_html", _page_html_for_enrichment, url), None
+        if not html:
+            return
+        dependents = {}
+        if PDF_ENABLE_SCHEMA:
+            dependents["structured_data"] = (_parse_structured_data, html, soup)
+        if PDF_ENABLE_MOBILE_HEUR:
+            dependents["mobile"] = (_mobile_heuristics, html)
+        results = await asyncio.gather(*(step(k, k, *call) for k, call in dependents.items()))
+        for key, value in zip(dependents, results):
+            if value:
+                audit_data[key] = value
+
+    async def host() -> None:
+        # Already collected by run(); only results built elsewhere (or where the lookup failed) get resolved here
+        facts = await step("host", "host", host_facts, url)
+        if facts:
+            audit_data["host"] = facts
+
+    async def browser() -> None:
+        # One pooled page load serves both the screenshot and the axe scan
+        kind = "axe" if PDF_ENABLE_AXE else "screenshot"
+        captured = await step("browser", kind, capture_page, url, PDF_ENABLE_SCREENSHOT, PDF_ENABLE_AXE)
+        if not captured:
+            return
+        if captured.get("screenshot_b64"):
             audit_data.setdefault("assets", {})
-            audit_data["assets"]["homepage_screenshot_b64"] = b64
-    except Exception as e:
-        logger.debug(f"screenshot enrichment failed: {e}")
-
-    # Accessibility via axe-core (optional)
-    try:
-        axe_block = _axe_core_scan(url)
+            audit_data["assets"]["homepage_screenshot_b64"] = captured["screenshot_b64"]
+        axe_block = _axe_result_to_block(captured.get("axe"))
         if axe_block:
             audit_data.setdefault("accessibility", {})
             audit_data["accessibility"].update(axe_block.get("accessibility", {}))
-    except Exception as e:
-        logger.debug(f"axe-core enrichment failed: {e}")
 
-    # Competitors stub (optional manual fill later)
+    # Local / instant steps
     try:
-        comp = os.getenv("PDF_COMPETITORS_JSON", "").strip()
-        if comp:
-            audit_data["competitors"] = json.loads(comp)
+        bench = _static_benchmarks()
+        if bench:
+            audit_data["benchmarks"] = bench
     except Exception:
         pass
+    for key, env in (("competitors", "PDF_COMPETITORS_JSON"), ("history", "PDF_HISTORY_JSON")):
+        try:
+            value = _env_json(env)
+            if value:
+                audit_data[key] = value
+        except Exception:
+            pass
+
+    branches = [psi(), html_dependents()]
+    if PDF_ENABLE_ROBOTS:
+        branches.append(robots_sitemap())
+    if AUDIT_HOST_FACTS and not audit_data.get("host"):
+        branches.append(host())
+    if PDF_ENABLE_SCREENSHOT or PDF_ENABLE_AXE:
+        branches.append(browser())
+    tasks = [asyncio.create_task(b) for b in branches]
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline))
+    for t in pending:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    audit_data["enrichment"] = {
+        "timings": timings,
+        "total_ms": int((time.perf_counter() - started) * 1000),
+        "deadline_s": deadline,
+        "deadline_hit": bool(pending),
+    }
+    return audit_data
 
-    # History (optional via env)
+def _run_coro_sync(coro: Any) -> Any:
+    """Run a coroutine from sync code (own loop; separate thread if one is already running here)."""
     try:
-        hist = os.getenv("PDF_HISTORY_JSON", "").strip()
-        if hist:
-            audit_data["history"] = json.loads(hist)
-    except Exception:
-        pass
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
 
-    return audit_data
+def _enrich_audit_data_for_pdf(audit_data: Dict[str, Any], runner_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Sync entry point (kept for existing callers)."""
+    return _run_coro_sync(_aenrich_audit_data_for_pdf(audit_data, runner_result))
+
+def _write_pdf_file(output_path: str, pdf_bytes: bytes) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(pdf_bytes)
+
+def _render_pdf_to_path(audit_data: Dict[str, Any], output_path: str) -> str:
+    try:
+        from app.audit.pdf_report import generate_audit_pdf
+        pdf_bytes = generate_audit_pdf(audit_data)
+        _write_pdf_file(output_path, pdf_bytes)
+
+        logger.info(f"PDF generated successfully: {output_path}")
+        return output_path
+
+    except ImportError as e:
+        logger.error(f"PDF generation failed: missing dependencies (reportlab?) - {e}")
+        raise RuntimeError("PDF dependencies missing. Install reportlab and Pillow.") from e
+
+    except Exception as e:
+        logger.exception("PDF generation error")
+        raise RuntimeError(f"PDF generation failed: {str(e)}") from e
 
 def generate_pdf_from_runner_result(
     runner_result: Dict[str, Any],
@@ -868,28 +843,309 @@ def generate_pdf_from_runner_result(
         audit_data = _enrich_audit_data_for_pdf(audit_data, runner_result)
     except Exception as e:
         logger.debug(f"PDF enrichment skipped due to error: {e}")
+    return _render_pdf_to_path(audit_data, output_path)
 
+async def aprepare_audit_data(runner_result: Dict[str, Any], audit_id: Optional[int] = None) -> Dict[str, Any]:
+    """Render-ready audit_data (base conversion + best-effort enrichment), e.g. for pdf_service.render_many."""
+    audit_data = runner_result_to_audit_data(runner_result)
     try:
-        from app.audit.pdf_report import generate_audit_pdf
-        pdf_bytes = generate_audit_pdf(audit_data)
-
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-
-        with open(output_path, "wb") as f:
-            f.write(pdf_bytes)
-
-        logger.info(f"PDF generated successfully: {output_path}")
-        return output_path
+        audit_data = await _aenrich_audit_data_for_pdf(audit_data, runner_result, audit_id=audit_id)
+    except Exception as e:
+        logger.debug(f"PDF enrichment skipped due to error: {e}")
+    return audit_data
 
+async def agenerate_pdf_bytes(
+    runner_result: Dict[str, Any],
+    logo_path: Optional[str] = None,
+    report_title: str = PDF_REPORT_TITLE,
+    wait_for_renderer: bool = False,
+) -> bytes:
+    """
+    PDF document in memory: enrichment on the loop, rendering in the PDF process pool
+    (app.audit.pdf_service). Nothing touches the disk; callers stream or store the bytes.
+    PDFQueueFull / PDFRenderTimeout propagate to the caller; wait_for_renderer=True queues
+    behind a busy renderer instead of raising PDFQueueFull.
+    """
+    audit_data = await aprepare_audit_data(runner_result)
+    try:
+        return await pdf_service.render_pdf(audit_data, wait=wait_for_renderer)
+    except (pdf_service.PDFQueueFull, pdf_service.PDFRenderTimeout):
+        raise
     except ImportError as e:
         logger.error(f"PDF generation failed: missing dependencies (reportlab?) - {e}")
         raise RuntimeError("PDF dependencies missing. Install reportlab and Pillow.") from e
-
     except Exception as e:
         logger.exception("PDF generation error")
         raise RuntimeError(f"PDF generation failed: {str(e)}") from e
 
+async def agenerate_pdf_from_runner_result(
+    runner_result: Dict[str, Any],
+    output_path: str,
+    logo_path: Optional[str] = None,
+    report_title: str = PDF_REPORT_TITLE,
+    wait_for_renderer: bool = False,
+) -> str:
+    """Async twin of generate_pdf_from_runner_result (for callers that keep the file, e.g. jobs)."""
+    pdf_bytes = await agenerate_pdf_bytes(runner_result, logo_path, report_title, wait_for_renderer)
+    await asyncio.to_thread(_write_pdf_file, output_path, pdf_bytes)
+    logger.info(f"PDF generated successfully: {output_path}")
+    return output_path
+
+def _store_artifact(audited_url: str, fetch: Dict[str, Any]) -> None:
+    """Keep the fetched page for PDF enrichment (see app.audit.artifacts)."""
+    try:
+        artifact_store.put(PageArtifact(
+            url=audited_url,
+            final_url=fetch.get("final_url") or audited_url,
+            status_code=_safe_int(fetch.get("status_code"), 0),
+            headers=fetch.get("headers") or {},
+            html=fetch.get("html") or "",
+        ))
+    except Exception as e:
+        logger.debug(f"artifact store failed: {e}")
+
+# ============================================================
+# CPU stage (parse + features + scoring) — top-level so it can run in the process pool
+# ============================================================
+def _analyze_page(fetch: Dict[str, Any], audited_url: str, weights: Dict[str, float]) -> Dict[str, Any]:
+    """Pure function of the fetched page: returns the run() result dict (picklable in and out)."""
+    html_content = fetch.get("html") or ""
+    features = _extract_features(html_content, _try_bs4_parse(html_content))
+    return _score_features(fetch, features, audited_url, weights)
+
+def _analyze_site_page(fetch: Dict[str, Any], audited_url: str, weights: Dict[str, float]) -> Dict[str, Any]:
+    """Site mode: full page result plus the raw title / meta description used for duplicate detection."""
+    html_content = fetch.get("html") or ""
+    features = _extract_features(html_content, _try_bs4_parse(html_content))
+    return {
+        "result": _score_features(fetch, features, audited_url, weights),
+        "title": (features.title or "").strip(),
+        "meta_description": features.meta_description,
+    }
+
+def _score_features(fetch: Dict[str, Any], features: PageFeatures, audited_url: str, weights: Dict[str, float]) -> Dict[str, Any]:
+    final_url = fetch.get("final_url") or audited_url
+    status_code = _safe_int(fetch.get("status_code"), 0)
+    headers = fetch.get("headers") or {}
+    load_ms = _safe_int(fetch.get("load_ms"), 0)
+    size_bytes = _safe_int(fetch.get("bytes"), 0)
+    fetcher = fetch.get("fetcher", "unknown")
+
+    title = _truncate((features.title or "").strip(), 200)
+    meta_desc = features.meta_description_present
+    canonical = _canonical_url(features, final_url)
+    h1_count = features.h1
+    imgs_total, imgs_missing_alt = features.images_total, features.images_missing_alt
+    links = _link_counts(features, final_url)
+    resources = {"scripts": features.scripts, "styles": features.stylesheets}
+    https = _is_https(final_url)
+    server_header = str(headers.get("Server", "") or headers.get("server", "") or "")
+    hsts = bool(headers.get("Strict-Transport-Security") or headers.get("strict-transport-security"))
+
+    perf = 100
+    if load_ms > 8000: perf -= 45
+    elif load_ms > 5000: perf -= 35
+    elif load_ms > 3000: perf -= 25
+    elif load_ms > 1500: perf -= 15
+    elif load_ms > 800: perf -= 8
+    if size_bytes > 3_000_000: perf -= 25
+    elif size_bytes > 1_500_000: perf -= 15
+    elif size_bytes > 800_000: perf -= 8
+    if resources["scripts"] > 25: perf -= 10
+    if resources["styles"] > 12: perf -= 6
+    perf = _clamp(perf)
+
+    seo = 100
+    if not title: seo -= 35
+    else:
+        if len(title) < 15: seo -= 10
+        if len(title) > 65: seo -= 10
+    if not meta_desc: seo -= 25
+    if not canonical: seo -= 5
+    if h1_count == 0: seo -= 15
+    elif h1_count > 1: seo -= 10
+    if imgs_total >= 5:
+        ratio_missing = imgs_missing_alt / max(imgs_total, 1)
+        if ratio_missing > 0.5: seo -= 10
+        elif ratio_missing > 0.25: seo -= 6
+    seo = _clamp(seo)
+
+    link_score = 100
+    if links["total"] == 0: link_score -= 35
+    else:
+        if links["internal"] == 0: link_score -= 25
+        if links["external"] > max(25, links["internal"] * 3): link_score -= 10
+    link_score = _clamp(link_score)
+
+    sec = 100
+    if not https: sec -= 45
+    if status_code >= 400 or status_code == 0: sec -= 25
+    if https and not hsts: sec -= 5
+    sec = _clamp(sec)
+
+    competitors = 0
+    ai = 0
+
+    w = weights
+    overall = int(
+        seo * w["seo"] +
+        perf * w["performance"] +
+        link_score * w["links"] +
+        sec * w["security"]
+    )
+    overall = _clamp(overall)
+    grade = _grade(overall)
+
+    breakdown = {
+        "seo": {
+            "score": seo,
+            "extras": {
+                "title": title,
+                "meta_description_present": meta_desc,
+                "canonical": canonical,
+                "h1_count": h1_count,
+                "images_total": imgs_total,
+                "images_missing_alt": imgs_missing_alt,
+            },
+        },
+        "performance": {
+            "score": perf,
+            "extras": {
+                "load_ms": load_ms,
+                "bytes": size_bytes,
+                "scripts": resources["scripts"],
+                "styles": resources["styles"],
+                "fetcher": fetcher,
+            },
+        },
+        "links": {
+            "score": link_score,
+            "internal_links_count": links["internal"],
+            "external_links_count": links["external"],
+            "total_links_count": links["total"],
+        },
+        "security": {
+            "score": sec,
+            "https": https,
+            "hsts": hsts,
+            "status_code": status_code,
+            "server": _truncate(server_header, 120),
+        },
+        "competitors": {"score": competitors, "top_competitor_score": competitors},
+        "ai": {"score": ai},
+    }
+
+    chart_data = [
+        {
+            "title": "Score Breakdown",
+            "type": "bar",
+            "data": {
+                "labels": ["SEO", "Performance", "Links", "Security"],
+                "datasets": [{
+                    "label": "Score",
+                    "data": [seo, perf, link_score, sec],
+                    "backgroundColor": ["#fbbf24", "#38bdf8", "#22c55e", "#ef4444"],
+                }]
+            }
+        }
+    ]
+
+    dynamic_cards = [
+        {"title": "Page Title", "body": title or "No <title> found."},
+        {"title": "Load Time", "body": f"{load_ms} ms"},
+        {"title": "Page Size", "body": f"{size_bytes} bytes"},
+    ]
+
+    dynamic_kv = [
+        {"key": "final_url", "value": final_url},
+        {"key": "status_code", "value": status_code},
+        {"key": "https", "value": https},
+        {"key": "hsts", "value": hsts},
+        {"key": "internal_links", "value": links["internal"]},
+        {"key": "external_links", "value": links["external"]},
+        {"key": "total_links", "value": links["total"]},
+        {"key": "images_missing_alt", "value": imgs_missing_alt},
+        {"key": "fetcher", "value": fetcher},
+    ]
+
+    result = {
+        "audited_url": final_url,
+        "overall_score": overall,
+        "grade": grade,
+        "breakdown": breakdown,
+        "chart_data": chart_data,
+        "dynamic": {"cards": dynamic_cards, "kv": dynamic_kv},
+    }
+    return result
+
+# ============================================================
+# Site mode (crawl + per-page scoring + aggregates)
+# ============================================================
+SITE_WORST_PAGES = int(os.getenv("SITE_WORST_PAGES", "5"))
+SITE_CATEGORIES = ("seo", "performance", "links", "security")
+
+def _max_crawl_pages() -> int:
+    """settings.MAX_CRAWL_PAGES when settings load; MAX_CRAWL_PAGES env otherwise."""
+    try:
+        from app.settings import get_settings
+        return max(1, int(get_settings().MAX_CRAWL_PAGES))
+    except Exception:
+        return max(1, _safe_int(os.getenv("MAX_CRAWL_PAGES", "50"), 50))
+
+def _distribution(values: List[int]) -> Dict[str, Any]:
+    if not values:
+        return {"min": 0, "max": 0, "mean": 0, "median": 0}
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    median = ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": round(sum(ordered) / len(ordered), 1),
+        "median": median,
+    }
+
+def _duplicates(rows: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    groups: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        value = (row.get(key) or "").strip()
+        if value:
+            groups.setdefault(value.lower(), {key: value, "urls": []})["urls"].append(row["url"])
+    return [g for g in groups.values() if len(g["urls"]) > 1]
+
+def _site_page_row(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    result = analysis["result"]
+    bd = result.get("breakdown") or {}
+    row = {
+        "url": result.get("audited_url"),
+        "overall_score": result.get("overall_score", 0),
+        "grade": result.get("grade", "F"),
+        "title": _truncate(analysis.get("title") or "", 200),
+        "meta_description": _truncate(analysis.get("meta_description") or "", 320),
+    }
+    for cat in SITE_CATEGORIES:
+        row[cat] = _safe_int((bd.get(cat) or {}).get("score"), 0)
+    return row
+
+def _site_aggregates(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    grades: Dict[str, int] = {g: 0 for g in ("A+", "A", "B", "C", "D", "F")}
+    for row in rows:
+        grades[row["grade"]] = grades.get(row["grade"], 0) + 1
+    distributions = {"overall": _distribution([r["overall_score"] for r in rows])}
+    for cat in SITE_CATEGORIES:
+        distributions[cat] = _distribution([r[cat] for r in rows])
+    worst = sorted(rows, key=lambda r: (r["overall_score"], r["url"] or ""))[:SITE_WORST_PAGES]
+    return {
+        "pages_audited": len(rows),
+        "grade_distribution": grades,
+        "score_distributions": distributions,
+        "worst_pages": [{"url": r["url"], "overall_score": r["overall_score"], "grade": r["grade"]} for r in worst],
+        "duplicate_titles": _duplicates(rows, "title"),
+        "duplicate_meta_descriptions": _duplicates(rows, "meta_description"),
+        "missing_titles": sum(1 for r in rows if not r["title"]),
+        "missing_meta_descriptions": sum(1 for r in rows if not r["meta_description"]),
+    }
+
 # ============================================================
 # Runner Core (unchanged IO)
 # ============================================================
@@ -905,7 +1161,14 @@ class WebsiteAuditRunner:
         "security": 0.10
     })
 
-    async def run(self, url: str, html: str = "", progress_cb: ProgressCB = None) -> Dict[str, Any]:
+    async def run(
+        self,
+        url: str,
+        html: str = "",
+        progress_cb: ProgressCB = None,
+        mode: str = "page",
+        max_pages: Optional[int] = None,
+    ) -> Dict[str, Any]:
         audited_url = _normalize_url(url)
 
         def fail(message: str) -> Dict[str, Any]:
@@ -924,6 +1187,9 @@ class WebsiteAuditRunner:
 
         await _maybe_progress(progress_cb, "starting", 5, {"url": audited_url})
 
+        if mode == "site":
+            return await self._run_site(audited_url, progress_cb, max_pages, fail)
+
         if html.strip():
             fetch = {
                 "final_url": audited_url,
@@ -943,166 +1209,121 @@ class WebsiteAuditRunner:
                 await _maybe_progress(progress_cb, "error", 100, {"error": str(e)})
                 return fail(str(e))
 
-        final_url = fetch.get("final_url") or audited_url
-        status_code = _safe_int(fetch.get("status_code"), 0)
-        headers = fetch.get("headers") or {}
-        html_content = fetch.get("html") or ""
-        load_ms = _safe_int(fetch.get("load_ms"), 0)
-        size_bytes = _safe_int(fetch.get("bytes"), 0)
-        fetcher = fetch.get("fetcher", "unknown")
+        _store_artifact(audited_url, fetch)
 
-        await _maybe_progress(progress_cb, "parsing", 40, None)
-        soup = _try_bs4_parse(html_content)
-
-        title = _extract_title(html_content, soup)
-        meta_desc = _has_meta_description(html_content, soup)
-        canonical = _canonical_url(html_content, final_url, soup)
-        h1_count = _count_h1(html_content, soup)
-        imgs_total, imgs_missing_alt = _image_alt_stats(html_content, soup)
-        links = _link_counts(html_content, final_url, soup)
-        resources = _resource_counts(html_content, soup)
-        https = _is_https(final_url)
-        server_header = str(headers.get("Server", "") or headers.get("server", "") or "")
-        hsts = bool(headers.get("Strict-Transport-Security") or headers.get("strict-transport-security"))
-
-        await _maybe_progress(progress_cb, "scoring", 60, None)
-
-        perf = 100
-        if load_ms > 8000: perf -= 45
-        elif load_ms > 5000: perf -= 35
-        elif load_ms > 3000: perf -= 25
-        elif load_ms > 1500: perf -= 15
-        elif load_ms > 800: perf -= 8
-        if size_bytes > 3_000_000: perf -= 25
-        elif size_bytes > 1_500_000: perf -= 15
-        elif size_bytes > 800_000: perf -= 8
-        if resources["scripts"] > 25: perf -= 10
-        if resources["styles"] > 12: perf -= 6
-        perf = _clamp(perf)
-
-        seo = 100
-        if not title: seo -= 35
-        else:
-            if len(title) < 15: seo -= 10
-            if len(title) > 65: seo -= 10
-        if not meta_desc: seo -= 25
-        if not canonical: seo -= 5
-        if h1_count == 0: seo -= 15
-        elif h1_count > 1: seo -= 10
-        if imgs_total >= 5:
-            ratio_missing = imgs_missing_alt / max(imgs_total, 1)
-            if ratio_missing > 0.5: seo -= 10
-            elif ratio_missing > 0.25: seo -= 6
-        seo = _clamp(seo)
-
-        link_score = 100
-        if links["total"] == 0: link_score -= 35
-        else:
-            if links["internal"] == 0: link_score -= 25
-            if links["external"] > max(25, links["internal"] * 3): link_score -= 10
-        link_score = _clamp(link_score)
-
-        sec = 100
-        if not https: sec -= 45
-        if status_code >= 400 or status_code == 0: sec -= 25
-        if https and not hsts: sec -= 5
-        sec = _clamp(sec)
-
-        competitors = 0
-        ai = 0
-
-        w = self.weights
-        overall = int(
-            seo * w["seo"] +
-            perf * w["performance"] +
-            link_score * w["links"] +
-            sec * w["security"]
-        )
-        overall = _clamp(overall)
-        grade = _grade(overall)
+        # DNS / TLS facts resolve on the loop while the CPU stage runs (they only need the host name, so
+        # caller-supplied HTML gets them too)
+        host_task = None
+        if AUDIT_HOST_FACTS:
+            host_task = asyncio.create_task(host_facts(fetch.get("final_url") or audited_url))
 
+        await _maybe_progress(progress_cb, "parsing", 40, None)
+        try:
+            result = await run_cpu(_analyze_page, fetch, audited_url, dict(self.weights))
+        except BaseException:
+            if host_task is not None:
+                host_task.cancel()
+            raise
         await _maybe_progress(progress_cb, "building_output", 85, None)
+        if host_task is not None:
+            facts = await host_task
+            if facts:
+                result["host"] = facts
 
-        breakdown = {
-            "seo": {
-                "score": seo,
-                "extras": {
-                    "title": title,
-                    "meta_description_present": meta_desc,
-                    "canonical": canonical,
-                    "h1_count": h1_count,
-                    "images_total": imgs_total,
-                    "images_missing_alt": imgs_missing_alt,
-                },
-            },
-            "performance": {
-                "score": perf,
-                "extras": {
-                    "load_ms": load_ms,
-                    "bytes": size_bytes,
-                    "scripts": resources["scripts"],
-                    "styles": resources["styles"],
-                    "fetcher": fetcher,
-                },
-            },
-            "links": {
-                "score": link_score,
-                "internal_links_count": links["internal"],
-                "external_links_count": links["external"],
-                "total_links_count": links["total"],
-            },
-            "security": {
-                "score": sec,
-                "https": https,
-                "hsts": hsts,
-                "status_code": status_code,
-                "server": _truncate(server_header, 120),
-            },
-            "competitors": {"score": competitors, "top_competitor_score": competitors},
-            "ai": {"score": ai},
-        }
+        await _maybe_progress(progress_cb, "completed", 100, result)
+        return result
 
-        chart_data = [
-            {
-                "title": "Score Breakdown",
-                "type": "bar",
-                "data": {
-                    "labels": ["SEO", "Performance", "Links", "Security"],
-                    "datasets": [{
-                        "label": "Score",
-                        "data": [seo, perf, link_score, sec],
-                        "backgroundColor": ["#fbbf24", "#38bdf8", "#22c55e", "#ef4444"],
-                    }]
-                }
+    async def _run_site(
+        self,
+        audited_url: str,
+        progress_cb: ProgressCB,
+        max_pages: Optional[int],
+        fail: Callable[[str], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Site mode: crawl up to max_pages same-site pages (capped by MAX_CRAWL_PAGES),
+        score each in the process pool and aggregate. The start page's result keeps the
+        single-page contract; "pages" and "site" are added alongside it.
+        """
+        from app.audit.crawler import crawl_site
+
+        cap = _max_crawl_pages()
+        limit = min(max(1, _safe_int(max_pages, cap)), cap)
+        await _maybe_progress(progress_cb, "crawling", 10, {"max_pages": limit})
+        host_task = asyncio.create_task(host_facts(audited_url)) if AUDIT_HOST_FACTS else None
+        try:
+            pages = await crawl_site(audited_url, max_pages=limit, timeout=self.timeout, user_agent=self.user_agent)
+        except Exception as e:
+            if host_task is not None:
+                host_task.cancel()
+            await _maybe_progress(progress_cb, "error", 100, {"error": str(e)})
+            return fail(str(e))
+        if not pages:
+            if host_task is not None:
+                host_task.cancel()
+            await _maybe_progress(progress_cb, "error", 100, {"error": "No pages could be crawled"})
+            return fail("No pages could be crawled")
+        await _maybe_progress(progress_cb, "crawled", 30, {"pages": len(pages)})
+
+        weights = dict(self.weights)
+        done = 0
+
+        async def score(page_url: str, page_html: str) -> Dict[str, Any]:
+            nonlocal done
+            fetch = {
+                "final_url": page_url,
+                "status_code": 200,
+                "headers": {},
+                "html": page_html,
+                "bytes": len(page_html.encode()),
+                "load_ms": 0,
+                "fetcher": "crawler",
             }
-        ]
-
-        dynamic_cards = [
-            {"title": "Page Title", "body": title or "No <title> found."},
-            {"title": "Load Time", "body": f"{load_ms} ms"},
-            {"title": "Page Size", "body": f"{size_bytes} bytes"},
-        ]
-
-        dynamic_kv = [
-            {"key": "final_url", "value": final_url},
-            {"key": "status_code", "value": status_code},
-            {"key": "https", "value": https},
-            {"key": "hsts", "value": hsts},
-            {"key": "internal_links", "value": links["internal"]},
-            {"key": "external_links", "value": links["external"]},
-            {"key": "total_links", "value": links["total"]},
-            {"key": "images_missing_alt", "value": imgs_missing_alt},
-            {"key": "fetcher", "value": fetcher},
-        ]
-
-        result = {
-            "audited_url": final_url,
+            _store_artifact(page_url, fetch)
+            analysis = await run_cpu(_analyze_site_page, fetch, page_url, weights)
+            done += 1
+            await _maybe_progress(progress_cb, "scoring_pages", 30 + int(55 * done / len(pages)),
+                                  {"done": done, "total": len(pages)})
+            return analysis
+
+        analyses = await asyncio.gather(*(score(u, h) for u, h in pages.items()))
+        rows = [_site_page_row(a) for a in analyses]
+        site = _site_aggregates(rows)
+
+        # Start page (first crawled) carries the single-page breakdown
+        result = dict(analyses[0]["result"])
+        overall = _clamp(round(site["score_distributions"]["overall"]["mean"]))
+        result.update({
+            "mode": "site",
             "overall_score": overall,
-            "grade": grade,
-            "breakdown": breakdown,
-            "chart_data": chart_data,
-            "dynamic": {"cards": dynamic_cards, "kv": dynamic_kv},
+            "grade": _grade(overall),
+            "pages": rows,
+            "site": site,
+        })
+        if host_task is not None:
+            facts = await host_task
+            if facts:
+                result["host"] = facts
+        result["chart_data"] = list(result.get("chart_data") or []) + [{
+            "title": "Pages by Grade",
+            "type": "bar",
+            "data": {
+                "labels": list(site["grade_distribution"].keys()),
+                "datasets": [{"label": "Pages", "data": list(site["grade_distribution"].values())}],
+            },
+        }]
+        dynamic = result.get("dynamic") or {}
+        result["dynamic"] = {
+            "cards": list(dynamic.get("cards") or []) + [
+                {"title": "Pages Audited", "body": str(len(rows))},
+                {"title": "Duplicate Titles", "body": str(len(site["duplicate_titles"]))},
+            ],
+            "kv": list(dynamic.get("kv") or []) + [
+                {"key": "pages_audited", "value": len(rows)},
+                {"key": "worst_page", "value": site["worst_pages"][0]["url"] if site["worst_pages"] else ""},
+            ],
         }
 
+        await _maybe_progress(progress_cb, "building_output", 90, None)
         await _maybe_progress(progress_cb, "completed", 100, result)
         return result
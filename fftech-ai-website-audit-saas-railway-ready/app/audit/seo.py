@@ -2,6 +2,8 @@ from typing import List
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 
+from app.audit.features import PageFeatures, extract_features
+
 
 def _safe_str(value) -> str:
     """Convert value to a clean lowercase string."""
@@ -19,12 +21,16 @@ def calculate_seo_score(soup: BeautifulSoup) -> int:
     - Output unchanged
     - Optimized for high-quality sites like Apple.com
     """
+    return score_seo_features(extract_features(soup=soup))
+
+
+def score_seo_features(features: PageFeatures) -> int:
+    """Same scoring as calculate_seo_score, on an already-extracted PageFeatures record."""
     score = 0
     issues: List[str] = []
 
     # ---------- 1) TITLE QUALITY (20 pts) ----------
-    title_tag = soup.title
-    title_text = _safe_str(title_tag.string if title_tag else "")
+    title_text = _safe_str(features.title)
     title_len = len(title_text)
     if title_text:
         score += 10
@@ -33,8 +39,7 @@ def calculate_seo_score(soup: BeautifulSoup) -> int:
         issues.append("Missing title tag")
 
     # ---------- 2) META DESCRIPTION (15 pts) ----------
-    meta_desc = soup.find("meta", attrs={"name": "description"})
-    desc_content = _safe_str(meta_desc.get("content")) if meta_desc else ""
+    desc_content = _safe_str(features.meta.get("description"))
     desc_len = len(desc_content)
     if desc_content:
         score += 8
@@ -43,24 +48,20 @@ def calculate_seo_score(soup: BeautifulSoup) -> int:
         issues.append("Missing meta description")
 
     # ---------- 3) HEADING SEMANTICS (20 pts) ----------
-    h1s = soup.find_all("h1")
-    h2s = soup.find_all("h2")
-    h3s = soup.find_all("h3")
-    if 1 <= len(h1s) <= 2:
+    if 1 <= features.h1 <= 2:
         score += 10
-    elif len(h1s) > 2:
+    elif features.h1 > 2:
         score += 5
     else:
         issues.append("No H1 tag")
 
-    score += min(6, len(h2s) * 2)
-    score += min(4, len(h3s) * 1)
+    score += min(6, features.h2 * 2)
+    score += min(4, features.h3 * 1)
 
     # ---------- 4) ACCESSIBILITY (ALT TEXTS) (15 pts) ----------
-    imgs = soup.find_all("img")
-    if imgs:
-        alt_ok = sum(1 for img in imgs if _safe_str(img.get("alt")))
-        alt_ratio = alt_ok / len(imgs)
+    if features.images_total:
+        alt_ok = features.images_total - features.images_missing_alt
+        alt_ratio = alt_ok / features.images_total
         if alt_ratio >= 0.7:
             score += 15
         elif alt_ratio >= 0.4:
@@ -72,26 +73,22 @@ def calculate_seo_score(soup: BeautifulSoup) -> int:
         score += 8
 
     # ---------- 5) VIEWPORT (5 pts) ----------
-    viewport = soup.find("meta", attrs={"name": "viewport"})
-    if viewport and "width=device-width" in _safe_str(viewport.get("content")):
+    if "width=device-width" in _safe_str(features.meta.get("viewport")):
         score += 5
     else:
         issues.append("Missing or invalid viewport")
 
     # ---------- 6) CANONICAL (5 pts) ----------
-    canonical = soup.find("link", rel="canonical")
-    score += 5 if canonical and canonical.get("href") else 2
+    score += 5 if features.seo_canonical_href else 2
 
     # ---------- 7) INTERNAL LINK QUALITY (10 pts) ----------
     internal_links = 0
     nofollow_internal = 0
-    base_tag = soup.find("base")
-    base_url = base_tag.get("href") if base_tag else ""
+    base_url = features.base_href
     base_host = urlparse(base_url).netloc
 
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
-        rel = _safe_str(a.get("rel"))
+    for href, rel in features.anchors:
+        href = href.strip()
         host = urlparse(urljoin(base_url, href)).netloc
         if not host or host == base_host:
             internal_links += 1
@@ -108,8 +105,7 @@ def calculate_seo_score(soup: BeautifulSoup) -> int:
     score += 4 if nofollow_internal == 0 else max(0, 4 - nofollow_internal)
 
     # ---------- 8) ROBOTS INDEXING (bonus/penalty 5) ----------
-    robots = soup.find("meta", attrs={"name": "robots"})
-    robots_content = _safe_str(robots.get("content") if robots else "")
+    robots_content = _safe_str(features.meta.get("robots"))
     score += 3 if "noindex" not in robots_content else -5
 
     # ---------- FINAL CLAMP ----------
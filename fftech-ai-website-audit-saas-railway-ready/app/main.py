@@ -6,28 +6,46 @@ Fully integrated FastAPI app for Website Audit Pro
 - WebSocket /ws for live progress & results
 - REST fallback /api/audit/run
 - PDF generation /api/audit/pdf (safe, enriched in runner.py)
+- Background jobs /api/jobs (submit → poll → fetch result / PDF; kind=bundle: agency portfolio PDF)
+- Bulk audits /api/audit/bulk (NDJSON stream, completion order, shared connection pool)
+- Scheduled audits + nightly PSI batch started in one worker (app.services.scheduler, SCHEDULER_ENABLED)
 - Robust logging & error handling for Railway
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import re
-import tempfile
 import time
 import logging
+from collections import defaultdict, deque
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
-import requests
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, PlainTextResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
 
 # Import runner + PDF helper
-from app.audit.runner import WebsiteAuditRunner, generate_pdf_from_runner_result
+from app.audit import browser_pool, cpu_pool, pdf_cache, pdf_service
+from app.audit.psi import psi_client
+from app.audit.runner import (
+    WebsiteAuditRunner,
+    agenerate_pdf_bytes,
+    agenerate_pdf_from_runner_result,
+    aprepare_audit_data,
+)
+from app.services.jobs import Job, JobQueueFull, job_queue
+from app.services.progress import ProgressChannel, dumps, result_frame
+from app import warmup
+
+if TYPE_CHECKING:  # httpx / requests are imported on first use (startup time, see app.warmup)
+    import httpx
 
 # -----------------------------------------------------------------------------
 # Logging (Railway-visible)
@@ -88,9 +106,9 @@ def _runner_error_message(result: Dict[str, Any]) -> Optional[str]:
 
 
 async def _ws_send(ws: WebSocket, message: Dict[str, Any]) -> None:
-    """Send JSON to WS; swallow transient send errors."""
+    """Send JSON (orjson) to WS; swallow transient send errors."""
     try:
-        await ws.send_text(json.dumps(message, ensure_ascii=False))
+        await ws.send_text(dumps(message))
     except Exception:
         # Client might have gone away
         pass
@@ -104,6 +122,8 @@ def _fetch_html(url: str) -> Tuple[bool, str, str]:
     Returns: (success, html_text, mode_or_error)
       mode_or_error is either "strict" | "insecure" | error message
     """
+    import requests
+
     headers = {
         "User-Agent": "FFTechAuditBot/2.0",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -123,11 +143,113 @@ def _fetch_html(url: str) -> Tuple[bool, str, str]:
         return False, "", f"Fetch failed: {str(e)}"
 
 
+async def _fetch_html_async(client: httpx.AsyncClient, url: str) -> Tuple[bool, str, str]:
+    """
+    Async twin of _fetch_html over a shared (pooled) httpx client.
+    SSL failures fall back to the insecure path of _fetch_html in a thread.
+    """
+    import httpx
+
+    try:
+        r = await client.get(url)
+        r.raise_for_status()
+        return True, r.text, "strict"
+    except httpx.ConnectError as e:
+        if "CERTIFICATE" in str(e).upper() or "SSL" in str(e).upper():
+            return await asyncio.to_thread(_fetch_html, url)
+        return False, "", f"Fetch failed: {str(e)}"
+    except Exception as e:
+        return False, "", f"Fetch failed: {str(e)}"
+
+
+class AuditFetchError(RuntimeError):
+    """Target page could not be fetched (maps to HTTP 400 / WS error)."""
+
+
+def _audit_cache_key(url: str, mode: str = "page", max_pages: Optional[int] = None) -> str:
+    """Single-page audits keep the bare URL as key (shared with PDF / bulk / jobs)."""
+    if mode == "site":
+        return f"site:{max_pages or 0}:{url}"
+    return url
+
+
+async def _run_audit(
+    url: str,
+    progress_cb=None,
+    client: Optional[httpx.AsyncClient] = None,
+    mode: str = "page",
+    max_pages: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Shared audit pipeline for WS, REST, PDF, bulk and background jobs:
+    cache → prefetch HTML (off the event loop) → runner.run → cache.
+    A shared httpx client (bulk) reuses pooled connections for the prefetch.
+    mode="site" crawls instead of prefetching (runner.run(mode="site")).
+    """
+    key = _audit_cache_key(url, mode, max_pages)
+    cached = _cache_get(key)
+    if cached and not _runner_error_message(cached):
+        return cached
+
+    if mode == "site":
+        result = await WebsiteAuditRunner().run(url, progress_cb=progress_cb, mode="site", max_pages=max_pages)
+        _cache_set(key, result)
+        return result
+
+    if progress_cb:
+        await progress_cb("fetching", 10, {"message": "Fetching HTML..."})
+    if client is not None:
+        success, html_content, fetch_mode = await _fetch_html_async(client, url)
+    else:
+        success, html_content, fetch_mode = await asyncio.to_thread(_fetch_html, url)
+    if not success:
+        raise AuditFetchError(f"Could not fetch page: {fetch_mode}")
+    if progress_cb:
+        await progress_cb("fetched", 20, {"message": f"HTML fetched ({fetch_mode}), length: {len(html_content)}"})
+
+    runner = WebsiteAuditRunner()
+    result = await runner.run(url, html=html_content, progress_cb=progress_cb)
+    _cache_set(url, result)
+    return result
+
+
+# X-Tenant-ID is client-controlled: honour it only when an authenticating gateway in front of the app sets it
+JOB_TRUST_TENANT_HEADER = os.getenv("JOB_TRUST_TENANT_HEADER", "0") == "1"
+
+
+def _session_user(request: Request) -> Optional[str]:
+    """Email of the signed-in user (magic-link session cookie), or None."""
+    token = request.cookies.get("session")
+    if not token:
+        return None
+    try:
+        from app.auth.tokens import decode_token
+    except Exception:  # auth not configured (settings missing)
+        return None
+    payload = decode_token(token) or {}
+    sub = payload.get("sub")
+    return sub if isinstance(sub, str) and sub else None
+
+
+def _tenant_of(request: Request) -> str:
+    """Tenant key for per-tenant job limits: trusted gateway header, else signed-in user, else client address."""
+    if JOB_TRUST_TENANT_HEADER:
+        tenant = (request.headers.get("X-Tenant-ID") or "").strip()
+        if tenant:
+            return f"tenant:{tenant[:120]}"
+    user = _session_user(request)
+    if user:
+        return f"user:{user.lower()}"
+    return f"ip:{request.client.host}" if request.client else "anonymous"
+
+
 # -----------------------------------------------------------------------------
 # Pydantic models
 # -----------------------------------------------------------------------------
 class AuditRunRequest(BaseModel):
     url: str = Field(..., description="Website URL")
+    mode: str = Field("page", pattern="^(page|site)$", description="page = one document, site = crawl + aggregate")
+    max_pages: Optional[int] = Field(None, ge=1, description="Site mode page limit (capped by MAX_CRAWL_PAGES)")
 
 
 class PdfRequest(BaseModel):
@@ -164,69 +286,114 @@ async def index(_: Request) -> HTMLResponse:
 
 # -----------------------------------------------------------------------------
 # WebSocket: /ws
+#   → {"url": "...", "request_id": "a1", "delta": false, "mode": "page", "max_pages": 20}
+#     (everything but url optional; mode "site" crawls and aggregates)
+#   ← {"status": ..., "progress": ..., "request_id": "a1", "payload" | "result" | "patch": ...}
+# Several audits run concurrently per connection (WS_MAX_CONCURRENT_AUDITS);
+# every frame is tagged with the request_id it belongs to. Intermediate progress
+# is coalesced (PROGRESS_MIN_INTERVAL_MS) and the result is sent once; with
+# "delta": true a repeat audit of a URL returns a JSON patch against the last result.
 # -----------------------------------------------------------------------------
+WS_MAX_CONCURRENT_AUDITS = int(os.getenv("WS_MAX_CONCURRENT_AUDITS", "4"))
+WS_MAX_QUEUED_AUDITS = int(os.getenv("WS_MAX_QUEUED_AUDITS", "16"))
+
+
 @app.websocket("/ws")
 async def ws_audit(ws: WebSocket):
     await ws.accept()
-    runner = WebsiteAuditRunner()
     logger.info("WebSocket client connected.")
+
+    send_lock = asyncio.Lock()  # one frame at a time on the socket
+    slots = asyncio.Semaphore(WS_MAX_CONCURRENT_AUDITS)
+    active: Dict[Any, asyncio.Task] = {}
+    last_results: Dict[str, Dict[str, Any]] = {}  # url → last result sent (delta base)
+
+    async def send(message: Dict[str, Any], request_id: Any = None) -> None:
+        if request_id is not None:
+            message["request_id"] = request_id
+        async with send_lock:
+            await _ws_send(ws, message)
+
+    async def handle(url: str, request_id: Any, delta: bool, mode: str, max_pages: Optional[int]) -> None:
+        # Coalescing progress channel, tagged with request_id
+        channel = ProgressChannel(lambda frame: send(frame, request_id))
+
+        async with slots:
+            try:
+                # Cache → prefetch HTML → runner (keeps IO contract unchanged)
+                result = await _run_audit(url, progress_cb=channel.progress, mode=mode, max_pages=max_pages)
+
+                # Error from runner?
+                err = _runner_error_message(result)
+                if err:
+                    await channel.final({"status": "error", "progress": 100, "payload": {"error": err}})
+                    return
+
+                key = _audit_cache_key(url, mode, max_pages)
+                await channel.final(result_frame(result, last_results.get(key), delta=delta))
+                last_results[key] = result
+
+            except AuditFetchError as e:
+                await channel.final({"status": "error", "progress": 100, "payload": {"error": str(e)}})
+            except asyncio.CancelledError:
+                channel.close()
+                raise
+            except Exception as e:
+                logger.exception("WebSocket audit error")
+                await channel.final({"status": "error", "progress": 100, "payload": {"error": str(e)}})
+
     try:
         while True:
             raw = await ws.receive_text()
             try:
                 msg = json.loads(raw)
             except Exception:
-                await _ws_send(ws, {"status": "error", "progress": 100, "payload": {"error": "Invalid JSON"}})
+                await send({"status": "error", "progress": 100, "payload": {"error": "Invalid JSON"}})
+                continue
+            if not isinstance(msg, dict):
+                await send({"status": "error", "progress": 100, "payload": {"error": "Expected a JSON object"}})
                 continue
 
-            url = (msg.get("url") or "").strip()
+            request_id = msg.get("request_id")
+            if request_id is not None and (isinstance(request_id, bool) or not isinstance(request_id, (str, int))):
+                await send({"status": "error", "progress": 100,
+                            "payload": {"error": "request_id must be a string or an integer"}})
+                continue
+            url = msg.get("url") or ""
+            if not isinstance(url, str):
+                await send({"status": "error", "progress": 100, "payload": {"error": "URL must be a string"}}, request_id)
+                continue
+            url = url.strip()
             if not url:
-                await _ws_send(ws, {"status": "error", "progress": 100, "payload": {"error": "URL is required"}})
+                await send({"status": "error", "progress": 100, "payload": {"error": "URL is required"}}, request_id)
                 continue
-
-            # Serve from cache if valid
-            cached = _cache_get(url)
-            if cached and not _runner_error_message(cached):
-                await _ws_send(ws, {"status": "completed", "progress": 100, "result": cached})
+            if request_id is not None and request_id in active:
+                await send({"status": "error", "progress": 100,
+                            "payload": {"error": "request_id already in progress"}}, request_id)
+                continue
+            if len(active) >= WS_MAX_CONCURRENT_AUDITS + WS_MAX_QUEUED_AUDITS:
+                await send({"status": "error", "progress": 100,
+                            "payload": {"error": "Too many audits in flight on this connection"}}, request_id)
                 continue
 
-            # Progress callback to stream to WS
-            async def progress_cb(status: str, percent: int, payload: Optional[dict] = None):
-                await _ws_send(ws, {"status": status, "progress": int(percent), "payload": payload})
-
+            mode = "site" if msg.get("mode") == "site" else "page"
             try:
-                # Prefetch HTML for deterministic scoring
-                await progress_cb("fetching", 10, {"message": "Fetching HTML..."})
-                success, html_content, fetch_mode = _fetch_html(url)
-                if not success:
-                    await _ws_send(ws, {
-                        "status": "error",
-                        "progress": 100,
-                        "payload": {"error": f"Could not fetch page: {fetch_mode}"}
-                    })
-                    continue
-
-                await progress_cb("fetched", 20, {"message": f"HTML fetched ({fetch_mode}), length: {len(html_content)}"})
-
-                # Run runner (keeps IO contract unchanged)
-                result = await runner.run(url, html=html_content, progress_cb=progress_cb)
-                _cache_set(url, result)
-
-                # Error from runner?
-                err = _runner_error_message(result)
-                if err:
-                    await _ws_send(ws, {"status": "error", "progress": 100, "payload": {"error": err}})
-                    continue
-
-                await _ws_send(ws, {"status": "completed", "progress": 100, "result": result})
-
-            except Exception as e:
-                logger.exception("WebSocket audit error")
-                await _ws_send(ws, {"status": "error", "progress": 100, "payload": {"error": str(e)}})
+                max_pages = int(msg["max_pages"]) if msg.get("max_pages") else None
+            except (TypeError, ValueError):
+                max_pages = None
+
+            key = request_id if request_id is not None else object()
+            task = asyncio.create_task(handle(url, request_id, bool(msg.get("delta")), mode, max_pages))
+            active[key] = task
+            task.add_done_callback(lambda _t, k=key: active.pop(k, None))
     except WebSocketDisconnect:
         logger.info("WebSocket client disconnected.")
     except Exception as e:
         logger.exception("WebSocket closed with error: %s", e)
+    finally:
+        for task in list(active.values()):
+            task.cancel()
+        await asyncio.gather(*active.values(), return_exceptions=True)
 
 
 # -----------------------------------------------------------------------------
@@ -238,26 +405,22 @@ async def api_audit_run(req: AuditRunRequest) -> JSONResponse:
     if not url:
         return JSONResponse({"error": "Empty URL"}, status_code=400)
 
-    cached = _cache_get(url)
+    cached = _cache_get(_audit_cache_key(url, req.mode, req.max_pages))
     if cached:
         return JSONResponse(cached)
 
-    runner = WebsiteAuditRunner()
-    success, html_content, fetch_mode = _fetch_html(url)
-    if not success:
-        return JSONResponse({"error": f"Could not fetch page: {fetch_mode}"}, status_code=400)
-
     try:
-        result = await runner.run(url, html=html_content, progress_cb=None)
-        _cache_set(url, result)
+        result = await _run_audit(url, mode=req.mode, max_pages=req.max_pages)
         return JSONResponse(result)
+    except AuditFetchError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
     except Exception as e:
         logger.exception("REST audit error")
         return JSONResponse({"error": str(e)}, status_code=500)
 
 
 # -----------------------------------------------------------------------------
-# PDF: /api/audit/pdf  (uses cached audit or runs fresh, then calls generate_pdf_from_runner_result)
+# PDF: /api/audit/pdf  (uses cached audit or runs fresh, renders in memory and streams the bytes)
 # -----------------------------------------------------------------------------
 @app.post("/api/audit/pdf")
 async def api_audit_pdf(req: PdfRequest):
@@ -266,19 +429,37 @@ async def api_audit_pdf(req: PdfRequest):
         raise HTTPException(status_code=400, detail="url is required")
 
     logger.info(f"PDF request received for URL: {url}")
+    fname = _safe_filename(url or "audit_report")
+    # report_title / logo_path are accepted for compatibility but not rendered (PDF_REPORT_TITLE /
+    # PDF_LOGO_PATH apply), so they are not part of the cache key
+    report_title = (req.report_title or "").strip() or "Website Audit Report"
+    logo_path = (req.logo_path or "").strip() or None
 
+    # Same audit + template → serve the already rendered document, even while the renderer is busy
     runner_result = _cache_get(url)
+    cache_key = None
+    if isinstance(runner_result, dict) and not _runner_error_message(runner_result):
+        cache_key = pdf_cache.cache_key(runner_result)
+        cached = pdf_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"PDF cache hit for {url}: {cache_key[:12]}")
+            return FileResponse(path=str(cached), media_type="application/pdf", headers=_pdf_headers(fname))
+
+    if not pdf_service.has_capacity():
+        raise HTTPException(
+            status_code=503,
+            detail="PDF renderer is busy, please retry shortly",
+            headers={"Retry-After": str(pdf_service.PDF_RENDER_RETRY_AFTER_SECONDS)},
+        )
+
     if runner_result is None:
         logger.info(f"No cache hit for {url} → running fresh audit")
-        runner = WebsiteAuditRunner()
-        success, html_content, fetch_mode = _fetch_html(url)
-        if not success:
-            logger.error(f"Fetch failed for PDF: {fetch_mode}")
-            raise HTTPException(status_code=400, detail=f"Could not fetch page: {fetch_mode}")
         try:
-            runner_result = await runner.run(url, html=html_content, progress_cb=None)
-            _cache_set(url, runner_result)
+            runner_result = await _run_audit(url)
             logger.info(f"Audit completed for PDF: {url}")
+        except AuditFetchError as e:
+            logger.error(f"Fetch failed for PDF: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.exception("Audit failed during PDF generation")
             raise HTTPException(status_code=500, detail=f"Audit failed: {str(e)}")
@@ -293,23 +474,21 @@ async def api_audit_pdf(req: PdfRequest):
         logger.error("Invalid runner_result structure for PDF")
         raise HTTPException(status_code=500, detail="Invalid audit result structure")
 
-    report_title = (req.report_title or "").strip() or "Website Audit Report"
-    logo_path = (req.logo_path or "").strip() or None
-
-    tmp_dir = Path(tempfile.mkdtemp(prefix="audit_pdf_"))
-    fname = _safe_filename(url or "audit_report")
-    pdf_path = tmp_dir / f"{fname}.pdf"
-
-    logger.info(f"Generating PDF at: {pdf_path}")
+    if cache_key is None:
+        cache_key = pdf_cache.cache_key(runner_result)
 
     try:
-        pdf_generated_path = generate_pdf_from_runner_result(
-            runner_result,
-            output_path=str(pdf_path),
-            logo_path=logo_path,
-            report_title=report_title,
+        pdf_bytes = await agenerate_pdf_bytes(runner_result, logo_path=logo_path, report_title=report_title)
+        logger.info(f"PDF successfully generated for {url}: {len(pdf_bytes)} bytes")
+    except pdf_service.PDFQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(pdf_service.PDF_RENDER_RETRY_AFTER_SECONDS)},
         )
-        logger.info(f"PDF successfully generated: {pdf_generated_path}")
+    except pdf_service.PDFRenderTimeout as e:
+        logger.error(f"PDF render timeout: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
     except ImportError:
         logger.error("PDF generation failed: reportlab not installed")
         raise HTTPException(
@@ -323,21 +502,341 @@ async def api_audit_pdf(req: PdfRequest):
         logger.exception("PDF generation failed")
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
 
-    if not pdf_path.exists():
-        logger.error("PDF file was not created")
+    if not pdf_bytes:
+        logger.error("PDF renderer returned no data")
         raise HTTPException(status_code=500, detail="PDF file was not created")
 
-    logger.info(f"Serving PDF file: {pdf_path}")
+    # Straight from the render buffer to the socket; the cache write happens after the response is sent
+    headers = _pdf_headers(fname)
+    headers["Content-Length"] = str(len(pdf_bytes))
+    return StreamingResponse(
+        _iter_chunks(pdf_bytes),
+        media_type="application/pdf",
+        headers=headers,
+        background=BackgroundTask(pdf_cache.put_bytes, cache_key, pdf_bytes) if pdf_cache.enabled() else None,
+    )
+
+
+PDF_STREAM_CHUNK_BYTES = 256 * 1024
+
+
+def _pdf_headers(fname: str) -> Dict[str, str]:
+    # identity: page streams are already Flate-compressed, gzip would only buffer the body and drop Content-Length
+    return {
+        "Content-Disposition": f'attachment; filename="{fname}.pdf"',
+        "Content-Encoding": "identity",
+    }
+
+
+async def _iter_chunks(data: bytes) -> AsyncIterator[bytes]:
+    view = memoryview(data)
+    for i in range(0, len(view), PDF_STREAM_CHUNK_BYTES):
+        yield bytes(view[i:i + PDF_STREAM_CHUNK_BYTES])
+
+
+# -----------------------------------------------------------------------------
+# Bulk: /api/audit/bulk  (NDJSON, one line per URL in completion order)
+# -----------------------------------------------------------------------------
+BULK_MAX_URLS = int(os.getenv("BULK_MAX_URLS", "1000"))
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "16"))
+BULK_PER_HOST = int(os.getenv("BULK_PER_HOST", "2"))
+
+
+class BulkAuditRequest(BaseModel):
+    urls: List[str] = Field(..., description="Website URLs to audit")
+    concurrency: Optional[int] = Field(None, description=f"Max concurrent audits (<= {BULK_CONCURRENCY})")
+
+
+def _bulk_host(url: str) -> str:
+    try:
+        netloc = urlparse(url if "://" in url else f"https://{url}").netloc.lower()
+        return netloc.removeprefix("www.")
+    except Exception:
+        return ""
+
+
+def _interleave_by_host(urls: List[str]) -> List[str]:
+    """Round-robin URLs across hosts so one host's long list cannot starve the others."""
+    buckets: Dict[str, deque] = defaultdict(deque)
+    for u in urls:
+        buckets[_bulk_host(u)].append(u)
+    out: List[str] = []
+    while buckets:
+        for host in list(buckets):
+            out.append(buckets[host].popleft())
+            if not buckets[host]:
+                del buckets[host]
+    return out
+
+
+async def _bulk_audit_stream(urls: List[str], concurrency: int) -> AsyncIterator[bytes]:
+    import httpx
+
+    started = time.perf_counter()
+    global_sem = asyncio.Semaphore(concurrency)
+    host_sems: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(BULK_PER_HOST))
+    done: asyncio.Queue = asyncio.Queue()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency, keepalive_expiry=30.0)
+    headers = {
+        "User-Agent": "FFTechAuditBot/2.0",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    }
+    ok = failed = 0
+
+    async with httpx.AsyncClient(
+        headers=headers, limits=limits, timeout=httpx.Timeout(20.0), follow_redirects=True
+    ) as client:
+
+        async def one(index: int, url: str) -> None:
+            t0 = time.perf_counter()
+            line: Dict[str, Any] = {"index": index, "url": url}
+            try:
+                # host slot first: a busy host must not hold a global slot while waiting
+                async with host_sems[_bulk_host(url)]:
+                    async with global_sem:
+                        result = await _run_audit(url, client=client)
+                err = _runner_error_message(result)
+                line.update({"ok": not err, "error": err, "result": None if err else result})
+            except Exception as e:
+                line.update({"ok": False, "error": str(e), "result": None})
+            line["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+            await done.put(line)
+
+        order = _interleave_by_host(urls)
+        index_of = {u: i for i, u in enumerate(urls)}
+        tasks = [asyncio.create_task(one(index_of[u], u)) for u in order]
+        try:
+            for _ in range(len(tasks)):
+                line = await done.get()
+                if line["ok"]:
+                    ok += 1
+                else:
+                    failed += 1
+                yield (dumps(line) + "\n").encode("utf-8")
+        finally:
+            # Client went away (or stream finished): stop outstanding audits
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    summary = {
+        "done": True,
+        "total": len(urls),
+        "ok": ok,
+        "failed": failed,
+        "elapsed_ms": int((time.perf_counter() - started) * 1000),
+    }
+    yield (dumps(summary) + "\n").encode("utf-8")
+
+
+@app.post("/api/audit/bulk")
+async def api_audit_bulk(req: BulkAuditRequest) -> StreamingResponse:
+    urls = list(dict.fromkeys(u.strip() for u in (req.urls or []) if u and u.strip()))
+    if not urls:
+        raise HTTPException(status_code=400, detail="urls must contain at least one URL")
+    if len(urls) > BULK_MAX_URLS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_URLS} URLs per request")
+
+    concurrency = max(1, min(req.concurrency or BULK_CONCURRENCY, BULK_CONCURRENCY))
+    logger.info(f"Bulk audit: {len(urls)} URLs, concurrency={concurrency}")
+    return StreamingResponse(
+        _bulk_audit_stream(urls, concurrency),
+        media_type="application/x-ndjson",
+        # identity: keep GZipMiddleware from buffering lines until the stream ends
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
+
+
+# -----------------------------------------------------------------------------
+# Background jobs: /api/jobs  (request latency decoupled from audit latency)
+# -----------------------------------------------------------------------------
+BUNDLE_MAX_SITES = int(os.getenv("BUNDLE_MAX_SITES", "25"))
+
+
+class JobRequest(PdfRequest):
+    url: str = Field("", description="Website URL to audit (kind='bundle': optional, defaults to the first site)")
+    kind: str = Field("audit", description="'audit' (JSON result), 'pdf' (audit + PDF report) or 'bundle'")
+    urls: Optional[List[str]] = Field(None, description=f"kind='bundle': sites of one portfolio PDF (<= {BUNDLE_MAX_SITES})")
+
+
+def _bundle_work(urls: List[str], title: Optional[str], brand: Optional[str]):
+    """Audit every site, then one agency portfolio PDF rendered on a pdf_service.BatchRenderer."""
+
+    async def work(job: Job, progress) -> Dict[str, Any]:
+        sem = asyncio.Semaphore(BULK_CONCURRENCY)
+        finished = 0
+
+        async def one(url: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+            nonlocal finished
+            async with sem:
+                try:
+                    result = await _run_audit(url)
+                    err = _runner_error_message(result)
+                    audit_data = None if err else await aprepare_audit_data(result)
+                except Exception as e:
+                    err, audit_data = str(e), None
+            finished += 1
+            await progress("auditing", int(80 * finished / len(urls)), None)
+            return {"url": url, "ok": audit_data is not None, "error": err}, audit_data
+
+        outcomes = await asyncio.gather(*(one(u) for u in urls))
+        audits = [audit_data for _, audit_data in outcomes if audit_data is not None]
+        if not audits:
+            raise RuntimeError("No site could be audited")
+
+        await progress("rendering_pdf", 85, None)
+        async with pdf_service.BatchRenderer() as batch:
+            pdf = await batch.render_bundle(audits, title=title, brand=brand)
+        pdf_path = job_queue.pdf_path_for(job.id)
+        await asyncio.to_thread(pdf_path.write_bytes, pdf)
+        job.pdf_path = str(pdf_path)
+        return {"sites": [site for site, _ in outcomes]}
+
+    return work
+
+
+def _job_work(req: JobRequest):
+    url = (req.url or "").strip()
+    report_title = (req.report_title or "").strip() or "Website Audit Report"
+    logo_path = (req.logo_path or "").strip() or None
+    if req.kind == "bundle":
+        return _bundle_work(req.urls or [], (req.report_title or "").strip() or None, (req.brand_name or "").strip() or None)
+
+    async def work(job: Job, progress) -> Dict[str, Any]:
+        result = await _run_audit(url, progress_cb=progress)
+        err = _runner_error_message(result)
+        if err:
+            raise RuntimeError(f"Audit error: {err}")
+        if job.kind != "pdf":
+            return result
+
+        await progress("rendering_pdf", 90, None)
+        pdf_path = job_queue.pdf_path_for(job.id)
+        await agenerate_pdf_from_runner_result(
+            result, str(pdf_path), logo_path, report_title, wait_for_renderer=True
+        )
+        job.pdf_path = str(pdf_path)
+        return result
+
+    return work
+
+
+@app.post("/api/jobs", status_code=202)
+async def api_jobs_submit(req: JobRequest, request: Request) -> JSONResponse:
+    kind = (req.kind or "audit").strip().lower()
+    if kind not in {"audit", "pdf", "bundle"}:
+        raise HTTPException(status_code=400, detail="kind must be 'audit', 'pdf' or 'bundle'")
+    req.kind = kind
+    if kind == "bundle":
+        req.urls = list(dict.fromkeys(u.strip() for u in (req.urls or []) if u and u.strip()))
+        if not req.urls:
+            raise HTTPException(status_code=400, detail="urls must contain at least one URL")
+        if len(req.urls) > BUNDLE_MAX_SITES:
+            raise HTTPException(status_code=413, detail=f"At most {BUNDLE_MAX_SITES} sites per bundle")
+        req.url = req.url or req.urls[0]
+    url = (req.url or "").strip()
+    if not url:
+        raise HTTPException(status_code=400, detail="url is required")
+
+    try:
+        job = await job_queue.submit(kind, _tenant_of(request), url, _job_work(req))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    logger.info(f"Job {job.id} queued ({kind}) for URL: {url}")
+    return JSONResponse(
+        {"id": job.id, "status": job.status, "status_url": f"/api/jobs/{job.id}"},
+        status_code=202,
+    )
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_jobs_status(job_id: str) -> JSONResponse:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    body = job.public()
+    if body["pdf_ready"]:
+        body["pdf_url"] = f"/api/jobs/{job.id}/pdf"
+    return JSONResponse(body)
+
+
+@app.get("/api/jobs/{job_id}/pdf")
+async def api_jobs_pdf(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.kind not in {"pdf", "bundle"}:
+        raise HTTPException(status_code=400, detail="Job did not request a PDF")
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != "completed" or not job.pdf_path or not Path(job.pdf_path).exists():
+        raise HTTPException(status_code=409, detail=f"PDF not ready (status: {job.status})")
+
+    if job.kind == "bundle":
+        fname = f"audit_bundle_{job.id[:8]}.pdf"
+    else:
+        fname = f"{_safe_filename(job.url or 'audit_report')}.pdf"
     return FileResponse(
-        path=str(pdf_path),
+        path=job.pdf_path,
         media_type="application/pdf",
-        filename=pdf_path.name,
-        headers={"Content-Disposition": f'attachment; filename="{pdf_path.name}"'},
+        filename=fname,
+        headers={"Content-Disposition": f'attachment; filename="{fname}"'},
     )
 
 
+@app.on_event("startup")
+async def _start_pdf_renderer() -> None:
+    pdf_service.warm_up()
+    await asyncio.to_thread(pdf_cache.sweep_orphans, True)
+
+
+@app.on_event("startup")
+async def _bind_psi_client() -> None:
+    # Pooled PSI connections live on this loop; scheduler / sync-wrapper loops get short-lived ones
+    psi_client.bind_loop()
+
+
+@app.on_event("startup")
+async def _start_warmup() -> None:
+    # Not awaited: /health answers while the heavy modules load (APP_WARMUP=background)
+    warmup.start_background()
+
+
+_scheduler = None  # app.services.scheduler once this worker runs the jobs
+
+
+def _start_scheduler() -> None:
+    # Imports SQLAlchemy / APScheduler and needs the DB settings: runs in a thread and never fails startup
+    global _scheduler
+    try:
+        from app.services import scheduler
+        if scheduler.start_scheduler_once():
+            _scheduler = scheduler
+    except Exception as e:
+        logger.warning(f"Scheduler not started: {e}")
+
+
+@app.on_event("startup")
+async def _start_scheduled_jobs() -> None:
+    # Not awaited, like the warm-up (creates missing tables, then scheduled audits + nightly PSI batch)
+    asyncio.get_running_loop().run_in_executor(None, _start_scheduler)
+
+
+@app.on_event("shutdown")
+async def _shutdown_jobs() -> None:
+    if _scheduler is not None:
+        _scheduler.stop_scheduler()
+    await job_queue.stop()
+    await browser_pool.shutdown()
+    await psi_client.aclose()
+    cpu_pool.shutdown()
+    pdf_service.shutdown()
+
+
 # -----------------------------------------------------------------------------
-# Local dev entry (Railway uses Procfile/Start cmd)
+# Local dev entry (Railway runs gunicorn via start.sh / gunicorn.conf.py)
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
     import uvicorn
@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSONB
 from .db import Base
@@ -24,3 +24,27 @@ class Audit(Base):
     created_at = Column(DateTime, server_default=func.now())
     
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+
+class Schedule(Base):
+    __tablename__ = 'schedules'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    url = Column(String(2048), nullable=False)
+    is_active = Column(Boolean, nullable=False, server_default="true")
+    created_at = Column(DateTime, server_default=func.now())
+
+class PSIResult(Base):
+    """Stored PageSpeed Insights run (projected JSON) — read by PDF enrichment, feeds trend history."""
+    __tablename__ = 'psi_results'
+    id = Column(Integer, primary_key=True)
+    url = Column(String(2048), nullable=False)
+    strategy = Column(String(16), nullable=False)
+    audit_id = Column(Integer, ForeignKey('audits.id'), nullable=True)
+    performance_score = Column(Integer, nullable=True)
+    lcp_ms = Column(Integer, nullable=True)
+    data_json = Column(JSONB, nullable=True)
+    fetched_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_psi_results_url_strategy_fetched', 'url', 'strategy', 'fetched_at'),
+    )
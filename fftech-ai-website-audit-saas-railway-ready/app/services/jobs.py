@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+app/services/jobs.py
+Background job queue for audits and PDF reports (in-process, asyncio)
+- submit() returns immediately with a job id; work runs on a bounded worker pool
+- Per-tenant concurrency cap: one tenant cannot occupy every worker
+- Bounded backlog: submit() raises JobQueueFull instead of queueing forever
+- Job state is mirrored to JOB_STORE_DIR so any gunicorn worker in the same
+  container can answer GET /api/jobs/{id}; finished jobs expire after JOB_TTL_SECONDS
+- Store writes run in a thread: every status change is written, progress updates at most
+  once per JOB_PERSIST_INTERVAL_SECONDS; expired store files are swept in a thread too, at most
+  once per JOB_STORE_SWEEP_INTERVAL_SECONDS
+- A queued / running job whose worker process is gone (crash, OOM kill, recycle) is marked
+  failed when the store is read
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("AUDIT_JOB_WORKERS", "4"))
+JOB_PER_TENANT = int(os.getenv("AUDIT_JOB_PER_TENANT", "2"))
+JOB_MAX_PENDING = int(os.getenv("AUDIT_JOB_MAX_PENDING", "200"))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+JOB_STORE_DIR = os.getenv("JOB_STORE_DIR", os.path.join(tempfile.gettempdir(), "fftech_jobs"))
+JOB_PERSIST_INTERVAL_SECONDS = float(os.getenv("JOB_PERSIST_INTERVAL_SECONDS", "1.0"))
+JOB_STORE_SWEEP_INTERVAL_SECONDS = float(os.getenv("JOB_STORE_SWEEP_INTERVAL_SECONDS", "60"))
+
+JobProgress = Callable[[str, int, Optional[dict]], Awaitable[None]]
+JobWork = Callable[["Job", JobProgress], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the backlog is at AUDIT_JOB_MAX_PENDING."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    tenant: str
+    url: str
+    status: str = "queued"  # queued | running | completed | failed
+    stage: str = "queued"
+    progress: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    pdf_path: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    owner_pid: Optional[int] = None  # worker process running it
+
+    @property
+    def finished(self) -> bool:
+        return self.status in {"completed", "failed"}
+
+    def public(self) -> Dict[str, Any]:
+        """API view (no filesystem paths)."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "url": self.url,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "pdf_ready": bool(self.pdf_path) and self.status == "completed",
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class AuditJobQueue:
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        per_tenant: int = JOB_PER_TENANT,
+        max_pending: int = JOB_MAX_PENDING,
+        ttl_seconds: int = JOB_TTL_SECONDS,
+        store_dir: str = JOB_STORE_DIR,
+    ):
+        self.workers = max(1, workers)
+        self.per_tenant = max(1, per_tenant)
+        self.max_pending = max(1, max_pending)
+        self.ttl_seconds = ttl_seconds
+        self.store_dir = Path(store_dir)
+        self._jobs: Dict[str, Job] = {}
+        self._work: Dict[str, JobWork] = {}
+        self._pending: Deque[Job] = deque()
+        self._running: Counter = Counter()
+        self._cond: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+        self._persisted_at: Dict[str, float] = {}
+        self._sweep: Optional[asyncio.Task] = None
+        self._store_sweep: Optional[asyncio.Task] = None
+        self._store_swept_at = 0.0
+
+    # --------------------- lifecycle ---------------------
+    def _ensure_started(self) -> None:
+        if self._tasks and not all(t.done() for t in self._tasks):
+            return
+        self._cond = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info("Job queue started: workers=%s per_tenant=%s", self.workers, self.per_tenant)
+        if self._sweep is None:
+            self._sweep = asyncio.create_task(asyncio.to_thread(self._fail_orphans))
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # --------------------- public API ---------------------
+    async def submit(self, kind: str, tenant: str, url: str, work: JobWork) -> Job:
+        self._cleanup()
+        self._ensure_started()
+        self._schedule_store_sweep()
+        if len(self._pending) >= self.max_pending:
+            raise JobQueueFull(f"Job backlog is full ({self.max_pending} pending)")
+        job = Job(id=uuid.uuid4().hex, kind=kind, tenant=tenant or "anonymous", url=url, owner_pid=os.getpid())
+        self._jobs[job.id] = job
+        self._work[job.id] = work
+        await self._apersist(job)
+        async with self._cond:
+            self._pending.append(job)
+            self._cond.notify_all()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        return self._load(job_id)
+
+    def pdf_path_for(self, job_id: str) -> Path:
+        return self.store_dir / f"{job_id}.pdf"
+
+    # --------------------- scheduling ---------------------
+    async def _next_job(self) -> Job:
+        async with self._cond:
+            while True:
+                for i, job in enumerate(self._pending):
+                    if self._running[job.tenant] < self.per_tenant:
+                        del self._pending[i]
+                        self._running[job.tenant] += 1
+                        return job
+                await self._cond.wait()
+
+    async def _release(self, job: Job) -> None:
+        async with self._cond:
+            self._running[job.tenant] -= 1
+            if self._running[job.tenant] <= 0:
+                del self._running[job.tenant]
+            self._cond.notify_all()
+
+    async def _worker(self, idx: int) -> None:
+        while True:
+            job = await self._next_job()
+            try:
+                await self._execute(job)
+            finally:
+                await self._release(job)
+
+    async def _execute(self, job: Job) -> None:
+        work = self._work.pop(job.id, None)
+        job.status = job.stage = "running"
+        job.started_at = time.time()
+        await self._apersist(job)
+
+        async def progress(status: str, percent: int, payload: Optional[dict] = None) -> None:
+            job.stage = status
+            job.progress = max(job.progress, min(99, int(percent)))
+            await self._apersist(job, throttle=True)
+
+        try:
+            if work is None:
+                raise RuntimeError("Job has no work attached")
+            job.result = await work(job, progress)
+            job.status = job.stage = "completed"
+            job.progress = 100
+        except asyncio.CancelledError:
+            job.status = job.stage = "failed"
+            job.error = "Cancelled"
+            raise
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            job.status = job.stage = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            await asyncio.shield(self._apersist(job))
+            self._persisted_at.pop(job.id, None)
+
+    # --------------------- persistence / TTL ---------------------
+    async def _apersist(self, job: Job, throttle: bool = False) -> None:
+        """Store write off the event loop; throttle=True (progress) skips it within JOB_PERSIST_INTERVAL_SECONDS."""
+        now = time.monotonic()
+        if throttle and now - self._persisted_at.get(job.id, 0.0) < JOB_PERSIST_INTERVAL_SECONDS:
+            return
+        self._persisted_at[job.id] = now
+        # Writes of one job never overlap: its coroutine awaits each one before changing it again
+        await asyncio.to_thread(self._persist, job)
+
+    def _persist(self, job: Job) -> None:
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.store_dir / f"{job.id}.json.tmp"
+            tmp.write_text(json.dumps(asdict(job), ensure_ascii=False, default=str), encoding="utf-8")
+            os.replace(tmp, self.store_dir / f"{job.id}.json")
+        except Exception as e:
+            logger.debug(f"job persist failed ({job.id}): {e}")
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        if not job_id.isalnum():
+            return None
+        path = self.store_dir / f"{job_id}.json"
+        try:
+            job = Job(**json.loads(path.read_text(encoding="utf-8")))
+        except Exception:
+            return None
+        if self._orphaned(job):
+            self._mark_orphan_failed(job)
+        return job
+
+    @staticmethod
+    def _orphaned(job: Job) -> bool:
+        """Unfinished, and the process that owns it is no longer alive (no owner recorded: written by an older release)."""
+        if job.finished or job.owner_pid == os.getpid():
+            return False
+        if job.owner_pid is None:
+            return True
+        try:
+            os.kill(job.owner_pid, 0)
+        except ProcessLookupError:
+            return True
+        except OSError:  # exists, owned by someone else
+            return False
+        return False
+
+    def _mark_orphan_failed(self, job: Job) -> None:
+        job.status = job.stage = "failed"
+        job.error = "Worker stopped before the job finished; please resubmit"
+        job.finished_at = time.time()
+        self._persist(job)
+
+    def _fail_orphans(self) -> int:
+        """Startup sweep of the shared store (blocking: run in a thread)."""
+        failed = 0
+        try:
+            for path in self.store_dir.glob("*.json"):
+                if path.stem in self._jobs:
+                    continue
+                try:
+                    job = Job(**json.loads(path.read_text(encoding="utf-8")))
+                except Exception:
+                    continue
+                if self._orphaned(job):
+                    self._mark_orphan_failed(job)
+                    failed += 1
+        except Exception as e:
+            logger.debug(f"job store sweep failed: {e}")
+        if failed:
+            logger.warning("Marked %d orphaned job(s) as failed", failed)
+        return failed
+
+    def _cleanup(self) -> None:
+        """Drop expired jobs from memory (their store files go in _sweep_store)."""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at and (now - job.finished_at) > self.ttl_seconds:
+                self._jobs.pop(job_id, None)
+
+    def _schedule_store_sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._store_swept_at < JOB_STORE_SWEEP_INTERVAL_SECONDS:
+            return
+        if self._store_sweep is not None and not self._store_sweep.done():
+            return
+        self._store_swept_at = now
+        self._store_sweep = asyncio.create_task(asyncio.to_thread(self._sweep_store, frozenset(self._jobs)))
+
+    def _sweep_store(self, live: frozenset) -> None:
+        """Delete expired files of the shared store (blocking: run in a thread); `live` = ids still in memory."""
+        now = time.time()
+        try:
+            for path in self.store_dir.glob("*"):
+                if (now - path.stat().st_mtime) > self.ttl_seconds and path.stem not in live:
+                    if path.is_dir():
+                        shutil.rmtree(path, ignore_errors=True)
+                    else:
+                        path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"job store cleanup failed: {e}")
+
+
+job_queue = AuditJobQueue()
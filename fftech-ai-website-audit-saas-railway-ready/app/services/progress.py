@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+app/services/progress.py
+Progress channel shared by /ws and SSE
+- Coalesces intermediate updates: at most one frame per PROGRESS_MIN_INTERVAL_MS, newest wins
+- Terminal frames (completed / error) flush immediately and drop any stale pending update
+- The runner's own "completed" progress event (which carries the full result) is swallowed;
+  the endpoint sends the result exactly once in its final frame
+- orjson serialization (stdlib json fallback)
+- Optional RFC 6902 JSON-patch deltas against the previous result for the same URL
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    import orjson
+except Exception:  # optional: stdlib json fallback
+    orjson = None
+
+PROGRESS_MIN_INTERVAL_MS = int(os.getenv("PROGRESS_MIN_INTERVAL_MS", "250"))
+
+TERMINAL_STATUSES = {"completed", "error", "failed"}
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+# ------------------------------------------------------------
+# JSON patch (RFC 6902 subset: add / remove / replace)
+# ------------------------------------------------------------
+def _ptr(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def json_patch(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Minimal patch turning `old` into `new`; lists of different length are replaced whole."""
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[Dict[str, Any]] = []
+        for k in old:
+            if k not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_ptr(k)}"})
+        for k, v in new.items():
+            if k not in old:
+                ops.append({"op": "add", "path": f"{path}/{_ptr(k)}", "value": v})
+            else:
+                ops.extend(json_patch(old[k], v, f"{path}/{_ptr(k)}"))
+        return ops
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            ops.extend(json_patch(a, b, f"{path}/{i}"))
+        return ops
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def result_frame(
+    result: Dict[str, Any],
+    previous: Optional[Dict[str, Any]] = None,
+    delta: bool = False,
+) -> Dict[str, Any]:
+    """
+    Final "completed" frame. With delta=True and a previous result for the same URL,
+    send {"patch": [...]} instead of {"result": {...}} when the patch is smaller.
+    """
+    frame: Dict[str, Any] = {"status": "completed", "progress": 100}
+    if delta and previous is not None:
+        patch = json_patch(previous, result)
+        if len(dumps(patch)) < len(dumps(result)):
+            frame["patch"] = patch
+            return frame
+    frame["result"] = result
+    return frame
+
+
+# ------------------------------------------------------------
+# Channel
+# ------------------------------------------------------------
+class ProgressChannel:
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        min_interval_ms: int = PROGRESS_MIN_INTERVAL_MS,
+    ):
+        self._send = send
+        self._interval = max(0, min_interval_ms) / 1000.0
+        self._last_sent = 0.0
+        self._pending: Optional[Dict[str, Any]] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def progress(self, status: str, percent: int, payload: Optional[dict] = None) -> None:
+        """Runner-compatible progress callback (status, percent, payload)."""
+        if self._closed or status == "completed":
+            # runner's "completed" carries the whole result; the final frame sends it once
+            return
+        frame = {"status": status, "progress": int(percent), "payload": payload}
+        if status in TERMINAL_STATUSES:
+            await self.final(frame)
+            return
+        wait = self._interval - (time.monotonic() - self._last_sent)
+        if wait <= 0 and self._flush_task is None:
+            await self._emit(frame)
+            return
+        self._pending = frame  # newest wins
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._delayed_flush(max(0.0, wait)))
+
+    async def final(self, frame: Dict[str, Any]) -> None:
+        """Terminal frame: drop stale pending progress and send immediately."""
+        self._cancel_flush()
+        self._pending = None
+        if self._closed:
+            return
+        self._closed = True
+        await self._send(frame)
+
+    def close(self) -> None:
+        self._cancel_flush()
+        self._closed = True
+
+    async def _delayed_flush(self, wait: float) -> None:
+        try:
+            await asyncio.sleep(wait)
+            frame, self._pending = self._pending, None
+            self._flush_task = None
+            if frame is not None and not self._closed:
+                await self._emit(frame)
+        except asyncio.CancelledError:
+            pass
+
+    async def _emit(self, frame: Dict[str, Any]) -> None:
+        self._last_sent = time.monotonic()
+        await self._send(frame)
+
+    def _cancel_flush(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+app/services/psi_batch.py
+Persisted PageSpeed Insights results + overnight batch prefetch
+- store_psi / load_fresh_psi: PSIResult rows (projected PSI JSON) with a freshness window (PSI_FRESHNESS_HOURS)
+- PDF enrichment reads a fresh stored result first and only calls the API on a miss (then writes it back);
+  for a stored Audit row the result used is linked to it (PSIResult.audit_id, see attach_psi)
+- run_psi_batch(urls): prefetch lab + field data for many URLs within the quota (shared PSIClient limiter),
+  skipping URLs that are still fresh; stops early once the daily quota is used up
+- job_psi_batch(): APScheduler entry — every active Schedule URL, run nightly
+- psi_history(url): per-day overall / performance trend for the PDF (no API calls)
+- No database configured → every helper degrades to a no-op / None
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as _dt
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.audit.psi import psi_client
+
+logger = logging.getLogger(__name__)
+
+PSI_FRESHNESS_HOURS = float(os.getenv("PSI_FRESHNESS_HOURS", "24"))
+PSI_BATCH_CONCURRENCY = int(os.getenv("PSI_BATCH_CONCURRENCY", "4"))
+PSI_BATCH_STRATEGIES = [s.strip() for s in os.getenv("PSI_BATCH_STRATEGIES", "mobile,desktop").split(",") if s.strip()]
+PSI_HISTORY_POINTS = int(os.getenv("PSI_HISTORY_POINTS", "12"))
+
+_db_unavailable = False
+
+
+def _session():
+    """SessionLocal() or None when the database is not configured (local dev / tests)."""
+    global _db_unavailable
+    if _db_unavailable:
+        return None
+    try:
+        from app.db import SessionLocal
+        return SessionLocal()
+    except Exception as e:
+        _db_unavailable = True
+        logger.info(f"PSI persistence disabled (no database): {e}")
+        return None
+
+
+def _perf_score(data: Dict[str, Any]) -> Optional[int]:
+    try:
+        score = data["lighthouseResult"]["categories"]["performance"]["score"]
+        return int(round(float(score) * 100)) if score is not None else None
+    except Exception:
+        return None
+
+
+def _lcp_ms(data: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(data["lighthouseResult"]["audits"]["largest-contentful-paint"]["numericValue"])
+    except Exception:
+        return None
+
+
+# ------------------------------------------------------------
+# Persistence
+# ------------------------------------------------------------
+def store_psi(url: str, strategy: str, data: Dict[str, Any], audit_id: Optional[int] = None) -> bool:
+    db = _session()
+    if db is None or not data:
+        return False
+    try:
+        from app.models import PSIResult
+        db.add(PSIResult(
+            url=url,
+            strategy=strategy,
+            audit_id=audit_id,
+            performance_score=_perf_score(data),
+            lcp_ms=_lcp_ms(data),
+            data_json=data,
+            fetched_at=_dt.datetime.utcnow(),
+        ))
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.debug(f"store_psi failed ({url}, {strategy}): {e}")
+        return False
+    finally:
+        db.close()
+
+
+def load_fresh_psi(url: str, strategy: str, max_age_hours: float = PSI_FRESHNESS_HOURS) -> Optional[Dict[str, Any]]:
+    """Newest stored PSI JSON for (url, strategy) if younger than max_age_hours."""
+    db = _session()
+    if db is None:
+        return None
+    try:
+        from app.models import PSIResult
+        cutoff = _dt.datetime.utcnow() - _dt.timedelta(hours=max_age_hours)
+        row = (
+            db.query(PSIResult)
+            .filter(PSIResult.url == url, PSIResult.strategy == strategy, PSIResult.fetched_at >= cutoff)
+            .order_by(PSIResult.fetched_at.desc())
+            .first()
+        )
+        return row.data_json if row is not None else None
+    except Exception as e:
+        logger.debug(f"load_fresh_psi failed ({url}, {strategy}): {e}")
+        return None
+    finally:
+        db.close()
+
+
+def attach_psi(url: str, strategy: str, audit_id: int, max_age_hours: float = PSI_FRESHNESS_HOURS) -> bool:
+    """Link the newest fresh stored result for (url, strategy) to audit_id (copied if another audit owns it)."""
+    db = _session()
+    if db is None:
+        return False
+    try:
+        from app.models import PSIResult
+        cutoff = _dt.datetime.utcnow() - _dt.timedelta(hours=max_age_hours)
+        row = (
+            db.query(PSIResult)
+            .filter(PSIResult.url == url, PSIResult.strategy == strategy, PSIResult.fetched_at >= cutoff)
+            .order_by(PSIResult.fetched_at.desc())
+            .first()
+        )
+        if row is None:
+            return False
+        if row.audit_id is None:
+            row.audit_id = audit_id
+        elif row.audit_id != audit_id:
+            db.add(PSIResult(
+                url=url,
+                strategy=strategy,
+                audit_id=audit_id,
+                performance_score=row.performance_score,
+                lcp_ms=row.lcp_ms,
+                data_json=row.data_json,
+                fetched_at=row.fetched_at,
+            ))
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.debug(f"attach_psi failed ({url}, {strategy}): {e}")
+        return False
+    finally:
+        db.close()
+
+
+def psi_history(url: str, strategy: str = "mobile", points: int = PSI_HISTORY_POINTS) -> List[Dict[str, Any]]:
+    """[{dt, overall, performance}] oldest → newest, one point per day (pdf_report trend table format)."""
+    db = _session()
+    if db is None:
+        return []
+    try:
+        from app.models import Audit, PSIResult
+        by_day: Dict[str, Dict[str, Any]] = {}
+        psi_rows = (
+            db.query(PSIResult.fetched_at, PSIResult.performance_score)
+            .filter(PSIResult.url == url, PSIResult.strategy == strategy)
+            .order_by(PSIResult.fetched_at.desc())
+            .limit(points * 4)
+            .all()
+        )
+        for fetched_at, perf in psi_rows:
+            day = fetched_at.date().isoformat()
+            by_day.setdefault(day, {"dt": day}).setdefault("performance", perf)
+        audit_rows = (
+            db.query(Audit.created_at, Audit.score)
+            .filter(Audit.url == url, Audit.score.isnot(None))
+            .order_by(Audit.created_at.desc())
+            .limit(points * 4)
+            .all()
+        )
+        for created_at, score in audit_rows:
+            if created_at is None:
+                continue
+            day = created_at.date().isoformat()
+            by_day.setdefault(day, {"dt": day}).setdefault("overall", score)
+        return [by_day[d] for d in sorted(by_day)][-points:]
+    except Exception as e:
+        logger.debug(f"psi_history failed ({url}): {e}")
+        return []
+    finally:
+        db.close()
+
+
+# ------------------------------------------------------------
+# Read-through (interactive PDF path)
+# ------------------------------------------------------------
+async def get_psi(url: str, strategy: str, audit_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Fresh stored result, else live API call (written back for the next render); linked to audit_id if given."""
+    stored = await asyncio.to_thread(load_fresh_psi, url, strategy)
+    if stored:
+        if audit_id is not None:
+            await asyncio.to_thread(attach_psi, url, strategy, audit_id)
+        return stored
+    data = await psi_client.fetch(url, strategy)
+    if data:
+        await asyncio.to_thread(store_psi, url, strategy, data, audit_id)
+    return data
+
+
+# ------------------------------------------------------------
+# Batch prefetch
+# ------------------------------------------------------------
+async def run_psi_batch(
+    urls: Iterable[str],
+    strategies: Iterable[str] = tuple(PSI_BATCH_STRATEGIES),
+    concurrency: int = PSI_BATCH_CONCURRENCY,
+) -> Dict[str, int]:
+    """Prefetch PSI for every (url, strategy) that has no fresh stored result; paced by the PSI quota limiter."""
+    stats = {"fetched": 0, "fresh": 0, "failed": 0, "skipped_quota": 0}
+    if not psi_client.api_key:
+        logger.info("PSI batch skipped: PSI_API_KEY not set")
+        return stats
+    work = [(u, s) for u in dict.fromkeys(u.strip() for u in urls if u and u.strip()) for s in strategies]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(url: str, strategy: str) -> None:
+        async with sem:
+            if psi_client.daily.used >= psi_client.daily.limit:
+                stats["skipped_quota"] += 1
+                return
+            if await asyncio.to_thread(load_fresh_psi, url, strategy):
+                stats["fresh"] += 1
+                return
+            data = await psi_client.fetch(url, strategy)
+            if data and await asyncio.to_thread(store_psi, url, strategy, data):
+                stats["fetched"] += 1
+            else:
+                stats["failed"] += 1
+
+    await asyncio.gather(*(one(u, s) for u, s in work))
+    logger.info(f"PSI batch done: {stats}")
+    return stats
+
+
+def _scheduled_urls() -> List[str]:
+    db = _session()
+    if db is None:
+        return []
+    try:
+        from app.models import Schedule
+        return [row.url for row in db.query(Schedule.url).filter(Schedule.is_active.is_(True)).all()]
+    finally:
+        db.close()
+
+
+def job_psi_batch() -> Dict[str, int]:
+    """APScheduler job (runs in the scheduler's worker thread, so it owns its event loop)."""
+    urls = _scheduled_urls()
+    if not urls:
+        return {}
+    return asyncio.run(run_psi_batch(urls))
@@ -1,36 +1,204 @@
 
+import asyncio
+import logging
+import os
+import re
+import tempfile
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy.orm import Session
-from ..db import SessionLocal
+from ..db import SessionLocal, init_db
 from ..models import Schedule, Audit, User
-from ..audit.runner import run_audit
-from ..audit.report import build_pdf
-from ..audit.record import export_xlsx
+from ..audit import pdf_service
+from ..audit.runner import WebsiteAuditRunner, aprepare_audit_data
 from .email_reports import send_email_with_attachments
+from .psi_batch import job_psi_batch
+
+logger = logging.getLogger(__name__)
+
+# Audits run concurrently on the loop, PDFs render across pdf_service.BatchRenderer (PDF_BATCH_WORKERS processes)
+SCHEDULE_AUDIT_CONCURRENCY = int(os.getenv('SCHEDULE_AUDIT_CONCURRENCY', '4'))
+# Users with at least this many scheduled sites get one agency bundle instead of one PDF per site (0 = never)
+SCHEDULE_BUNDLE_MIN_SITES = int(os.getenv('SCHEDULE_BUNDLE_MIN_SITES', '3'))
+# Started from the web app's startup hook; only the worker holding SCHEDULER_LOCK_PATH runs the jobs
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', '1').lower() in {'1', 'true', 'yes', 'on'}
+SCHEDULER_LOCK_PATH = os.getenv('SCHEDULER_LOCK_PATH', os.path.join(tempfile.gettempdir(), 'fftech_scheduler.lock'))
 
 scheduler = BackgroundScheduler()
+_lock_file = None
 
-def job_run_schedules():
+
+def _pdf_name(text: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', text).strip('_')[:80] or 'report'
+
+
+def _load_schedules() -> List[Tuple[int, Optional[int], str]]:
+    db: Session = SessionLocal()
+    try:
+        return [(sc.id, sc.user_id, sc.url) for sc in db.query(Schedule).filter(Schedule.is_active == True).all()]
+    finally:
+        db.close()
+
+
+def _store_audit(user_id: Optional[int], url: str, result: Dict[str, Any]) -> Optional[int]:
     db: Session = SessionLocal()
     try:
-        for sc in db.query(Schedule).filter(Schedule.is_active == True).all():
-            result = run_audit(sc.url)
-            audit = Audit(user_id=sc.user_id, url=sc.url, result_json=result)
-            db.add(audit)
-            db.commit()
-            db.refresh(audit)
-            pdf_path = f"/tmp/audit_{audit.id}.pdf"
-            build_pdf(result, pdf_path)
-            xlsx_path = export_xlsx(result)
-            user = db.query(User).filter(User.id==sc.user_id).first()
-            if user and user.plan != 'free':
-                try:
-                    send_email_with_attachments(user.email, f"{result.get('grade','D')} - Website Audit Report", f"<p>Hi,</p><p>Your scheduled audit for <b>{sc.url}</b> is ready.</p>", [pdf_path, xlsx_path])
-                except Exception:
-                    pass
+        audit = Audit(user_id=user_id, url=url, score=result.get('overall_score'), grade=result.get('grade'), result_json=result)
+        db.add(audit)
+        db.commit()
+        db.refresh(audit)
+        return audit.id
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"storing scheduled audit failed ({url}): {e}")
+        return None
     finally:
         db.close()
 
+
+def _recipient(user_id: Optional[int]) -> Optional[str]:
+    if user_id is None:
+        return None
+    db: Session = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        # Paid plans only (when the user model carries a plan)
+        if user and getattr(user, 'plan', None) != 'free':
+            return user.email
+        return None
+    finally:
+        db.close()
+
+
+def _deliver(to_email: str, subject: str, html_body: str, pdf: bytes, filename: str) -> None:
+    path = os.path.join(tempfile.gettempdir(), filename)
+    with open(path, 'wb') as f:
+        f.write(pdf)
+    try:
+        send_email_with_attachments(to_email, subject, html_body, [path])
+    except Exception as e:
+        logger.warning(f"scheduled report email to {to_email} failed: {e}")
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def run_schedules() -> Dict[str, int]:
+    """Audit every active schedule, then render all reports (per site or bundled per user) as one batch."""
+    schedules = await asyncio.to_thread(_load_schedules)
+    stats = {'audited': 0, 'failed': 0, 'reports': 0, 'bundles': 0}
+    if not schedules:
+        return stats
+
+    runner = WebsiteAuditRunner()
+    sem = asyncio.Semaphore(max(1, SCHEDULE_AUDIT_CONCURRENCY))
+
+    async def audit_one(user_id: Optional[int], url: str) -> Optional[Tuple[Optional[int], Dict[str, Any]]]:
+        async with sem:
+            try:
+                result = await runner.run(url)
+            except Exception as e:
+                logger.warning(f"scheduled audit failed ({url}): {e}")
+                return None
+            if result.get('error'):
+                logger.warning(f"scheduled audit failed ({url}): {result['error']}")
+                return None
+            audit_id = await asyncio.to_thread(_store_audit, user_id, url, result)
+            return audit_id, await aprepare_audit_data(result, audit_id=audit_id)
+
+    prepared = await asyncio.gather(*(audit_one(uid, url) for _, uid, url in schedules))
+    by_user: Dict[Optional[int], List[Tuple[Optional[int], Dict[str, Any]]]] = defaultdict(list)
+    for (_, uid, _), item in zip(schedules, prepared):
+        if item is None:
+            stats['failed'] += 1
+            continue
+        stats['audited'] += 1
+        by_user[uid].append(item)
+
+    async def deliver_user(batch: pdf_service.BatchRenderer, uid: Optional[int], items: List[Tuple[Optional[int], Dict[str, Any]]]) -> None:
+        to_email = await asyncio.to_thread(_recipient, uid)
+        if not to_email:
+            return  # audits are stored; nobody to send a PDF to
+        audits = [audit_data for _, audit_data in items]
+        if SCHEDULE_BUNDLE_MIN_SITES and len(audits) >= SCHEDULE_BUNDLE_MIN_SITES:
+            pdf = await batch.render_bundle(audits, title=f"Website Audit Portfolio ({len(audits)} sites)")
+            stats['bundles'] += 1
+            body = "<p>Hi,</p><p>Your scheduled audits for " + ", ".join(f"<b>{a['audited_url']}</b>" for a in audits) + " are ready.</p>"
+            await asyncio.to_thread(_deliver, to_email, f"Website Audit Portfolio - {len(audits)} sites", body, pdf,
+                                    f"audit_bundle_user_{uid}.pdf")
+            return
+
+        async def single(audit_id: Optional[int], audit_data: Dict[str, Any]) -> None:
+            try:
+                pdf = await batch.render(audit_data)
+            except Exception as e:
+                logger.warning(f"scheduled PDF failed ({audit_data.get('audited_url')}): {e}")
+                return
+            stats['reports'] += 1
+            url = audit_data.get('audited_url', '')
+            await asyncio.to_thread(
+                _deliver, to_email, f"{audit_data.get('grade', 'D')} - Website Audit Report",
+                f"<p>Hi,</p><p>Your scheduled audit for <b>{url}</b> is ready.</p>", pdf,
+                f"audit_{audit_id or _pdf_name(url)}.pdf",
+            )
+
+        await asyncio.gather(*(single(audit_id, a) for audit_id, a in items))
+
+    async with pdf_service.BatchRenderer() as batch:
+        results = await asyncio.gather(*(deliver_user(batch, uid, items) for uid, items in by_user.items()),
+                                       return_exceptions=True)
+    for r in results:
+        if isinstance(r, BaseException):
+            logger.warning(f"scheduled report delivery failed: {r}")
+    logger.info(f"Scheduled audits done: {stats}")
+    return stats
+
+
+def job_run_schedules():
+    """APScheduler job (runs in the scheduler's worker thread, so it owns its event loop)."""
+    return asyncio.run(run_schedules())
+
 def start_scheduler():
     scheduler.add_job(job_run_schedules, 'interval', hours=24, id='daily_audits', replace_existing=True)
+    # Nightly PSI prefetch so interactive PDFs read stored results instead of spending quota
+    scheduler.add_job(job_psi_batch, 'cron', hour=int(os.getenv('PSI_BATCH_HOUR', '2')), id='psi_batch', replace_existing=True)
     scheduler.start()
+
+
+def _acquire_lock() -> bool:
+    """Non-blocking exclusive flock, held for the life of the process (released when the worker exits)."""
+    global _lock_file
+    try:
+        import fcntl
+    except ImportError:  # no flock (Windows dev): single process
+        return True
+    f = open(SCHEDULER_LOCK_PATH, 'a')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _lock_file = f
+    return True
+
+
+def start_scheduler_once() -> bool:
+    """Create missing tables and start the jobs in this process, unless disabled or another worker runs them."""
+    if not SCHEDULER_ENABLED or scheduler.running:
+        return False
+    if not _acquire_lock():
+        logger.info("Scheduler already running in another worker")
+        return False
+    init_db()
+    start_scheduler()
+    logger.info(f"Scheduler started (pid {os.getpid()}): {[job.id for job in scheduler.get_jobs()]}")
+    return True
+
+
+def stop_scheduler() -> None:
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
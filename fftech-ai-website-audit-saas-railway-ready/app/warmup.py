@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+app/warmup.py
+Startup-time policy for the web process
+- Importing app.main must stay light (fastapi + app modules): HTTP clients, parsers and the PDF stack
+  below are imported on first use, so /health answers right after a cold start / redeploy
+- HEAVY_MODULES is the one list of those modules: scripts.import_budget fails when app.main imports one
+  eagerly, gunicorn.conf.py preloads them in the master in APP_WARMUP=preload mode
+- APP_WARMUP=background (default): each worker imports them in a daemon thread once it is serving, so the
+  first audit / PDF does not pay the import either; =preload: gunicorn master before fork (shared
+  copy-on-write, slower to first /health); =off: purely on first use
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+APP_WARMUP = os.getenv("APP_WARMUP", "background").strip().lower()
+
+# Slowest imports on the audit / PDF paths (in the order they are first needed)
+HEAVY_MODULES = (
+    "httpx",
+    "requests",
+    "bs4",
+    "lxml.html",
+    "app.audit.crawler",
+    "PIL.Image",
+    "reportlab.platypus",
+    "reportlab.graphics.shapes",
+    "app.audit.pdf_report",
+)
+
+_thread: Optional[threading.Thread] = None
+
+
+def import_modules(names: Iterable[str] = HEAVY_MODULES) -> Dict[str, float]:
+    """Import each module (skipping missing optional deps); ms per module."""
+    took: Dict[str, float] = {}
+    for name in names:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:  # optional deps must never break startup
+            logger.debug(f"warm-up import skipped for {name}: {e}")
+            continue
+        took[name] = round((time.perf_counter() - t0) * 1000, 1)
+    return took
+
+
+def _run() -> None:
+    t0 = time.perf_counter()
+    took = import_modules()
+    logger.info("Warm-up imported %d modules in %.0fms", len(took), (time.perf_counter() - t0) * 1000)
+
+
+def start_background() -> None:
+    """Start the background warm-up once per process (no-op unless APP_WARMUP=background)."""
+    global _thread
+    if APP_WARMUP != "background" or _thread is not None:
+        return
+    _thread = threading.Thread(target=_run, name="app-warmup", daemon=True)
+    _thread.start()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+gunicorn.conf.py
+Production launcher config (used by start.sh)
+- N uvicorn workers under gunicorn (WEB_CONCURRENCY, default: CPU count)
+- preload_app: the (light) app is imported once in the master; APP_WARMUP=preload adds the heavy PDF/parsing libs
+- max_requests (+ jitter): workers are recycled to contain memory growth in PDF rendering
+- graceful_timeout: on SIGTERM (Railway redeploy) workers stop accepting and let in-flight audits finish
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name, "")
+    if not raw:
+        return default
+    return raw.lower() in {"1", "true", "yes", "on"}
+
+
+# -----------------------------------------------------------------------------
+# Server socket / workers
+# -----------------------------------------------------------------------------
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+worker_class = "uvicorn.workers.UvicornWorker"  # ASGI (required for WebSockets)
+workers = max(1, _env_int("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Inherited by workers: app.audit.cpu_pool sizes its per-worker process pool from it
+os.environ.setdefault("WEB_CONCURRENCY", str(workers))
+
+# -----------------------------------------------------------------------------
+# Preload + recycling
+# -----------------------------------------------------------------------------
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 500)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 50)
+
+# -----------------------------------------------------------------------------
+# Timeouts / graceful drain
+# -----------------------------------------------------------------------------
+# A full audit + PSI + PDF can take well over a minute; the worker heartbeat
+# timeout must not kill a busy-but-healthy worker.
+timeout = _env_int("GUNICORN_TIMEOUT", 180)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 120)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# -----------------------------------------------------------------------------
+# Logging (Railway-visible)
+# -----------------------------------------------------------------------------
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# Heavy modules (app.warmup.HEAVY_MODULES) load lazily; with APP_WARMUP=preload the
+# master imports them before fork so every worker shares the pages copy-on-write
+# (more memory-efficient, but the first /health waits for them).
+def on_starting(server):
+    if not preload_app:
+        return
+    from app import warmup
+
+    if warmup.APP_WARMUP != "preload":
+        return
+    took = warmup.import_modules()
+    server.log.info("Preloaded %d modules in master (%.0fms)", len(took), sum(took.values()))
+
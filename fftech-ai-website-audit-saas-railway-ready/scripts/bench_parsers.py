@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+scripts/bench_parsers.py
+Parse-time benchmark + golden-corpus parity check for app.audit.parsers backends
+
+Usage (from the project root):
+    python -m scripts.bench_parsers                 # built-in corpus
+    python -m scripts.bench_parsers page1.html ...  # add saved pages to the corpus
+
+- Reports ms per MB for every installed backend
+- Fails (exit 1) when a backend's extracted PageFeatures differ from html.parser on any page
+- Fails (exit 1) when the fields / SEO score derived from PageFeatures differ from the per-field find()
+  extractors they replaced (_legacy_* below, kept as the reference) on any page
+"""
+import re
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from app.audit.features import extract_features
+from app.audit.parsers import FALLBACK_BACKEND, available_backends, parse_html
+from app.audit.runner import _canonical_url, _hostname, _link_counts, _truncate
+from app.audit.seo import calculate_seo_score
+
+REPEAT = 5
+
+
+def _golden_corpus():
+    head = (
+        '<!doctype html><html lang="en"><head><meta charset="utf-8">'
+        '<title>Golden Page {i}</title>'
+        '<meta name="description" content="Description for page {i} with enough words to count">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        '<link rel="canonical" href="/page/{i}"><link rel="stylesheet" href="/s{i}.css">'
+        '<script src="/app.js"></script>'
+        '<script type="application/ld+json">{{"@type": "WebPage", "name": "p{i}"}}</script>'
+        "</head><body>"
+    )
+    block = (
+        '<section><h2>Section {j}</h2><h3>Sub</h3><p>Paragraph &amp; text <b>bold</b></p>'
+        '<img src="/i{j}.png" alt="img {j}"><img src="/n{j}.png">'
+        '<a href="/internal/{j}">in</a> <a href="https://ext{j}.example.org/" rel="nofollow noopener">out</a>'
+        '<a href="#top">skip</a><ul><li>a</li><li>b</li></ul></section>'
+    )
+    pages = []
+    for i, sections in enumerate((1, 20, 200, 2000)):
+        body = "<h1>Heading</h1>" + "".join(block.format(j=j) for j in range(sections))
+        pages.append((f"golden-{i}", head.format(i=i) + body + "</body></html>"))
+    # Loosely-formed but common markup: unclosed <p>/<li>, uppercase tags, unquoted attrs
+    pages.append((
+        "sloppy",
+        "<HTML><HEAD><TITLE>Sloppy</TITLE><META NAME=Description CONTENT='x y z'></HEAD>"
+        "<BODY><H1>One<P>para<P>para<UL><LI>a<LI>b</UL><IMG SRC=a.png ALT=''>"
+        "<A HREF=/x>x</A><A HREF='https://o.example/'>o</A></BODY></HTML>",
+    ))
+    # Matching rules the single pass must keep (canonical without href, meta name case / spacing)
+    pages.append((
+        "edge-canonical",
+        '<html><head><title>Edge canonical page title</title><link rel="canonical">'
+        '<link rel="Canonical" href="/second"><link rel="canonical alternate" href="/third">'
+        '<meta name="Description" content="Upper-case name description content for the page">'
+        '<meta name="VIEWPORT" content="width=device-width"></head><body><h1>x</h1></body></html>',
+    ))
+    pages.append((
+        "edge-meta",
+        '<html><head><title>Edge meta</title><meta name=" description" content="leading space">'
+        '<meta name="description" content="   "><meta name="description" content="second, ignored">'
+        '<meta name="robots" content="NOINDEX"><base href="https://edge.example/"></head>'
+        '<body><a href="https://edge.example/a" rel="nofollow">a</a><a>no href</a></body></html>',
+    ))
+    return pages
+
+
+def _features_of(html, backend):
+    return extract_features(html, parse_html(html, backend)).__getstate__()
+
+
+# ------------------------------------------------------------
+# Reference: the per-field extractors PageFeatures replaced
+# ------------------------------------------------------------
+def _legacy_runner_fields(html, soup, base_url):
+    t = soup.title.string if soup.title else ""
+    tag = soup.find("meta", attrs={"name": re.compile(r"^description$", re.I)})
+    canonical = ""
+    link = soup.find("link", rel=re.compile(r"canonical", re.I))
+    if link and link.get("href"):
+        canonical = urljoin(base_url, link.get("href"))
+    else:
+        m = re.search(r'<link[^>]+rel=["\']canonical["\'][^>]+href=["\']([^"\']+)["\']', html, flags=re.I)
+        if m:
+            canonical = urljoin(base_url, m.group(1))
+    imgs = soup.find_all("img")
+    base_host = _hostname(base_url)
+    internal = external = 0
+    for a in soup.find_all("a"):
+        href = (a.get("href") or "").strip()
+        if not href or href.startswith(("#", "mailto:", "javascript:")):
+            continue
+        host = _hostname(urljoin(base_url, href))
+        if not host:
+            continue
+        if host == base_host:
+            internal += 1
+        else:
+            external += 1
+    return {
+        "title": _truncate((t or "").strip(), 200),
+        "meta_description_present": bool(tag and (tag.get("content") or "").strip()),
+        "canonical": canonical,
+        "h1": len(soup.find_all("h1")),
+        "images": (len(imgs), sum(1 for im in imgs if not (im.get("alt") or "").strip())),
+        "links": {"internal": internal, "external": external, "total": internal + external},
+        "resources": (len(soup.find_all("script")), len(soup.find_all("link", rel=re.compile(r"stylesheet", re.I)))),
+    }
+
+
+def _runner_fields(html, soup, base_url):
+    f = extract_features(html, soup)
+    return {
+        "title": _truncate((f.title or "").strip(), 200),
+        "meta_description_present": f.meta_description_present,
+        "canonical": _canonical_url(f, base_url),
+        "h1": f.h1,
+        "images": (f.images_total, f.images_missing_alt),
+        "links": _link_counts(f, base_url),
+        "resources": (f.scripts, f.stylesheets),
+    }
+
+
+def _legacy_seo_score(soup):
+    def s(value):
+        if value is None:
+            return ""
+        if isinstance(value, list):
+            return " ".join(str(v) for v in value).strip().lower()
+        return str(value).strip().lower()
+
+    score = 0
+    title = s(soup.title.string if soup.title else "")
+    if title:
+        score += 20 if 20 <= len(title) <= 70 else 15
+    desc_tag = soup.find("meta", attrs={"name": "description"})
+    desc = s(desc_tag.get("content")) if desc_tag else ""
+    if desc:
+        score += 15 if 50 <= len(desc) <= 180 else 12
+    h1 = len(soup.find_all("h1"))
+    score += 10 if 1 <= h1 <= 2 else (5 if h1 > 2 else 0)
+    score += min(6, len(soup.find_all("h2")) * 2) + min(4, len(soup.find_all("h3")))
+    imgs = soup.find_all("img")
+    if imgs:
+        ratio = sum(1 for img in imgs if s(img.get("alt"))) / len(imgs)
+        score += 15 if ratio >= 0.7 else (10 if ratio >= 0.4 else 5)
+    else:
+        score += 8
+    viewport = soup.find("meta", attrs={"name": "viewport"})
+    if viewport and "width=device-width" in s(viewport.get("content")):
+        score += 5
+    canonical = soup.find("link", rel="canonical")
+    score += 5 if canonical and canonical.get("href") else 2
+    base_tag = soup.find("base")
+    base_url = base_tag.get("href") if base_tag else ""
+    base_host = urlparse(base_url).netloc
+    internal = nofollow = 0
+    for a in soup.find_all("a", href=True):
+        host = urlparse(urljoin(base_url, a["href"].strip())).netloc
+        if not host or host == base_host:
+            internal += 1
+            if "nofollow" in s(a.get("rel")).split():
+                nofollow += 1
+    score += 6 if internal >= 8 else (4 if internal >= 3 else 2)
+    score += 4 if nofollow == 0 else max(0, 4 - nofollow)
+    robots = soup.find("meta", attrs={"name": "robots"})
+    score += 3 if "noindex" not in s(robots.get("content") if robots else "") else -5
+    return max(0, min(100, score))
+
+
+def legacy_mismatches(corpus, backend=FALLBACK_BACKEND, base_url="https://golden.example/"):
+    """Names of pages where PageFeatures-derived output differs from the legacy extractors."""
+    bad = []
+    for name, html in corpus:
+        soup = parse_html(html, backend)
+        if (_runner_fields(html, soup, base_url) != _legacy_runner_fields(html, soup, base_url)
+                or calculate_seo_score(soup) != _legacy_seo_score(soup)):
+            bad.append(name)
+    return bad
+
+
+def main(argv):
+    corpus = _golden_corpus() + [(p, Path(p).read_text(encoding="utf-8", errors="replace")) for p in argv]
+    backends = available_backends()
+    total_mb = sum(len(html.encode("utf-8")) for _, html in corpus) / 1_000_000
+    print(f"corpus: {len(corpus)} pages, {total_mb:.2f} MB; backends: {', '.join(backends)}")
+
+    reference = {name: _features_of(html, FALLBACK_BACKEND) for name, html in corpus}
+    failed = False
+    for backend in backends:
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            for _, html in corpus:
+                parse_html(html, backend)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / REPEAT
+        mismatches = [name for name, html in corpus if _features_of(html, backend) != reference[name]]
+        failed = failed or bool(mismatches)
+        print(
+            f"{backend:14s} {elapsed_ms / max(total_mb, 1e-9):9.1f} ms/MB   "
+            f"parity: {'OK' if not mismatches else 'MISMATCH ' + ', '.join(mismatches)}"
+        )
+    legacy = legacy_mismatches(corpus)
+    failed = failed or bool(legacy)
+    print(f"legacy extractors: {'OK' if not legacy else 'MISMATCH ' + ', '.join(legacy)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+scripts/chart_snapshots.py
+Snapshot check for the vector charts in app.audit.pdf_report
+
+Usage (from the project root):
+    python -m scripts.chart_snapshots                    # compare against scripts/chart_snapshots.json
+    python -m scripts.chart_snapshots --update           # accept the current drawings as the new snapshot
+    python -m scripts.chart_snapshots --pdf charts.pdf   # also write a review sheet with every fixture chart
+
+- Each fixture chart is reduced to its primitive shapes (type, geometry rounded to 0.1pt, colours, text)
+- Fails (exit 1) and names the charts whose shapes changed; review the --pdf sheet, then --update
+"""
+import json
+import sys
+from pathlib import Path
+
+from reportlab.graphics.shapes import Group
+from reportlab.lib import colors
+
+from app.audit.pdf_report import _bar_chart, _donut_overall, _radar_chart, _risk_matrix_chart
+
+SNAPSHOT_PATH = Path(__file__).with_suffix(".json")
+
+FULL = {"seo": 95, "performance": 62, "security": 80, "accessibility": 71, "ux": 88, "links": 100}
+FIXTURES = {
+    "radar_full": lambda: _radar_chart(FULL),
+    "radar_three": lambda: _radar_chart({"seo": 40, "performance": 90, "security": 10}),
+    "radar_empty": lambda: _radar_chart({"overall": 55}),
+    "bar_full": lambda: _bar_chart(FULL),
+    "bar_two": lambda: _bar_chart({"seo": 0, "performance": 100}),
+    "donut_low_risk": lambda: _donut_overall(91),
+    "donut_critical": lambda: _donut_overall(12, title="SECURITY", size=108),
+    "donut_zero": lambda: _donut_overall(0),
+    "donut_full": lambda: _donut_overall(100),
+    "risk_matrix": lambda: _risk_matrix_chart([(3, 4, "SEC"), (2, 2, "SEO"), (3, 3, "PER"), (2, 1, "ACC")]),
+}
+
+_KEYS = (
+    "x", "y", "width", "height", "x1", "y1", "x2", "y2", "cx", "cy", "r", "radius", "radius1",
+    "startangledegrees", "endangledegrees", "points", "text", "fontName", "fontSize", "textAnchor",
+    "fillColor", "strokeColor", "strokeWidth", "fillOpacity", "strokeDashArray", "transform",
+)
+
+
+def _norm(value):
+    if isinstance(value, float):
+        return round(value, 1)
+    if isinstance(value, (list, tuple)):
+        return [_norm(v) for v in value]
+    if isinstance(value, colors.Color):
+        return value.hexval()
+    return value
+
+
+def _shapes(node, out):
+    if isinstance(node, Group):
+        if node.transform != (1, 0, 0, 1, 0, 0):
+            out.append({"type": "Group", "transform": _norm(list(node.transform))})
+        for child in node.contents:
+            _shapes(child, out)
+        return out
+    props = node.getProperties()
+    out.append({"type": type(node).__name__, **{k: _norm(props[k]) for k in _KEYS if k in props and props[k] is not None}})
+    return out
+
+
+def snapshot():
+    result = {}
+    for name, build in FIXTURES.items():
+        drawing = build()
+        result[name] = {
+            "size": [_norm(float(drawing.width)), _norm(float(drawing.height))],
+            "shapes": _shapes(drawing, []),
+        }
+    return result
+
+
+def _dumps(snap):
+    """One shape per line so snapshot diffs stay readable."""
+    charts = []
+    for name in sorted(snap):
+        shapes = ",\n".join(f"   {json.dumps(s, sort_keys=True)}" for s in snap[name]["shapes"])
+        charts.append(f' {json.dumps(name)}: {{\n  "size": {json.dumps(snap[name]["size"])},\n  "shapes": [\n{shapes}\n  ]\n }}')
+    return "{\n" + ",\n".join(charts) + "\n}\n"
+
+
+def _write_pdf(path):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    styles = getSampleStyleSheet()
+    story = []
+    for name, build in FIXTURES.items():
+        story += [Paragraph(name, styles["Heading4"]), build(), Spacer(1, 12)]
+    SimpleDocTemplate(str(path), pagesize=A4).build(story)
+
+
+def main(argv):
+    current = snapshot()
+    if "--pdf" in argv:
+        target = argv[argv.index("--pdf") + 1]
+        _write_pdf(target)
+        print(f"review sheet written: {target}")
+    if "--update" in argv or not SNAPSHOT_PATH.exists():
+        SNAPSHOT_PATH.write_text(_dumps(current), encoding="utf-8")
+        print(f"snapshot written: {SNAPSHOT_PATH} ({len(current)} charts)")
+        return 0
+    golden = json.loads(SNAPSHOT_PATH.read_text(encoding="utf-8"))
+    changed = sorted(k for k in set(golden) | set(current) if golden.get(k) != current.get(k))
+    for name in sorted(current):
+        print(f"{name:<18} {'CHANGED' if name in changed else 'ok'}")
+    if changed:
+        print(f"{len(changed)} chart(s) differ from {SNAPSHOT_PATH.name}; review with --pdf, accept with --update")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
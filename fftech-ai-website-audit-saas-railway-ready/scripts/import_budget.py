@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+scripts/import_budget.py
+Startup-time budget for the web process
+
+Usage (from the project root):
+    python -m scripts.import_budget              # import profile of app.main vs IMPORT_BUDGET_MS
+    python -m scripts.import_budget --health     # also: process start → first 200 from /health (uvicorn)
+    python -m scripts.import_budget --top 25     # longer profile listing
+
+- Runs `python -X importtime -c "import app.main"` in a fresh interpreter and lists the slowest imports
+  under app.main (cumulative ms)
+- Fails (exit 1) when app.main imports any of app.warmup.HEAVY_MODULES eagerly, when the import exceeds
+  IMPORT_BUDGET_MS (default 1500), or with --health when /health is not answering within HEALTH_BUDGET_MS
+  (default 3000)
+"""
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from app.warmup import HEAVY_MODULES
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+HEALTH_BUDGET_MS = float(os.getenv("HEALTH_BUDGET_MS", "3000"))
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_profile(module="app.main"):
+    """[(name, depth, cumulative_ms)] for module and everything it imported, in completion order."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), len(m.group(3)) // 2, int(m.group(2)) / 1000))
+    # The subtree of `module` is the contiguous block that ends with its own (depth 0) line
+    end = max(i for i, (name, depth, _) in enumerate(rows) if name == module and depth == 0)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def time_to_health(timeout=30.0):
+    """ms from spawning a single uvicorn process until GET /health returns 200."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+                    if r.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.02)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main(argv):
+    top = int(argv[argv.index("--top") + 1]) if "--top" in argv else 12
+    rows = import_profile()
+    total_ms = rows[-1][2]
+    imported = {name for name, _, _ in rows}
+    print(f"import app.main: {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms), {len(rows)} modules")
+    for name, depth, ms in sorted(rows[:-1], key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {ms:8.1f} ms  {'  ' * (depth - 1)}{name}")
+
+    failed = False
+    eager = [m for m in HEAVY_MODULES if m in imported]
+    if eager:
+        print(f"FAIL: imported eagerly by app.main (keep them lazy): {', '.join(eager)}")
+        failed = True
+    if total_ms > IMPORT_BUDGET_MS:
+        print(f"FAIL: app.main import {total_ms:.0f} ms exceeds IMPORT_BUDGET_MS={IMPORT_BUDGET_MS:.0f}")
+        failed = True
+
+    if "--health" in argv:
+        ms = time_to_health()
+        if ms is None:
+            print("FAIL: /health did not answer")
+            failed = True
+        else:
+            print(f"process start -> /health 200: {ms:.0f} ms (budget {HEALTH_BUDGET_MS:.0f} ms)")
+            if ms > HEALTH_BUDGET_MS:
+                print(f"FAIL: exceeds HEALTH_BUDGET_MS={HEALTH_BUDGET_MS:.0f}")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
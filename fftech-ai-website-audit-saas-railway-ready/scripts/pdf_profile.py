@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+scripts/pdf_profile.py
+Where a PDF render spends its time, section by section
+
+Usage (from the project root):
+    python -m scripts.pdf_profile                      # built-in audit, 2 screenshots, 5 runs
+    python -m scripts.pdf_profile audit.json --runs 10 # audit_data saved from runner_result_to_audit_data
+    python -m scripts.pdf_profile --screenshots 6      # more / fewer synthetic 1920x1080 screenshots
+
+- Median over the runs of: image preparation, story construction and layout / draw per section,
+  final document write (same numbers PDF_PROFILE=1 logs in production)
+- The first run is reported separately: it includes font / style / image memo warm-up
+"""
+import base64
+import io
+import json
+import random
+import statistics
+import sys
+
+from app.audit.pdf_report import PDFReport
+
+
+def _screenshot(seed, width=1920, height=1080):
+    from PIL import Image, ImageDraw
+
+    rnd = random.Random(seed)
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    for i in range(300):
+        x, y = rnd.randrange(width), rnd.randrange(height)
+        box = [x, y, x + rnd.randrange(20, 300), y + rnd.randrange(10, 80)]
+        draw.rectangle(box, fill=tuple(rnd.randrange(256) for _ in range(3)))
+        draw.text((x, y), f"Section {i} lorem ipsum", fill="black")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def _builtin_audit(screenshots):
+    shots = [_screenshot(i) for i in range(screenshots)]
+    audit = {
+        "audited_url": "https://www.example.com/",
+        "overall_score": 71,
+        "grade": "B",
+        "audit_datetime": "2026-01-01 00:00",
+        "scores": {"overall": 71, "performance": 58, "seo": 84, "security": 66, "links": 90, "accessibility": 73},
+        "breakdown": {
+            "performance": {"score": 58, "extras": {"load_ms": 2300, "bytes": 1_450_000, "scripts": 24, "styles": 6}},
+            "seo": {"score": 84, "extras": {"title": "Example", "meta_description_present": True, "h1_count": 1,
+                                            "images_total": 40, "images_missing_alt": 7}},
+            "security": {"score": 66, "https": True, "hsts": False},
+            "links": {"score": 90, "internal_links_count": 120, "external_links_count": 18},
+        },
+        "host": {"ip": "93.184.216.34", "tls": {"valid": True, "version": "TLSv1.3", "issuer": "Example CA",
+                                                 "not_after": "2027-01-01", "days_to_expiry": 75}},
+        "assets": {},
+    }
+    if shots:
+        audit["assets"]["homepage_screenshot_b64"] = shots[0]
+        audit["assets"]["issue_screenshots"] = [{"title": f"Issue {i}", "b64": s} for i, s in enumerate(shots[1:], 1)]
+    return audit
+
+
+def _arg(argv, name, default):
+    return int(argv[argv.index(name) + 1]) if name in argv else default
+
+
+def main(argv):
+    runs = max(1, _arg(argv, "--runs", 5))
+    paths = [a for a in argv if a.endswith(".json")]
+    audit = json.loads(open(paths[0], encoding="utf-8").read()) if paths else _builtin_audit(_arg(argv, "--screenshots", 2))
+
+    profiles = []
+    for _ in range(runs + 1):
+        report = PDFReport(audit, profile=True)
+        pdf = report.build_pdf_bytes()
+        profiles.append(report.profile)
+    first, rest = profiles[0], profiles[1:]
+    med = lambda key, rows: statistics.median(r[key] for r in rows)  # noqa: E731
+
+    print(f"{len(pdf) / 1024:.0f} KB, {first['pages']} pages; first run {first['total_ms']:.0f} ms, "
+          f"median of {runs} warm runs {med('total_ms', rest):.0f} ms")
+    for key in ("prepare_ms", "story_ms", "layout_ms", "finalize_ms"):
+        print(f"  {key[:-3]:<10} {med(key, rest):8.1f} ms   (first run {first[key]:.1f})")
+    print(f"\n{'section':<32} {'story ms':>9} {'layout ms':>10}")
+    sections = [s["section"] for s in rest[0]["sections"]]
+    rows = []
+    for i, name in enumerate(sections):
+        rows.append((
+            name,
+            statistics.median(p["sections"][i]["story_ms"] for p in rest),
+            statistics.median(p["sections"][i]["layout_ms"] for p in rest),
+        ))
+    for name, story, layout in sorted(rows, key=lambda r: r[1] + r[2], reverse=True):
+        print(f"{name:<32} {story:9.1f} {layout:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
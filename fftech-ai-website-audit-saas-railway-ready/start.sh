@@ -3,5 +3,11 @@ set -e
 
 echo "Starting FastAPI on PORT=${PORT:-8080}"
 
-# Run FastAPI via Python so PORT is read correctly
-python app/main.py
+# Local/dev: APP_SERVER=uvicorn runs the single-process entry in app/main.py
+if [ "${APP_SERVER:-gunicorn}" = "uvicorn" ]; then
+    exec python app/main.py
+fi
+
+# Production: gunicorn + uvicorn workers (see gunicorn.conf.py).
+# exec so SIGTERM from Railway reaches gunicorn and triggers a graceful drain.
+exec gunicorn app.main:app -c gunicorn.conf.py
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""Web process startup budget (scripts/import_budget.py)."""
+from app.warmup import HEAVY_MODULES
+from scripts.import_budget import IMPORT_BUDGET_MS, import_profile
+
+
+def test_app_main_import_stays_lean():
+    rows = import_profile("app.main")
+    imported = {name for name, _, _ in rows}
+    assert [m for m in HEAVY_MODULES if m in imported] == []
+    assert rows[-1][2] <= IMPORT_BUDGET_MS
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""app.services.jobs: lifecycle, per-tenant cap, backlog bound, persistence and orphaned jobs."""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict
+
+import pytest
+
+from app.services import jobs
+from app.services.jobs import AuditJobQueue, Job, JobQueueFull
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    def make(**kwargs):
+        kwargs.setdefault("workers", 2)
+        return AuditJobQueue(store_dir=str(tmp_path), **kwargs)
+    return make
+
+
+async def _wait_finished(queue, job, timeout=5.0):
+    async def poll():
+        while not job.finished:
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def _stored(queue, job_id):
+    return json.loads((queue.store_dir / f"{job_id}.json").read_text(encoding="utf-8"))
+
+
+def test_job_lifecycle(make_queue):
+    queue = make_queue()
+    seen = []
+
+    async def work(job, progress):
+        seen.append(_stored(queue, job.id)["status"])
+        await progress("crawling", 40)
+        await progress("crawling", 20)  # progress never goes backwards
+        return {"score": 90}
+
+    async def main():
+        job = await queue.submit("audit", "tenant", "https://example.com", work)
+        assert job.status == "queued" and job.owner_pid == os.getpid()
+        await _wait_finished(queue, job)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(main())
+    assert seen == ["running"]
+    assert job.status == "completed" and job.progress == 100 and job.result == {"score": 90}
+    stored = _stored(queue, job.id)
+    assert stored["status"] == "completed" and stored["result"] == {"score": 90}
+    assert queue.get(job.id) is job
+    assert job.public()["pdf_ready"] is False and "pdf_path" not in job.public()
+
+
+def test_failed_job_records_error(make_queue):
+    queue = make_queue()
+
+    async def work(job, progress):
+        raise ValueError("site unreachable")
+
+    async def main():
+        job = await queue.submit("audit", "tenant", "https://example.com", work)
+        await _wait_finished(queue, job)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(main())
+    assert job.status == "failed" and job.error == "site unreachable"
+    assert _stored(queue, job.id)["status"] == "failed"
+
+
+def test_per_tenant_cap(make_queue):
+    queue = make_queue(workers=3, per_tenant=1)
+    running = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+
+    def work_for(tenant):
+        async def work(job, progress):
+            running[tenant] += 1
+            peak[tenant] = max(peak[tenant], running[tenant])
+            await asyncio.sleep(0.05)
+            running[tenant] -= 1
+        return work
+
+    async def main():
+        submitted = [await queue.submit("audit", "a", "u", work_for("a")) for _ in range(3)]
+        submitted.append(await queue.submit("audit", "b", "u", work_for("b")))
+        for job in submitted:
+            await _wait_finished(queue, job)
+        await queue.stop()
+        return submitted
+
+    submitted = asyncio.run(main())
+    assert peak == {"a": 1, "b": 1}
+    # tenant b was not stuck behind tenant a's backlog
+    assert submitted[3].finished_at < submitted[2].finished_at
+
+
+def test_full_backlog_raises(make_queue):
+    queue = make_queue(workers=1, max_pending=1)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def work(job, progress):
+            await release.wait()
+
+        first = await queue.submit("audit", "t", "u", work)
+        while first.status != "running":
+            await asyncio.sleep(0.01)
+        await queue.submit("audit", "t", "u", work)
+        with pytest.raises(JobQueueFull):
+            await queue.submit("audit", "t", "u", work)
+        release.set()
+        await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_progress_writes_are_throttled(make_queue, monkeypatch):
+    queue = make_queue()
+    monkeypatch.setattr(jobs, "JOB_PERSIST_INTERVAL_SECONDS", 60.0)
+    writes = []
+    real_persist = queue._persist
+    monkeypatch.setattr(queue, "_persist", lambda job: (writes.append(job.status), real_persist(job)))
+
+    async def work(job, progress):
+        for pct in range(1, 50):
+            await progress("crawling", pct)
+
+    async def main():
+        job = await queue.submit("audit", "t", "u", work)
+        await _wait_finished(queue, job)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(main())
+    # submit, start and finish are always written; 49 progress updates inside one interval are not
+    assert writes == ["queued", "running", "completed"]
+    assert _stored(queue, job.id)["progress"] == 100
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _write_job(store_dir, **fields):
+    job = Job(id=fields.pop("id"), kind="audit", tenant="t", url="u", **fields)
+    (store_dir / f"{job.id}.json").write_text(json.dumps(asdict(job)), encoding="utf-8")
+    return job
+
+
+def test_orphaned_jobs_fail_on_read(make_queue, tmp_path):
+    queue = make_queue()
+    _write_job(tmp_path, id="deadowner", status="running", owner_pid=_dead_pid())
+    _write_job(tmp_path, id="noowner", status="queued")
+    _write_job(tmp_path, id="alive", status="running", owner_pid=os.getppid())
+    _write_job(tmp_path, id="done", status="completed", owner_pid=_dead_pid())
+
+    for job_id in ("deadowner", "noowner"):
+        job = queue.get(job_id)
+        assert job.status == "failed" and "resubmit" in job.error
+        assert _stored(queue, job_id)["status"] == "failed"
+    assert queue.get("alive").status == "running"
+    assert queue.get("done").status == "completed"
+    assert queue.get("../etc") is None
+
+
+def test_startup_sweep_fails_orphans(make_queue, tmp_path):
+    queue = make_queue()
+    _write_job(tmp_path, id="deadowner", status="running", owner_pid=_dead_pid())
+    _write_job(tmp_path, id="alive", status="running", owner_pid=os.getppid())
+
+    assert queue._fail_orphans() == 1
+    assert _stored(queue, "deadowner")["status"] == "failed"
+    assert _stored(queue, "alive")["status"] == "running"
+
+
+def test_expired_store_files_are_swept_off_the_loop(make_queue, tmp_path, monkeypatch):
+    queue = make_queue(ttl_seconds=60)
+    stale = _write_job(tmp_path, id="stale", status="completed")
+    old = os.stat(tmp_path / "stale.json").st_mtime - 3600
+    os.utime(tmp_path / "stale.json", (old, old))
+    calls = []
+    real_sweep = queue._sweep_store
+    monkeypatch.setattr(queue, "_sweep_store", lambda live: (calls.append(live), real_sweep(live)))
+
+    async def work(job, progress):
+        return None
+
+    async def main():
+        jobs_ = [await queue.submit("audit", "t", "u", work) for _ in range(3)]
+        await queue._store_sweep
+        for job in jobs_:
+            await _wait_finished(queue, job)
+        await queue.stop()
+        return jobs_
+
+    submitted = asyncio.run(main())
+    assert len(calls) == 1  # once per JOB_STORE_SWEEP_INTERVAL_SECONDS, not per submission
+    assert not (tmp_path / f"{stale.id}.json").exists()
+    assert all((tmp_path / f"{job.id}.json").exists() for job in submitted)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Golden-corpus parity of the parser backends and of PageFeatures vs the legacy extractors (scripts/bench_parsers.py)."""
+import pytest
+
+from app.audit.parsers import FALLBACK_BACKEND, available_backends
+from scripts.bench_parsers import _features_of, _golden_corpus, legacy_mismatches
+
+CORPUS = _golden_corpus()
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backend_features_match_html_parser(backend):
+    mismatches = [
+        name for name, html in CORPUS
+        if _features_of(html, backend) != _features_of(html, FALLBACK_BACKEND)
+    ]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_features_match_legacy_extractors(backend):
+    assert legacy_mismatches(CORPUS, backend=backend) == []
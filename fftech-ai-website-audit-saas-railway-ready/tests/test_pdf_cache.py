@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""app.audit.pdf_cache: content-addressed keys, TTL, LRU eviction by size."""
+import os
+import time
+
+import pytest
+
+from app.audit import pdf_cache
+
+AUDIT = {"audited_url": "https://example.com", "overall_score": 80, "breakdown": {"seo": {"score": 75}}}
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_MAX_BYTES", 1024 * 1024)
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_TTL_SECONDS", 3600)
+    monkeypatch.setattr(pdf_cache, "_last_sweep", time.time())  # no orphan sweep of the real temp dir
+    return tmp_path
+
+
+def test_cache_key_is_stable_and_content_addressed():
+    assert pdf_cache.cache_key(AUDIT) == pdf_cache.cache_key(dict(AUDIT))
+    assert pdf_cache.cache_key(AUDIT) != pdf_cache.cache_key({**AUDIT, "overall_score": 81})
+    assert pdf_cache.cache_key(AUDIT, brand=None) == pdf_cache.cache_key(AUDIT)
+    assert pdf_cache.cache_key(AUDIT, brand="x") != pdf_cache.cache_key(AUDIT)
+
+
+def test_template_version_changes_key(monkeypatch):
+    key = pdf_cache.cache_key(AUDIT)
+    monkeypatch.setattr(pdf_cache, "PDF_TEMPLATE_VERSION", "next")
+    assert pdf_cache.cache_key(AUDIT) != key
+
+
+def test_put_then_get(cache_dir):
+    key = pdf_cache.cache_key(AUDIT)
+    assert pdf_cache.get(key) is None
+    path = pdf_cache.put_bytes(key, b"%PDF-1.4 report")
+    assert path == cache_dir / f"{key}.pdf"
+    assert pdf_cache.get(key) == path
+    assert path.read_bytes() == b"%PDF-1.4 report"
+    assert not list(cache_dir.glob("*.part"))
+
+
+def test_expired_entry_is_a_miss(cache_dir):
+    path = pdf_cache.put_bytes("stale", b"%PDF")
+    old = time.time() - 7200
+    os.utime(path, (old, old))
+    assert pdf_cache.get("stale") is None
+    assert not path.exists()
+
+
+def test_eviction_drops_least_recently_used(cache_dir, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_MAX_BYTES", 250)
+    now = time.time()
+    for i, key in enumerate(("a", "b")):
+        path = pdf_cache.put_bytes(key, b"x" * 100)
+        os.utime(path, (now - 100 + i, now))
+    pdf_cache.get("a")  # a becomes the most recently used
+    pdf_cache.put_bytes("c", b"x" * 100)
+    assert {p.stem for p in cache_dir.glob("*.pdf")} == {"a", "c"}
+
+
+def test_disabled_cache(cache_dir, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_MAX_BYTES", 0)
+    assert pdf_cache.put_bytes("k", b"%PDF") is None
+    assert pdf_cache.get("k") is None
+
+
+def test_failed_write_leaves_no_partial_file(cache_dir, monkeypatch):
+    def no_space(key, tmp):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(pdf_cache, "_commit", no_space)
+    assert pdf_cache.put_bytes("k", b"%PDF") is None
+    assert list(cache_dir.iterdir()) == []
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""app.services.progress: coalescing of progress frames, terminal frames, JSON-patch deltas."""
+import asyncio
+
+from app.services.progress import ProgressChannel, json_patch, result_frame
+
+
+def _run(steps, min_interval_ms=50):
+    sent = []
+
+    async def send(frame):
+        sent.append(frame)
+
+    async def main():
+        channel = ProgressChannel(send, min_interval_ms=min_interval_ms)
+        await steps(channel)
+
+    asyncio.run(main())
+    return sent
+
+
+def test_burst_is_coalesced_newest_wins():
+    async def steps(channel):
+        for pct in range(10, 60, 10):
+            await channel.progress("crawling", pct)
+        await asyncio.sleep(0.1)
+
+    sent = _run(steps)
+    assert [f["progress"] for f in sent] == [10, 50]
+
+
+def test_updates_spaced_beyond_interval_all_go_out():
+    async def steps(channel):
+        for pct in (10, 20, 30):
+            await channel.progress("crawling", pct)
+            await asyncio.sleep(0.08)
+
+    assert [f["progress"] for f in _run(steps)] == [10, 20, 30]
+
+
+def test_terminal_frame_flushes_now_and_drops_pending():
+    async def steps(channel):
+        await channel.progress("crawling", 10)
+        await channel.progress("crawling", 20)  # pending
+        await channel.final({"status": "completed", "progress": 100, "result": {"score": 1}})
+        await asyncio.sleep(0.1)
+        await channel.progress("crawling", 30)  # after close: ignored
+
+    sent = _run(steps)
+    assert [f["progress"] for f in sent] == [10, 100]
+    assert sent[-1]["result"] == {"score": 1}
+
+
+def test_runner_completed_event_is_swallowed_and_error_is_terminal():
+    async def steps(channel):
+        await channel.progress("completed", 100, {"huge": "result"})
+        await channel.progress("error", 50, {"message": "boom"})
+        await channel.progress("crawling", 60)
+
+    sent = _run(steps)
+    assert sent == [{"status": "error", "progress": 50, "payload": {"message": "boom"}}]
+
+
+def test_result_frame_sends_patch_only_when_smaller():
+    previous = {"url": "https://example.com", "score": 80, "issues": ["a" * 200]}
+    current = {**previous, "score": 81}
+    frame = result_frame(current, previous, delta=True)
+    assert frame["patch"] == [{"op": "replace", "path": "/score", "value": 81}]
+    assert "result" not in frame
+    assert result_frame(current, previous)["result"] == current
+    assert result_frame({"a": 1}, {"b": 2}, delta=True)["result"] == {"a": 1}
+
+
+def test_json_patch_escapes_pointer_tokens():
+    assert json_patch({"a/b": 1, "c~d": 1}, {"a/b": 2}) == [
+        {"op": "remove", "path": "/c~0d"},
+        {"op": "replace", "path": "/a~1b", "value": 2},
+    ]
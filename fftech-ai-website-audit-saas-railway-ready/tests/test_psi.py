@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""app.audit.psi: token bucket, retries / backoff, quota and in-flight sharing (HTTP via httpx.MockTransport)."""
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.audit import psi
+
+PSI_BODY = {
+    "lighthouseResult": {
+        "categories": {"performance": {"score": 0.9}},
+        "audits": {"largest-contentful-paint": {"numericValue": 1200.0}},
+    }
+}
+
+
+# ------------------------------------------------------------
+# TokenBucket
+# ------------------------------------------------------------
+def test_bucket_allows_burst_then_refills_at_rate():
+    bucket = psi.TokenBucket(2, 0.2)  # 10 tokens/s
+
+    async def take(n):
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(take(2)) < 0.05
+    assert 0.15 <= asyncio.run(take(2)) < 0.4
+
+
+def test_bucket_serves_waiters_in_arrival_order():
+    bucket = psi.TokenBucket(1, 0.05)
+    order = []
+
+    async def waiter(i):
+        await bucket.acquire()
+        order.append(i)
+
+    async def main():
+        tasks = []
+        for i in range(5):
+            tasks.append(asyncio.create_task(waiter(i)))
+            await asyncio.sleep(0)  # arrival order = creation order
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_bucket_is_shared_across_event_loops():
+    bucket = psi.TokenBucket(2, 0.2)
+    done = []
+
+    def run():
+        async def main():
+            for _ in range(3):
+                await bucket.acquire()
+                done.append(time.monotonic())
+        asyncio.run(main())
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 6 tokens, 2 up front, 4 refilled at 10/s
+    assert len(done) == 6
+    assert max(done) - start >= 0.35
+
+
+def test_cancelled_waiter_refunds_its_token():
+    bucket = psi.TokenBucket(1, 1.0)
+
+    async def main():
+        await bucket.acquire()
+        task = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert 0.5 < bucket._reserve() < 1.1  # next caller waits one refill, not two
+
+
+# ------------------------------------------------------------
+# Requests
+# ------------------------------------------------------------
+def _client(**kwargs):
+    kwargs.setdefault("max_retries", 3)
+    return psi.PSIClient(api_key="test-key", per_100s=1000, per_day=1000, **kwargs)
+
+
+def _transport(responses, calls):
+    """MockTransport answering with `responses` in order (an Exception instance is raised)."""
+    def handler(request):
+        calls.append(request)
+        item = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(item, Exception):
+            raise item
+        return item
+    return httpx.MockTransport(handler)
+
+
+def _request(client, responses):
+    calls = []
+
+    async def main():
+        async with httpx.AsyncClient(transport=_transport(responses, calls)) as http:
+            return await client._request(http, "https://example.com", "mobile", ("performance",))
+
+    return asyncio.run(main()), calls
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(psi, "PSI_BACKOFF_BASE_SECONDS", 0.0)
+
+
+def test_retries_5xx_and_network_errors_then_projects():
+    data, calls = _request(_client(), [
+        httpx.Response(503),
+        httpx.ConnectError("refused"),
+        httpx.Response(200, json=PSI_BODY),
+    ])
+    assert len(calls) == 3
+    assert data["lighthouseResult"]["categories"]["performance"]["score"] == 0.9
+    assert calls[0].url.params["key"] == "test-key"
+    assert calls[0].url.params.get_list("category") == ["performance"]
+
+
+def test_honours_retry_after(monkeypatch):
+    slept = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        slept.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(psi.asyncio, "sleep", sleep)
+    data, calls = _request(_client(), [
+        httpx.Response(429, headers={"Retry-After": "7"}),
+        httpx.Response(200, json=PSI_BODY),
+    ])
+    assert data is not None and len(calls) == 2
+    assert slept == [7.0]
+
+
+def test_gives_up_after_max_retries():
+    data, calls = _request(_client(max_retries=2), [httpx.Response(500)])
+    assert data is None
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried():
+    data, calls = _request(_client(), [httpx.Response(400, text="bad url")])
+    assert data is None
+    assert len(calls) == 1
+
+
+def test_oversized_response_is_dropped(monkeypatch):
+    monkeypatch.setattr(psi, "PSI_MAX_RESPONSE_BYTES", 64)
+    data, calls = _request(_client(), [httpx.Response(200, content=json.dumps(PSI_BODY).encode() * 4)])
+    assert data is None
+    assert len(calls) == 1
+
+
+def test_daily_quota_stops_requests():
+    client = psi.PSIClient(api_key="test-key", per_100s=1000, per_day=1, max_retries=3)
+    data, calls = _request(client, [httpx.Response(503)])
+    assert data is None
+    assert len(calls) == 1
+
+
+def test_backoff_is_capped_and_jittered(monkeypatch):
+    assert psi.PSIClient._backoff(0, retry_after=999) == psi.PSI_BACKOFF_MAX_SECONDS
+    monkeypatch.setattr(psi, "PSI_BACKOFF_BASE_SECONDS", 1.0)
+    for attempt in range(8):
+        step = min(psi.PSI_BACKOFF_MAX_SECONDS, 2 ** attempt)
+        assert step / 2 <= psi.PSIClient._backoff(attempt) <= step * 1.5
+
+
+def test_concurrent_identical_fetches_share_one_call_and_cache(monkeypatch):
+    client = _client()
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json=PSI_BODY)
+
+    monkeypatch.setattr(client, "_new_http", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    async def main():
+        client.bind_loop()
+        results = await asyncio.gather(*(client.fetch("https://example.com") for _ in range(5)))
+        again = await client.fetch("https://example.com")
+        await client.aclose()
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r == results[0] for r in results) and again == results[0]